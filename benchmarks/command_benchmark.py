@@ -0,0 +1,249 @@
+"""Command-path benchmark: text command -> routing -> handler -> response
+
+Replays a command corpus through FRIDAY.handle_command with the system
+backends (MacAutomation, TaskManager, CommunicationManager, WebAssistant)
+replaced by fakes that sleep for a configurable latency, so it runs on
+Linux without osascript, Mail or a browser. With the default zero latency
+the numbers are pure routing and bookkeeping overhead.
+
+    python -m benchmarks.command_benchmark --repeat 200
+    python -m benchmarks.command_benchmark --latency mac=20 --latency web_assistant=400 --jitter 0.3
+"""
+import time
+import random
+import asyncio
+import inspect
+import argparse
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+import numpy as np
+
+COMMANDS = [
+    "open safari",
+    "launch terminal",
+    "start visual studio code",
+    "open",
+    "increase brightness",
+    "turn the brightness down",
+    "brightness",
+    "check my email",
+    "email john because I won't be in today",
+    "write an email to sarah about the launch",
+    "search python asyncio tutorials",
+    "look up the weather in london",
+    "find flights to tokyo",
+    "setup workspace for coding",
+    "set up workspace",
+    "setup workspace for research",
+    "take screenshot of the screen",
+    "lock screen",
+    "minimize window safari",
+    "maximize window chrome",
+    "start work on the system",
+    "focus mode for the workspace",
+    "dark mode on this screen",
+    "do not disturb on for the system",
+    "cleanup system",
+    "setup project python system demo",
+    "what is on the screen",
+    "play some music",
+    "status",
+]
+
+BACKENDS = ("mac", "tasks", "comm_manager", "web_assistant")
+
+# Canned return values where handlers inspect the result
+RESULTS: Dict[str, Dict[str, Any]] = {
+    "comm_manager": {
+        "check_unread_emails": {"unread_count": 3, "urgent_messages": ["build broken"]},
+        "compose_email": {"to": "john@example.com", "subject": "Out today", "body": "..."},
+        "compose_mail_native": True,
+    },
+    "web_assistant": {
+        "search_and_summarize": {"summary": "Three results about the query.", "results": []},
+    },
+}
+
+
+class FakeBackend:
+    """Stands in for a system component: every method sleeps, then returns a canned result
+
+    Methods named in async_methods are coroutines, like the real component's.
+    Sleep time is accumulated in slept so it can be subtracted from wall time.
+    """
+
+    def __init__(self, name: str, latency_ms: float = 0.0, jitter: float = 0.0,
+                 results: Optional[Dict[str, Any]] = None, async_methods: FrozenSet[str] = frozenset(),
+                 seed: int = 0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.results = results or {}
+        self.async_methods = async_methods
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.slept = 0.0
+        self._rng = random.Random(seed)
+
+    def _delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        delay = self.latency_ms / 1000 * (1 + self.jitter * self._rng.uniform(-1, 1))
+        self.slept += delay
+        return delay
+
+    def _result(self, method: str) -> Any:
+        self.calls[method] += 1
+        if method in self.results:
+            return self.results[method]
+        if method in self.async_methods:
+            return {"success": True}
+        return f"{self.name}.{method} done"
+
+    def __getattr__(self, method: str) -> Callable:
+        if method.startswith("__"):
+            raise AttributeError(method)
+        if method in self.async_methods:
+            async def fake(*args, **kwargs):
+                delay = self._delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                return self._result(method)
+        else:
+            def fake(*args, **kwargs):
+                delay = self._delay()
+                if delay:
+                    time.sleep(delay)
+                return self._result(method)
+        setattr(self, method, fake)  # later lookups skip __getattr__
+        return fake
+
+
+def coroutine_methods(cls: type) -> FrozenSet[str]:
+    return frozenset(name for name, member in inspect.getmembers(cls) if inspect.iscoroutinefunction(member))
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return f"p50 {p50:8.3f}  p90 {p90:8.3f}  p99 {p99:8.3f}  max {max(values):8.3f}"
+
+
+def build_friday(latencies: Dict[str, float], jitter: float):
+    """Headless FRIDAY with every system backend replaced by a FakeBackend"""
+    from main import FRIDAY
+    from modules.mac_automation import MacAutomation
+
+    friday = FRIDAY(headless=True)
+    async_methods = {"mac": coroutine_methods(MacAutomation)}
+    fakes = {}
+    for seed, name in enumerate(BACKENDS):
+        fake = FakeBackend(name, latencies.get(name, 0.0), jitter, RESULTS.get(name),
+                           async_methods.get(name, frozenset()), seed)
+        friday.components.register(name, lambda fake=fake: fake)
+        fakes[name] = fake
+    friday.components.wait_for_prewarm()
+    return friday, fakes
+
+
+def run_pass(friday, fakes: Dict[str, FakeBackend], commands: List[str], repeat: int,
+             trace_allocations: bool = False) -> Dict[str, Dict[str, List[float]]]:
+    """Per-route samples: wall ms, overhead ms (wall minus fake latency), allocation KiB"""
+    samples: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for command in commands:
+            slept = sum(f.slept for f in fakes.values())
+            if trace_allocations:
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+            start = clock()
+            friday.handle_command(command)
+            elapsed = clock() - start
+            route = samples[friday.last_route or "none"]
+            if trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                route["peak_kib"].append((peak - before) / 1024)
+                route["retained_b"].append(current - before)
+                continue
+            route["wall_ms"].append(elapsed * 1000)
+            route["overhead_ms"].append((elapsed - (sum(f.slept for f in fakes.values()) - slept)) * 1000)
+    return samples
+
+
+def parse_latencies(values: List[str], parser: argparse.ArgumentParser) -> Dict[str, float]:
+    latencies = {}
+    for value in values:
+        name, _, ms = value.partition("=")
+        if name not in BACKENDS:
+            parser.error(f"unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+        try:
+            latencies[name] = float(ms)
+        except ValueError:
+            parser.error(f"--latency expects NAME=MS, got {value!r}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="file with one command per line (default: built-in corpus)")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--latency", action="append", default=[], metavar="NAME=MS",
+                        help=f"simulated latency of a backend: {', '.join(BACKENDS)}")
+    parser.add_argument("--jitter", type=float, default=0.0, help="relative latency jitter, e.g. 0.3 = +/-30%%")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    commands = COMMANDS
+    if args.corpus:
+        lines = Path(args.corpus).read_text().splitlines()
+        commands = [c.strip() for c in lines if c.strip() and not c.startswith("#")]
+    latencies = parse_latencies(args.latency, parser)
+
+    t0 = time.perf_counter()
+    friday, fakes = build_friday(latencies, args.jitter)
+    startup_ms = (time.perf_counter() - t0) * 1000
+    run_pass(friday, fakes, commands, 1)  # lazy components, first-call caches
+
+    start = time.perf_counter()
+    timing = run_pass(friday, fakes, commands, args.repeat)
+    elapsed = time.perf_counter() - start
+    total = args.repeat * len(commands)
+
+    print(f"corpus: {len(commands)} commands x {args.repeat}, startup {startup_ms:.0f} ms")
+    print(f"throughput: {total / elapsed:,.0f} commands/s ({elapsed / total * 1e6:.1f} us/command)")
+    if latencies:
+        print("simulated latency: " + ", ".join(f"{k} {v:g} ms" for k, v in latencies.items())
+              + (f" (+/-{args.jitter:.0%})" if args.jitter else ""))
+    print()
+    print("per route (ms)")
+    width = max(len(name) for name in timing)
+    for name in sorted(timing, key=lambda n: -np.mean(timing[n]["wall_ms"])):
+        stats = timing[name]
+        print(f"  {name:<{width}} n={len(stats['wall_ms']):<6} wall {percentiles(stats['wall_ms'])}")
+        if latencies:
+            print(f"  {'':<{width}} {'':<8} ovh  {percentiles(stats['overhead_ms'])}")
+
+    if not args.no_allocations:
+        tracemalloc.start()
+        try:
+            memory = run_pass(friday, fakes, commands, max(1, args.repeat // 10), trace_allocations=True)
+        finally:
+            tracemalloc.stop()
+        print()
+        print("allocations per command (tracemalloc)")
+        for name in sorted(memory, key=lambda n: -np.mean(memory[n]["peak_kib"])):
+            stats = memory[name]
+            print(f"  {name:<{width}} peak {np.mean(stats['peak_kib']):8.1f} KiB   "
+                  f"retained {np.mean(stats['retained_b']):8.0f} B")
+
+    print()
+    print("backend calls: " + ", ".join(
+        f"{name} {sum(fake.calls.values())}" for name, fake in fakes.items()
+    ))
+
+
+if __name__ == "__main__":
+    main()
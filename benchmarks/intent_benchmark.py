@@ -0,0 +1,129 @@
+"""Utterances/sec for the NLTK tagger intent path vs Brain.parse with the compiled IntentEngine
+
+Brain.parse answers confident utterances from the IntentEngine and sends
+the rest to the tagger, so both parts are timed separately and the speedup
+is taken over the whole corpus.
+
+    python -m benchmarks.intent_benchmark [--repeat 200]
+"""
+import argparse
+import time
+from typing import Callable, List, Optional
+
+from config import Config
+from modules.brain import Brain
+from modules.intent_engine import INTENT_VERBS
+
+UTTERANCES = [
+    "open safari",
+    "please open visual studio code",
+    "launch terminal",
+    "start chrome",
+    "search for python asyncio tutorials",
+    "look up the weather in london",
+    "find my notes from yesterday",
+    "send an email to john saying I won't be in today",
+    "write an email to sarah about the meeting",
+    "email mike because the build is broken",
+    "set brightness to fifty percent",
+    "change the wallpaper",
+    "update my status",
+    "turn up the volume",
+    "can you open spotify",
+    "hey friday launch slack",
+    "what time is it",
+    "how is the system doing",
+    "take a screenshot",
+    "lock screen",
+    "setup workspace for coding",
+    "tell me a joke",
+    "is it going to rain today",
+    "play some music",
+]
+
+
+def legacy_classify(text: str) -> str:
+    """Pre-IntentEngine path: word_tokenize + pos_tag + first verb lookup"""
+    from nltk.tokenize import word_tokenize
+    from nltk.tag import pos_tag
+    tagged = pos_tag(word_tokenize(text.lower()))
+    verbs = [word for word, tag in tagged if tag.startswith('VB')]
+    if not verbs:
+        return "query"
+    for intent, intent_verbs in INTENT_VERBS.items():
+        if verbs[0] in intent_verbs:
+            return intent
+    return "general_command"
+
+
+def measure(classify: Callable[[str], object], utterances: List[str], repeat: int) -> float:
+    """Return utterances per second"""
+    for text in utterances:  # warm caches / lazy model loads
+        classify(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in utterances:
+            classify(text)
+    elapsed = time.perf_counter() - start
+    return repeat * len(utterances) / elapsed
+
+
+def unavailable(tag: Callable[[str], object]) -> Optional[str]:
+    """Why tag can't run here, or None"""
+    try:
+        tag("open safari")
+        return None
+    except ImportError:
+        return "nltk is not installed"
+    except Exception as e:  # LookupError or ResourceUnavailableError
+        return f"NLTK data missing ({e.__class__.__name__})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    brain = Brain(Config.load())
+    engine = brain.intent_engine
+    matches = engine.classify_many(UTTERANCES)
+    fast = [m for m in matches if m.confident]
+    fallback = [text for text, m in zip(UTTERANCES, matches) if not m.confident]
+    print(f"corpus: {len(UTTERANCES)} utterances, trie phrases: {engine.phrase_count}")
+    print(f"fast-path coverage: {len(fast)}/{len(UTTERANCES)}")
+
+    engine_rate = measure(engine.classify, UTTERANCES, args.repeat)
+    print(f"intent engine only     : {engine_rate:>12,.0f} utterances/s  (classify, whole corpus)")
+    fast_texts = [text for text, m in zip(UTTERANCES, matches) if m.confident]
+    fast_rate = measure(brain.parse, fast_texts, args.repeat)
+    print(f"Brain.parse fast path  : {fast_rate:>12,.0f} utterances/s  ({len(fast_texts)} utterances)")
+
+    reason = unavailable(brain._tag)
+    if reason:
+        print(f"Brain.parse fallback   : skipped ({reason})")
+        print("nltk tagger            : skipped; no speedup without the fallback timing")
+        return
+
+    slow_repeat = max(1, args.repeat // 20)
+    fallback_rate = measure(brain.parse, fallback, slow_repeat)
+    print(f"Brain.parse fallback   : {fallback_rate:>12,.0f} utterances/s  ({len(fallback)} utterances)")
+    brain_rate = measure(brain.parse, UTTERANCES, slow_repeat)
+    print(f"Brain.parse corpus     : {brain_rate:>12,.0f} utterances/s")
+
+    reason = unavailable(legacy_classify)
+    if reason:
+        print(f"nltk tagger            : skipped ({reason})")
+        return
+    old_rate = measure(legacy_classify, UTTERANCES, slow_repeat)
+    print(f"nltk tagger            : {old_rate:>12,.0f} utterances/s")
+    print(f"speedup (corpus)       : {brain_rate / old_rate:>12.1f}x")
+
+    agree = sum(1 for m in fast if legacy_classify(" ".join(m.tokens)) == m.intent)
+    print(f"agreement with tagger on fast-path hits: {agree}/{len(fast)}")
+    for m in fast:
+        old = legacy_classify(" ".join(m.tokens))
+        if old != m.intent:
+            print(f"  {' '.join(m.tokens)!r}: engine={m.intent} tagger={old}")
+
+if __name__ == "__main__":
+    main()
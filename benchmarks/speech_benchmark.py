@@ -0,0 +1,289 @@
+"""Speech pipeline benchmark: WAV fixtures -> capture -> VAD -> ASR -> text
+
+Runs the real Speech.listen_and_transcribe() path against a fake PyAudio
+source that plays recorded fixtures into the capture thread, so it works
+headless (no microphone, no audio devices).
+
+Fixtures: a directory of 16 kHz mono WAVs, each optionally paired with a
+same-named .txt reference transcript for word error rate.
+
+    python -m benchmarks.speech_benchmark fixtures/speech --model base
+"""
+import re
+import sys
+import time
+import argparse
+import resource
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from config import Config
+
+try:
+    import psutil
+except ImportError:  # worker RSS is then only known after shutdown
+    psutil = None
+from modules.audio_io import read_wav
+
+_NON_WORD = re.compile(r"[^\w\s']")
+
+
+class FakeStream:
+    """Input stream serving queued fixtures at a fixed speed, silence in between"""
+
+    def __init__(self, rate: int, speed: float, noise: float = 1e-4):
+        self.rate = rate
+        self.speed = speed
+        self.noise = noise
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(0)
+        self._next_read = time.perf_counter()
+        self.finished_at: Dict[int, float] = {}
+
+    def queue(self, audio: np.ndarray, tag: int) -> None:
+        with self._lock:
+            self._pending.append([audio, 0, tag])
+
+    def read(self, chunk: int, exception_on_overflow: bool = False) -> bytes:
+        # Pace reads like a real device
+        self._next_read += chunk / self.rate / self.speed
+        delay = self._next_read - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next_read = time.perf_counter()
+
+        out = (self.noise * self._rng.standard_normal(chunk)).astype(np.float32)
+        filled = 0
+        with self._lock:
+            while filled < chunk and self._pending:
+                item = self._pending[0]
+                audio, offset, tag = item
+                n = min(chunk - filled, len(audio) - offset)
+                out[filled:filled + n] += audio[offset:offset + n]
+                filled += n
+                item[1] += n
+                if item[1] >= len(audio):
+                    self._pending.popleft()
+                    self.finished_at[tag] = time.perf_counter()
+        return out.tobytes()
+
+    def stop_stream(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FakePyAudio:
+    """Stands in for pyaudio.PyAudio(); open() returns the shared FakeStream"""
+
+    def __init__(self, rate: int, speed: float = 1.0):
+        self.stream = FakeStream(rate, speed)
+
+    def open(self, **kwargs) -> FakeStream:
+        return self.stream
+
+    def terminate(self) -> None:
+        pass
+
+
+class ASRTimer:
+    """Wraps the backend's transcribe() to accumulate pure ASR time"""
+
+    def __init__(self, transcribe):
+        self.transcribe = transcribe
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.transcribe(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+def normalize_words(text: str) -> List[str]:
+    return _NON_WORD.sub(" ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level Levenshtein distance"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1]
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    """Peak RSS of this process, or with RUSAGE_CHILDREN of the largest exited child"""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def worker_rss_mb(asr) -> Optional[float]:
+    """Current RSS summed over the ASR pool's workers, where the model lives"""
+    if psutil is None or not hasattr(asr, "worker_pids"):
+        return None
+    total = 0
+    for pid in asr.worker_pids():
+        try:
+            total += psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return f"p50 {p50:8.1f}  p90 {p90:8.1f}  p99 {p99:8.1f}  max {max(values):8.1f}"
+
+
+@dataclass
+class FixtureResult:
+    name: str
+    audio_seconds: float
+    text: Optional[str]
+    reference: Optional[str]
+    stages: Dict[str, float] = field(default_factory=dict)
+
+
+def run_fixture(speech, timer: ASRTimer, source: FakeStream, path: Path, tag: int) -> FixtureResult:
+    audio = read_wav(path, speech.rate)
+    reference_path = path.with_suffix(".txt")
+    reference = reference_path.read_text().strip() if reference_path.exists() else None
+
+    speech.skip_pending_audio()
+    endpoints_before = len(speech.endpoint_metrics)
+    streams_before = len(speech.stream_metrics)
+    asr_before, calls_before = timer.seconds, timer.calls
+    source.queue(audio, tag)
+    start = time.perf_counter()
+    text = speech.listen_and_transcribe()
+    done = time.perf_counter()
+
+    result = FixtureResult(path.name, len(audio) / speech.rate, text, reference)
+    stages = result.stages
+    stages["listen_ms"] = (done - start) * 1000
+    stages["asr_ms"] = (timer.seconds - asr_before) * 1000
+    stages["asr_calls"] = timer.calls - calls_before
+    if tag in source.finished_at:
+        # From the last fixture sample reaching the "microphone" to text
+        stages["end_to_text_ms"] = (done - source.finished_at[tag]) * 1000
+    if len(speech.endpoint_metrics) > endpoints_before:
+        stages["endpoint_lag_ms"] = speech.endpoint_metrics[-1].decision_lag_ms
+    if len(speech.stream_metrics) > streams_before:
+        metrics = speech.stream_metrics[-1]
+        stages["finalize_ms"] = metrics.finalize_ms
+        if metrics.first_partial_ms is not None:
+            stages["first_partial_ms"] = metrics.first_partial_ms
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", help="directory of WAV fixtures (+ optional .txt references)")
+    parser.add_argument("--model", help="override WHISPER_MODEL")
+    parser.add_argument("--backend", help="override ASR_BACKEND (whisper, faster-whisper)")
+    parser.add_argument("--profile", help="override ASR_PROFILE (command, dictation)")
+    parser.add_argument("--workers", type=int, help="override ASR_WORKERS (0 = in-process)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="playback speed of the fake microphone (1.0 = real time)")
+    parser.add_argument("--no-streaming", action="store_true", help="disable streaming ASR")
+    parser.add_argument("--no-vad", action="store_true", help="fixed RECORD_SECONDS windows")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.fixtures).glob("*.wav"))
+    if not paths:
+        parser.error(f"no WAV files in {args.fixtures}")
+
+    config = Config.load()
+    config.PHRASE_CACHE_ENABLED = False
+    config.TTS_BARGE_IN = False
+    if args.model:
+        config.WHISPER_MODEL = args.model
+    if args.backend:
+        config.ASR_BACKEND = args.backend
+    if args.profile:
+        config.ASR_PROFILE = args.profile
+    if args.workers is not None:
+        config.ASR_WORKERS = args.workers
+    if args.no_streaming:
+        config.ASR_STREAMING = False
+    if args.no_vad:
+        config.VAD_ENABLED = False
+
+    from modules.speech import Speech
+
+    fake = FakePyAudio(config.SAMPLE_RATE, args.speed)
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+    speech = Speech(config, audio=fake)
+    load_seconds = time.perf_counter() - t0
+    timer = ASRTimer(speech.asr.transcribe)
+    speech.asr.transcribe = timer
+    rss_loaded = peak_rss_mb()
+    workers_loaded = worker_rss_mb(speech.asr)
+    workers_end = None
+
+    results: List[FixtureResult] = []
+    try:
+        for r in range(args.repeat):
+            for i, path in enumerate(paths):
+                result = run_fixture(speech, timer, fake.stream, path, r * len(paths) + i)
+                results.append(result)
+                print(f"{result.name:<32} {result.stages['listen_ms']:8.0f} ms  {result.text!r}")
+    finally:
+        speech.capture.stop()
+        speech.tts.stop()
+        pool_metrics = speech.asr.metrics() if hasattr(speech.asr, "metrics") else None
+        workers_end = worker_rss_mb(speech.asr)
+        if hasattr(speech.asr, "shutdown"):
+            speech.asr.shutdown()  # waits for the workers, so RUSAGE_CHILDREN covers them
+
+    audio_seconds = sum(r.audio_seconds for r in results)
+    asr_seconds = sum(r.stages["asr_ms"] for r in results) / 1000
+    print()
+    print(f"{speech.asr.name} {config.WHISPER_MODEL} ({speech.profile.name} profile): loaded in {load_seconds:.1f} s, "
+          f"streaming {'on' if speech.streamer else 'off'}, VAD {'on' if speech.endpointer else 'off'}")
+    print(f"utterances: {len(results)}, audio {audio_seconds:.1f} s")
+    if pool_metrics:
+        print("ASR pool: " + ", ".join(
+            f"{k} {v:.1f}" if isinstance(v, float) else f"{k} {v}" for k, v in pool_metrics.items()
+        ))
+    print(f"real-time factor (ASR time / audio): {asr_seconds / audio_seconds:.3f}")
+
+    stage_names = sorted({name for r in results for name in r.stages})
+    for name in stage_names:
+        print(f"  {name:<18} {percentiles([r.stages[name] for r in results if name in r.stages])}")
+
+    scored = [r for r in results if r.reference is not None]
+    if scored:
+        errors = sum(word_errors(r.reference, r.text or "") for r in scored)
+        words = sum(len(normalize_words(r.reference)) for r in scored)
+        print(f"word error rate: {errors / max(words, 1):.1%} ({errors} errors / {words} words)")
+    print(f"peak RSS: {peak_rss_mb():.0f} MB (before model {rss_before:.0f} MB, after load {rss_loaded:.0f} MB)")
+    if hasattr(speech.asr, "worker_pids"):
+        # With ASR_WORKERS > 0 the model is loaded in the workers, not in this process
+        line = f"ASR worker RSS: peak {peak_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB per worker"
+        if workers_loaded is not None:
+            line += (f", {workers_loaded:.0f} MB total after load, "
+                     f"{workers_end:.0f} MB at the end ({speech.asr.workers} worker(s))")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,11 +33,37 @@ def default_user_preferences() -> Dict[str, str]:
 class Config:
     # Core Settings
     WHISPER_MODEL: str = "base"
+    ASR_BACKEND: str = "whisper"      # "whisper" or "faster-whisper" (CTranslate2)
+    ASR_PROFILE: str = "command"      # decoding profile: "command" or "dictation"
+    ASR_COMPUTE_TYPE: str = "int8"    # faster-whisper quantization on CPU
+    ASR_CPU_THREADS: int = 0          # faster-whisper threads (0 = all cores, split across workers)
+    ASR_WORKERS: int = 1              # ASR processes, one model each (0 = decode in-process)
     SAMPLE_RATE: int = 16000
     CHUNK_SIZE: int = 1024
     CHANNELS: int = 1
     RECORD_SECONDS: int = 3
+    AUDIO_BUFFER_SECONDS: int = 30  # History kept by the always-on capture thread
+    
+    # Voice activity endpointing (RECORD_SECONDS becomes the no-speech timeout)
+    VAD_ENABLED: bool = True
+    VAD_FRAME_MS: int = 30
+    VAD_TRAILING_SILENCE_MS: int = 700
+    VAD_PRE_ROLL_MS: int = 200
+    VAD_MAX_UTTERANCE_SECONDS: int = 15
+    # Transcribe while the user is still talking (requires VAD)
+    ASR_STREAMING: bool = True
+    ASR_STREAM_STEP_MS: int = 500  # new speech between partial decodes
+    # Interrupt speech when the user talks over it (level above our own echo)
+    TTS_BARGE_IN: bool = True
+    TTS_BARGE_IN_MARGIN_DB: float = 12.0
+    # Fixed phrases (greetings, acknowledgements, errors) rendered once per voice
+    PHRASE_CACHE_ENABLED: bool = True
+    PHRASE_CACHE_DIR: str = "~/.friday/phrase_cache"
     WAKE_WORD: str = "friday"
+    # Keyword spotting gate: enrolled recordings of the wake word (see modules/wake_word.py).
+    # Without templates every utterance goes through Whisper as before.
+    WAKE_WORD_TEMPLATE_DIR: str = "~/.friday/wake_word"
+    WAKE_WORD_THRESHOLD: float = 8.0  # calibrate with `python -m modules.wake_word evaluate`
     VOICE_ID: str = "com.apple.speech.synthesis.voice.karen"
     
     # System Settings
@@ -61,15 +87,48 @@ class Config:
     CONVERSATION_EXPIRY: int = 300  # 5 minutes
     MAX_CONVERSATION_TURNS: int = 5
 
+    # Startup Settings
+    # Components built in the background at startup; everything else loads on first use
+    PREWARM_COMPONENTS: List[str] = field(default_factory=lambda: ["speech", "brain", "personality", "memory"])
+    COMMAND_WORKERS: int = 4  # Threads for blocking handlers, audio and TTS
+
     # Llama Model Settings
     OLLAMA_API: str = "http://localhost:11434/api/generate"  # Ollama API endpoint
     MODEL: str = "llama2:13b"  # Using Llama 2 13B parameter model
     SYSTEM_PROMPT: str = """You are FRIDAY, an AI assistant. Be helpful, concise, and intelligent."""
+    # One pooled HTTP client for every Ollama caller (modules/llm_transport.py)
+    OLLAMA_CONNECT_TIMEOUT: float = 3.0
+    OLLAMA_READ_TIMEOUT: float = 120.0  # per request; generation on CPU is slow
+    OLLAMA_MAX_CONCURRENCY: int = 2
+    OLLAMA_RETRIES: int = 2  # connection errors and 429/5xx only
+    OLLAMA_NUM_CTX: int = 4096
+    OLLAMA_KEEP_ALIVE: str = "30m"  # how long the model stays loaded after a request ("-1" = forever)
+    # Conversation window (modules/context_window.py): prompt budget is OLLAMA_NUM_CTX minus the reply
+    CONTEXT_RESPONSE_TOKENS: int = 512
+    CONTEXT_FACT_TOKENS: int = 256     # memory facts offered to the model
+    CONTEXT_SUMMARY_TOKENS: int = 256  # rolling summary of turns that left the window
+    # Cached answers for AICore and LLM.generate (modules/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_FILE: str = "~/.friday/response_cache.db"
+    RESPONSE_CACHE_TTL: int = 86400  # seconds
+    RESPONSE_CACHE_SIZE: int = 500   # entries, least recently used evicted first
+    RESPONSE_CACHE_EMBED_MODEL: str = ""  # e.g. "nomic-embed-text" to also match near-duplicate prompts
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # cosine similarity a near-duplicate needs
+    # Commands no route or task handles are answered by the LLM, spoken while it streams
+    LLM_FALLBACK: bool = True
 
     # Directories
     PERSONAL_DATA_DIR: str = "~/.friday/personal_data"
     LOGS_DIR: str = "~/.friday/logs"
     
+    # Voice loop latency tracing; a .db/.sqlite path selects the SQLite sink
+    TRACE_ENABLED: bool = True
+    TRACE_FILE: str = "~/.friday/logs/traces.jsonl"
+    NLP_DATA_DIR: str = "~/.friday/nlp_data"  # NLTK/spaCy models live here
+
+    # Only `python -m modules.nlp_resources --download` fetches models unless this is set
+    NLP_ALLOW_DOWNLOADS: bool = False
+    
     # Application settings
     APP_PATHS: Dict[str, str] = field(default_factory=lambda: {
         "safari": "/Applications/Safari.app",
@@ -1,41 +1,64 @@
-import requests
 import json
-from typing import Dict, Tuple, Any
+from typing import Dict, Iterator, Tuple, Any
 import logging
+from modules.llm_transport import LLMTransportError, shared_transport, DEFAULT_OLLAMA_API
+from modules.response_cache import shared_cache
 
 class AICore:
-    def __init__(self):
-        self.api_url = "http://localhost:11434/api/generate"
-        self.model = "llama2:13b"
+    def __init__(self, config=None):
+        self.api_url = config.OLLAMA_API if config else DEFAULT_OLLAMA_API
+        self.model = config.MODEL if config else "llama2:13b"
+        # Same num_ctx as every other caller, or Ollama reloads the model when they alternate
+        self.options = {"num_ctx": config.OLLAMA_NUM_CTX if config else 4096}
+        self.transport = shared_transport(config)
+        self.cache = shared_cache(config)
         self.context_memory = {}
         self.logger = logging.getLogger('FRIDAY.AICore')
 
-    def process_natural_language(self, text: str) -> Tuple[str, Dict[str, Any]]:
-        """Process text and return response with basic sentiment analysis"""
+    def process_natural_language(self, text: str, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+        """Process text and return response with basic sentiment analysis
+
+        use_cache=False skips the response cache lookup for this call.
+        """
         try:
-            response = self._generate_response(text)
+            response = self._generate_response(text, use_cache)
             emotion = self._analyze_sentiment(text)
             return response, emotion
         except Exception as e:
             self.logger.error(f"Error processing text: {e}")
             return "I encountered an error processing that.", {"sentiment": "neutral"}
 
-    def _generate_response(self, prompt: str) -> str:
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        # keep_alive is added by the shared transport
+        return {"model": self.model, "prompt": prompt, "options": self.options}
+
+    def _generate_response(self, prompt: str, use_cache: bool = True) -> str:
         """Generate response using Ollama API"""
+        if self.cache is not None:
+            cached = self.cache.get(prompt, self.model, self.options, bypass=not use_cache)
+            if cached is not None:
+                return cached
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            response.raise_for_status()
-            return response.json()["response"]
-        except requests.exceptions.RequestException as e:
+            response = self.transport.post({**self._payload(prompt), "stream": False})["response"]
+        except LLMTransportError as e:
             self.logger.error(f"Ollama API error: {e}")
             return "I'm having trouble accessing my language model."
+        if self.cache is not None:
+            self.cache.put(prompt, self.model, self.options, response)
+        return response
+
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """Like _generate_response, but yields tokens as Ollama produces them"""
+        produced = False
+        try:
+            for chunk in self.transport.stream(self._payload(prompt)):
+                if chunk.get("response"):
+                    produced = True
+                    yield chunk["response"]
+        except LLMTransportError as e:
+            self.logger.error(f"Ollama API error: {e}")
+            if not produced:
+                yield "I'm having trouble accessing my language model."
 
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Basic sentiment analysis using keyword matching"""
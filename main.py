@@ -1,24 +1,24 @@
 # main.py
+import os
 import sys
 import time
 import random
 import logging
 import asyncio
+import socketserver
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from modules.speech import Speech
-from modules.tasks import TaskManager
-from modules.memory import Memory
-from modules.mac_automation import MacAutomation
-from modules.personality import Personality
-from modules.brain import Brain
+from typing import Dict, List, Any, Iterable, Optional, TextIO, Tuple, Union
 from config import Config
-from features.ai_core import AICore
-from features.system_control import SystemController
-from features.home_automation import HomeAutomation
-from features.vision import VisionSystem  # Add this import
-from modules.communication_manager import CommunicationManager
-from modules.web_assistant import WebAssistant
+from modules.component_registry import ComponentRegistry, LazyComponent
+from modules.command_router import CommandRouter, Route, RouteExplanation
+from modules.intent_engine import ParsedCommand
+from modules.command_registry import (
+    CommandRegistry, LATENCY_INSTANT, LATENCY_FAST, LATENCY_SLOW, LATENCY_BACKGROUND
+)
+from modules.tts_worker import PRIORITY_URGENT, PRIORITY_NORMAL, PRIORITY_LOW
+from modules.tracing import Tracer, Trace, open_sink
 
 # Remove unused imports and simplify warnings
 import warnings
@@ -41,9 +41,38 @@ class InteractionLogger:
         # Implement logging logic
         pass
 
+ERROR_PHRASE = "I encountered an error. Please try again."
+LLM_UNAVAILABLE_PHRASE = "I'm having trouble accessing my language model."
+SHUTDOWN_PHRASE = "Shutting down. Goodbye!"
+
+# Commands mentioning one of these go to the Mac automation routes
+MAC_COMMAND_KEYWORDS = ("workspace", "window", "screen", "system")
+
+# Never initialized in headless mode: audio devices, browser driver, camera
+HEADLESS_DISABLED = ("speech", "web_assistant", "vision_system")
+
 # Fix FRIDAY class inheritance
 class FRIDAY:
-    def __init__(self):
+    # Subsystems are created on first access through self.components
+    speech = LazyComponent()
+    tasks = LazyComponent()
+    memory = LazyComponent()
+    mac = LazyComponent()
+    personality = LazyComponent()
+    brain = LazyComponent()
+    ai_core = LazyComponent()
+    system_controller = LazyComponent()
+    vision_system = LazyComponent()
+    home_automation = LazyComponent()
+    comm_manager = LazyComponent()
+    web_assistant = LazyComponent()
+    personal_memory = LazyComponent()
+    interaction_logger = LazyComponent()
+    llm = LazyComponent()
+
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        
         # Load configuration
         self.config = Config.load()
         
@@ -55,22 +84,25 @@ class FRIDAY:
         )
         self.logger = logging.getLogger('FRIDAY')
         
-        # Initialize components
+        # Register components; nothing heavy is imported or built here
         try:
-            self.speech = Speech(self.config)
-            self.tasks = TaskManager(self.config)
-            self.memory = Memory(self.config)
-            self.mac = MacAutomation(self.config)
-            self.personality = Personality(self.config)
-            self.brain = Brain(self.config)
-            self.ai_core = AICore()
-            self.system_controller = SystemController()
-            self.vision_system = VisionSystem()
-            self.home_automation = HomeAutomation()
-            self.comm_manager = CommunicationManager(self.config)
-            self.web_assistant = WebAssistant(self.config)
-            self.personal_memory = PersonalMemory(self.config)
-            self.interaction_logger = InteractionLogger(self.config)
+            self.components = ComponentRegistry()
+            self._register_components()
+            if headless:
+                self.components.disable(HEADLESS_DISABLED, "headless mode")
+            
+            # Every command intent with its handler and metadata, built once
+            self.commands = CommandRegistry()
+            self._register_commands()
+            self.router = CommandRouter(self._build_routes())
+            self.router.compile()
+            self.last_route: Optional[str] = None
+            
+            # Per-interaction stage timings (python -m modules.tracing for percentiles)
+            self.tracer = Tracer(open_sink(self.config.TRACE_FILE) if self.config.TRACE_ENABLED else None)
+            
+            # Automations still running on the event loop
+            self._background: Dict[Future, str] = {}
             
             self.startup_phrases = [
                 "Systems online. Ready to assist.",
@@ -86,84 +118,291 @@ class FRIDAY:
                 "Ready for your command", "Waiting for instruction"
             ]
             
+            # Warm up the components we know the voice loop needs
+            self.components.prewarm(self.config.PREWARM_COMPONENTS)
+            
             self.logger.info("FRIDAY initialized successfully")
         except Exception as e:
             self.logger.error(f"Error during initialization: {e}")
             raise
 
+    def _register_components(self):
+        """Register factories for every subsystem"""
+        register = self.components.register_class
+        register('speech', 'modules.speech', 'Speech', self.config)
+        register('tasks', 'modules.tasks', 'TaskManager', self.config)
+        register('memory', 'modules.memory', 'Memory', self.config)
+        register('mac', 'modules.mac_automation', 'MacAutomation', self.config)
+        register('personality', 'modules.personality', 'Personality', self.config)
+        register('brain', 'modules.brain', 'Brain', self.config)
+        register('ai_core', 'features.ai_core', 'AICore', self.config)
+        register('system_controller', 'features.system_control', 'SystemController')
+        register('vision_system', 'features.vision', 'VisionSystem')
+        register('home_automation', 'features.home_automation', 'HomeAutomation')
+        register('comm_manager', 'modules.communication_manager', 'CommunicationManager', self.config)
+        register('web_assistant', 'modules.web_assistant', 'WebAssistant', self.config)
+        register('llm', 'modules.llm', 'EnhancedLLM', self.config)
+        self.components.register('personal_memory', lambda: PersonalMemory(self.config))
+        self.components.register('interaction_logger', lambda: InteractionLogger(self.config))
+
+    def startup_report(self) -> str:
+        """Per-component init time and RSS for everything loaded so far"""
+        return self.components.startup_report()
+
     def run(self):
         """Main run loop for FRIDAY"""
+        asyncio.run(self._run_async())
+
+    def run_headless(self, lines: Iterable[str], out: TextIO = sys.stdout) -> int:
+        """Run text commands through handle_command, one response line each
+
+        Blank lines and lines starting with # are skipped. Async automations
+        run to completion before the next command since no event loop is
+        attached. Returns the number of commands handled.
+        """
+        count = 0
+        try:
+            for line in lines:
+                command = line.strip()
+                if not command or command.startswith("#"):
+                    continue
+                response = self.handle_command(command)
+                # Keep the one-line-per-command framing for multi-line responses
+                out.write(str(response).replace("\n", "\\n") + "\n")
+                out.flush()
+                count += 1
+        finally:
+            self._shutdown_headless()
+        return count
+
+    def serve_socket(self, path: str) -> None:
+        """Answer newline-delimited commands on a Unix socket until interrupted"""
+        friday = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                out = self.wfile
+                for raw in self.rfile:
+                    command = raw.decode("utf-8", errors="replace").strip()
+                    if not command or command.startswith("#"):
+                        continue
+                    response = str(friday.handle_command(command)).replace("\n", "\\n")
+                    out.write((response + "\n").encode("utf-8"))
+                    out.flush()
+
+        path = os.path.expanduser(path)
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        self.logger.info(f"Serving headless commands on {path}")
         try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.unlink(path)
+            self._shutdown_headless()
+
+    def _shutdown_headless(self) -> None:
+        if self.components.is_loaded('memory'):
+            self.memory.save()
+        self.logger.info(f"Headless session done. Startup report:\n{self.startup_report()}")
+
+    async def _run_async(self):
+        """Voice loop hosted on one long-lived event loop
+
+        Blocking work (audio, TTS, command handlers) runs on a thread pool so
+        background automations keep running on the loop between commands.
+        """
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=self.config.COMMAND_WORKERS,
+            thread_name_prefix='friday-worker'
+        ))
+        self.commands.attach_loop(loop)
+        offload = self._offload
+        try:
+            # Fixed phrases play from pre-rendered audio once rendered
+            self.speech.prerender(self.startup_phrases + self.acknowledgments +
+                                 [ERROR_PHRASE, SHUTDOWN_PHRASE, LLM_UNAVAILABLE_PHRASE])
+
+            # Load the model while greeting so the first question doesn't wait for it
+            if self.config.LLM_FALLBACK:
+                loop.run_in_executor(None, lambda: self.llm.preload())
+
             # Startup greeting
             startup_msg = random.choice(self.startup_phrases)
-            self.speech.speak(startup_msg)
+            await self._speak(startup_msg)
+            self.logger.info(f"Startup report:\n{self.startup_report()}")
             
             while True:
                 try:
-                    # Listen for wake word
-                    text = self.speech.listen_and_transcribe()
-                    
-                    if text:
-                        print(f"\nYou said: {text}")
-                    
-                    if text and self.config.WAKE_WORD.lower() in text.lower():
-                        # Acknowledge wake word
-                        self.speech.speak(random.choice(self.acknowledgments))
-                        
-                        # Listen for command
-                        command = self.speech.listen_and_transcribe()
-                        
-                        if command:
-                            print(f"You said: {command}")
-                            # Process command through brain for understanding
-                            intent, entities, confidence = self.brain.process_input(command)
-                            
-                            # Execute command
-                            response = self.handle_command(command)
-                            
-                            # Add personality to response
-                            context = self.brain.get_conversation_context()
-                            personalized_response = self.personality.generate_response(response, context)
-                            
-                            # Speak response
-                            self.speech.speak(personalized_response)
-                            print(f"Friday: {personalized_response}")
-                            
-                            # Store in memory
-                            self.memory.add_interaction(command, personalized_response)
-                            
-                            # Check if we should continue conversation
-                            if self.brain.should_continue_conversation():
-                                follow_up = self.speech.listen_and_transcribe()
-                                if follow_up:
-                                    self.handle_command(follow_up)
+                    # Listen for wake word (keyword spotting; Whisper only once it is heard)
+                    detected, heard = await offload(self.speech.wait_for_wake_word)
+                    if heard:
+                        print(f"\nYou said: {heard}")
+                    if detected:
+                        with self.tracer.start("interaction") as trace:
+                            trace.record("wake_word", self.speech.last_timings.get("wake_ms", 0.0))
+                            await self._interact(trace)
                                     
-                except KeyboardInterrupt:
-                    self.speech.speak("Shutting down. Goodbye!")
+                except (KeyboardInterrupt, asyncio.CancelledError):
+                    self.speech.speak(SHUTDOWN_PHRASE, PRIORITY_URGENT)
                     break
                 except Exception as e:
                     self.logger.error(f"Error in main loop: {e}")
-                    self.speech.speak("I encountered an error. Please try again.")
+                    await self._speak(ERROR_PHRASE, PRIORITY_URGENT)
                     
         finally:
+            if self._background:
+                self.logger.info(f"Cancelling {len(self._background)} background automation(s)")
+            await self.commands.cancel_pending()
+            self.commands.detach_loop()
             # Save any pending data
-            self.memory.save()
+            if self.components.is_loaded('memory'):
+                self.memory.save()
             self.config.save()
             self.logger.info("FRIDAY shutdown complete")
 
-    def handle_command(self, command: str) -> str:
+    async def _interact(self, trace: Trace) -> None:
+        """One wake-word interaction, each stage timed as a span of trace"""
+        offload = self._offload
+        
+        # Acknowledge wake word
+        with trace.span("tts_ack"):
+            await self._speak(random.choice(self.acknowledgments))
+        
+        # Listen for command
+        command = await offload(self.speech.listen_and_transcribe, self._show_partial)
+        timings = self.speech.last_timings
+        trace.record("capture", timings["capture_ms"])
+        trace.record("asr", timings["asr_ms"])
+        
+        if not command:
+            trace.attrs["outcome"] = "no_command"
+            return
+        
+        print(f"\rYou said: {command}")
+        # Parse once; routing, handlers, personality and memory all reuse it
+        with trace.span("brain.parse") as span:
+            parsed = await offload(self.brain.parse, command)
+            span["intent"] = parsed.intent
+        
+        # Nothing handles it locally: let the LLM answer, spoken as it streams
+        if self.config.LLM_FALLBACK and self._is_open_question(parsed):
+            await self._answer_with_llm(parsed, trace)
+            return
+        
+        # Execute command
+        with trace.span("handle_command") as span:
+            response = await offload(self.handle_command, parsed)
+            span["route"] = self.last_route
+        
+        # Add personality to response
+        with trace.span("personality.generate_response"):
+            context = self.brain.get_conversation_context()
+            personalized_response = self.personality.generate_response(response, context)
+        
+        # Speak response while we finish up the turn
+        with trace.span("tts_reply") as span:
+            spoken = self.speech.say(personalized_response)
+            print(f"Friday: {personalized_response}")
+            
+            # Store in memory
+            with trace.span("memory.add_interaction"):
+                self.memory.add_interaction(parsed, personalized_response)
+            span["completed"] = await asyncio.wrap_future(spoken)
+        
+        # Check if we should continue conversation
+        if self.brain.should_continue_conversation():
+            with trace.span("follow_up"):
+                follow_up = await offload(self.speech.listen_and_transcribe)
+                if follow_up:
+                    await offload(self.handle_command, await offload(self.brain.parse, follow_up))
+
+    def _is_open_question(self, parsed: ParsedCommand) -> bool:
+        """No route matches and the task manager has no handler for the first word"""
+        if not parsed.tokens or self.router.candidates(parsed.normalized):
+            return False
+        return self._task_intent(parsed) not in self.commands
+
+    async def _answer_with_llm(self, parsed: ParsedCommand, trace: Trace) -> None:
+        """Speak the LLM's answer a sentence at a time while it is generated"""
+        from modules.llm_transport import LLMTransportError
+        self.last_route = 'llm'
+        with trace.span("llm.answer") as span:
+            try:
+                reply = await self.speech.say_stream(self.llm.stream_async(parsed.text, self.memory.facts()))
+            except LLMTransportError as e:
+                self.logger.error(f"LLM unavailable: {e}")
+                span["error"] = type(e).__name__
+                await self._speak(LLM_UNAVAILABLE_PHRASE)
+                return
+            span.update(sentences=reply.sentences, completed=reply.completed,
+                        first_token_ms=reply.first_token_ms, first_audio_ms=reply.first_audio_ms)
+        if reply.first_audio_ms is not None:
+            # Time to first audio as its own stage, for python -m modules.tracing
+            trace.record("llm.first_audio", reply.first_audio_ms,
+                         end=reply.started_at + reply.first_audio_ms / 1000)
+        heard = reply.text
+        if not reply.completed:
+            # Cut off by the user: the next turn should only know what was said
+            heard = reply.spoken_text
+            self.llm.revise_last_response(heard)
+        print(f"Friday: {heard}")
+        with trace.span("memory.add_interaction"):
+            self.memory.add_interaction(parsed, heard)
+
+    def _show_partial(self, partial) -> None:
+        """Echo the command as it is being transcribed"""
+        print(f"\rHearing: {partial.text}", end="", flush=True)
+
+    async def _speak(self, text: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """Speak without occupying an executor thread; False if the user cut us off"""
+        return await asyncio.wrap_future(self.speech.say(text, priority))
+
+    async def _offload(self, func, *args):
+        """Run a blocking call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+    def _track_background(self, name: str, future: Future) -> str:
+        """Remember a running automation and acknowledge it straight away"""
+        label = name.replace("_", " ")
+        self._background[future] = label
+        future.add_done_callback(lambda f: self._announce_background(self._background.pop(f, label), f))
+        return f"Working on {label} in the background. I'll let you know when it's done."
+
+    def _announce_background(self, label: str, future: Future) -> None:
+        """Done-callback: queue the result for speaking as soon as the automation finishes"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        result = None if error else future.result()
+        if error or (isinstance(result, dict) and not result.get("success", True)):
+            reason = error or result.get("error", "unknown error")
+            self.logger.error(f"Background {label} failed: {reason}")
+            message = f"{label.capitalize()} failed: {reason}"
+        else:
+            message = f"{label.capitalize()} is done."
+        print(f"Friday: {message}")
+        self.speech.say(message, PRIORITY_LOW)
+
+    def handle_command(self, command: Union[str, ParsedCommand]) -> str:
+        """Run a command; text is parsed here, a ParsedCommand is used as is"""
+        parsed = command if isinstance(command, ParsedCommand) else ParsedCommand.from_text(command)
         try:
             # Process command
-            response = self._base_handle_command(command)
+            response = self._base_handle_command(parsed)
             
             # Log the interaction
-            self.interaction_logger.log_command(command, True, response)
+            self.interaction_logger.log_command(parsed.text, True, response)
             
             # Learn from interaction
             self.personal_memory.learn_from_interaction({
                 'topic': 'command_execution',
                 'data': {
-                    'command': command,
+                    'command': parsed.text,
+                    'intent': parsed.intent,
                     'response': response,
                     'context': self.brain.get_conversation_context()
                 },
@@ -174,58 +413,180 @@ class FRIDAY:
             return response
             
         except Exception as e:
-            self.interaction_logger.log_command(command, False, str(e))
+            self.interaction_logger.log_command(parsed.text, False, str(e))
             return f"Error: {str(e)}"
 
-    def _base_handle_command(self, command: str) -> str:
+    def _base_handle_command(self, parsed: ParsedCommand) -> str:
         """Base handle_command implementation"""
         try:
-            cmd = command.lower().strip()
-            
-            # Improve workspace setup command recognition
-            if any(phrase in cmd for phrase in ["setup workspace", "set up workspace", "setup development", "setup coding"]):
-                return self.mac.workspace_management("coding")
-                
-            # Add workspace setup handling
-            if "setup" in cmd and "workspace" in cmd:
-                if "coding" in cmd or "development" in cmd:
-                    return self.mac.workspace_management("coding")
-                elif "writing" in cmd:
-                    return self.mac.workspace_management("writing")
-                elif "research" in cmd:
-                    return self.mac.workspace_management("research")
-                return "Please specify workspace type (coding, writing, or research)"
-            
-            # Add brightness control
-            if "brightness" in cmd:
-                if any(word in cmd for word in ["increase", "up", "higher"]):
-                    return self.mac.adjust_brightness("increase")
-                elif any(word in cmd for word in ["decrease", "down", "lower"]):
-                    return self.mac.adjust_brightness("decrease")
-            
-            # Check for open application commands
-            if cmd.startswith(("open ", "launch ", "start ")):
-                app_name = self._extract_app_name(cmd)
-                if app_name:
-                    result = self.mac.open_application(app_name)
-                    return result
-                return "Please specify which application to open"
-                
-            # Process the command
-            if "email" in cmd:
-                return self._handle_email_command(cmd)
-            elif any(term in cmd for term in ["search", "look up", "find"]):
-                return self._handle_web_search(cmd)
-            elif any(keyword in cmd for keyword in ["workspace", "window", "screen", "system"]):
-                return self._handle_mac_command(cmd)
-            else:
-                return self.tasks.execute_command(command)
+            # One pass over the command picks the highest-priority route
+            route, response = self.router.dispatch(parsed.normalized, parsed)
+            self.last_route = route.name if route is not None else 'task_command'
+            if route is not None:
+                if isinstance(response, Future):
+                    return self._track_background(route.name, response)
+                return response
+            return self._run_task(parsed)
                 
         except Exception as e:
             self.logger.error(f"Error handling command: {e}")
             return f"I encountered an error: {str(e)}"
 
-    def _handle_email_command(self, command: str) -> str:
+    @staticmethod
+    def _task_intent(parsed: ParsedCommand) -> str:
+        """TaskManager commands are keyed by their first word"""
+        words = parsed.normalized.split()
+        return f"tasks.{words[0]}" if words else "tasks."
+
+    def _run_task(self, parsed: ParsedCommand) -> str:
+        """No route matched: run the TaskManager command through the registry"""
+        intent = self._task_intent(parsed)
+        if intent not in self.commands:
+            return f"Command '{intent[len('tasks.'):]}' not recognized"
+        try:
+            return self.commands.invoke(intent, parsed.text)
+        except Exception as e:
+            self.logger.error(f"Error executing {intent}: {e}")
+            return f"Error executing command: {str(e)}"
+
+    def explain_command(self, command: str) -> List[RouteExplanation]:
+        """Show which routing patterns fire for a command and which route wins"""
+        return self.router.explain(command.lower().strip())
+
+    def _register_commands(self):
+        """Register component action tables; handlers bind on first use"""
+        from modules.mac_automation import MacAutomation
+        from modules.tasks import TaskManager
+        self.commands.register_component('mac', MacAutomation, lambda: self.mac)
+        self.commands.register_component('tasks', TaskManager, lambda: self.tasks)
+
+    def _route(self, name: str, patterns: Tuple[str, ...], handler, priority: int,
+               latency: str = LATENCY_FAST, side_effects: bool = True, is_async: bool = False,
+               **options) -> Route:
+        """Register a route handler as intent friday.<name> and build its Route"""
+        intent = f"friday.{name}"
+        self.commands.register(intent, handler, latency=latency, side_effects=side_effects,
+                               source='friday', is_async=is_async)
+        return Route(name, patterns, self.commands.invoker(intent), priority, **options)
+
+    def _build_routes(self) -> List[Route]:
+        """Routing table for _base_handle_command, in priority order
+
+        Routes gated on MAC_COMMAND_KEYWORDS only fire when the command mentions
+        one of them; a handler returning None falls through to the next route.
+        """
+        mac = MAC_COMMAND_KEYWORDS
+        route = self._route
+        return [
+            # Workspace setup
+            route("workspace_coding", ("setup workspace", "set up workspace", "setup development", "setup coding"),
+                  lambda cmd, parsed: self.mac.workspace_management("coding"), 10, latency=LATENCY_SLOW),
+            route("workspace_setup", ("setup",), self._route_workspace_setup, 20, latency=LATENCY_SLOW,
+                  requires=("workspace",)),
+            
+            # Brightness control
+            route("brightness", ("brightness",), self._route_brightness, 30),
+            
+            # Open application commands
+            route("open_application", ("open ", "launch ", "start "), self._route_open_application, 40,
+                  latency=LATENCY_SLOW, prefix=True),
+            
+            route("email", ("email",), self._handle_email_command, 50, latency=LATENCY_SLOW),
+            route("web_search", ("search", "look up", "find"), self._handle_web_search, 60,
+                  latency=LATENCY_SLOW, side_effects=False),
+            
+            # Development workflow commands
+            route("setup_project", ("setup project",), self._route_setup_project, 70,
+                  latency=LATENCY_BACKGROUND, is_async=True, requires_any=mac),
+            route("review_pr", ("review pr",), self._route_review_pr, 71,
+                  latency=LATENCY_BACKGROUND, is_async=True, requires_any=mac),
+            route("prepare_meeting", ("prepare meeting",),
+                  lambda cmd, parsed: self.mac.meeting_preparation(self._get_next_meeting()), 72,
+                  latency=LATENCY_BACKGROUND, is_async=True, requires_any=mac),
+            route("start_dev", ("start dev",),
+                  lambda cmd, parsed: self.mac.start_development_environment(parsed.slots.get("path")), 73,
+                  latency=LATENCY_BACKGROUND, is_async=True, requires_any=mac),
+            route("cleanup_system", ("cleanup system",), lambda cmd, parsed: self.mac.deep_system_cleanup(), 74,
+                  latency=LATENCY_BACKGROUND, is_async=True, requires_any=mac),
+            
+            # Quick actions
+            route("screenshot", ("take screenshot",), lambda cmd, parsed: self.mac.quick_actions("screenshot_area"), 80,
+                  requires_any=mac),
+            route("lock_screen", ("lock screen",), lambda cmd, parsed: self.mac.quick_actions("lock_screen"), 81,
+                  requires_any=mac),
+            
+            # Smart automation sequences
+            route("start_work", ("start work",), lambda cmd, parsed: self.mac.smart_automation("start_work", {
+                "apps": ["Mail", "Slack", "Chrome"],
+                "workspace": "coding"
+            }), 82, latency=LATENCY_SLOW, requires_any=mac),
+            route("end_work", ("end work",), lambda cmd, parsed: self.mac.smart_automation("end_work", {
+                "clean_downloads": True
+            }), 83, latency=LATENCY_SLOW, requires_any=mac),
+            route("focus_mode", ("focus mode",), lambda cmd, parsed: self.mac.smart_automation("focus_mode", {
+                "duration": 25,
+                "focus_type": "coding"
+            }), 84, latency=LATENCY_SLOW, requires_any=mac),
+            route("break_time", ("break time",), lambda cmd, parsed: self.mac.smart_automation("break_time", {
+                "duration": 5
+            }), 85, requires_any=mac),
+            
+            # Window management
+            route("minimize", ("minimize",), lambda cmd, parsed: self._route_window("minimize", parsed), 86, requires_any=mac),
+            route("maximize", ("maximize",), lambda cmd, parsed: self._route_window("maximize", parsed), 87, requires_any=mac),
+            
+            # System controls
+            route("dark_mode", ("dark mode",), lambda cmd, parsed: self.mac.quick_actions("toggle_dark_mode"), 88,
+                  requires_any=mac),
+            route("do_not_disturb", ("do not disturb",),
+                  lambda cmd, parsed: self.mac.toggle_do_not_disturb(parsed.has_any("on", "enable")), 89, requires_any=mac),
+            
+            route("mac_unknown", mac, lambda cmd, parsed: "I'm not sure how to handle that command", 99,
+                  latency=LATENCY_INSTANT, side_effects=False),
+        ]
+
+    def _route_workspace_setup(self, cmd: str, parsed: ParsedCommand) -> str:
+        if "coding" in cmd or "development" in cmd:
+            return self.mac.workspace_management("coding")
+        elif "writing" in cmd:
+            return self.mac.workspace_management("writing")
+        elif "research" in cmd:
+            return self.mac.workspace_management("research")
+        return "Please specify workspace type (coding, writing, or research)"
+
+    def _route_brightness(self, cmd: str, parsed: ParsedCommand) -> Optional[str]:
+        if parsed.has_any("increase", "up", "higher"):
+            return self.mac.adjust_brightness("increase")
+        elif parsed.has_any("decrease", "down", "lower"):
+            return self.mac.adjust_brightness("decrease")
+        return None
+
+    def _route_open_application(self, cmd: str, parsed: ParsedCommand) -> str:
+        app_name = parsed.slots.get("app")
+        if app_name:
+            return self.mac.open_application(app_name)
+        return "Please specify which application to open"
+
+    def _route_setup_project(self, cmd: str, parsed: ParsedCommand):
+        project_type = "react" if parsed.has_any("react") else "python"
+        # Project names keep their case, dashes and underscores, so not a token
+        name = parsed.text.split()[-1]
+        return self.mac.create_project_scaffold(project_type, name)
+
+    def _route_review_pr(self, cmd: str, parsed: ParsedCommand):
+        # The repo URL is not a word token, so split on whitespace here
+        parts = cmd.split()
+        repo_url = parts[-2]
+        pr_number = parts[-1]
+        return self.mac.code_review_setup(repo_url, pr_number)
+
+    def _route_window(self, action: str, parsed: ParsedCommand) -> Optional[str]:
+        app_name = parsed.slots.get("app")
+        if app_name:
+            return self.mac.manage_windows(action, app_name)
+        return None
+
+    def _handle_email_command(self, command: str, parsed: ParsedCommand) -> str:
         """Handle email-related commands"""
         try:
             # Check if it's a read email command
@@ -238,11 +599,11 @@ class FRIDAY:
                 return f"Error checking emails: {email_status['error']}"
 
             # Extract recipient and context
-            recipient = self._extract_recipient(command)
+            recipient = parsed.slots.get("recipient", "")
             context = {
                 'recipient': recipient,
                 'intent': 'absence' if 'won\'t' in command or 'not coming' in command else 'general',
-                'reason': self._extract_reason(command)
+                'reason': parsed.slots.get("reason", "personal reasons")
             }
             
             # Compose email
@@ -259,11 +620,10 @@ class FRIDAY:
             self.logger.error(f"Error handling email command: {e}")
             return f"Error processing email command: {str(e)}"
 
-    def _handle_web_search(self, command: str) -> str:
+    def _handle_web_search(self, command: str, parsed: ParsedCommand) -> str:
         """Handle web search commands"""
         try:
-            # Extract search query
-            query = command.replace("search", "").replace("look up", "").replace("find", "").strip()
+            query = parsed.slots.get("query", "")
             
             # Perform search
             results = self.web_assistant.search_and_summarize(query)
@@ -276,129 +636,6 @@ class FRIDAY:
             self.logger.error(f"Error handling web search: {e}")
             return f"Error processing web search: {str(e)}"
 
-    def _extract_recipient(self, command: str) -> str:
-        """Extract recipient name from command"""
-        # Basic extraction - can be enhanced with NLP
-        words = command.split()
-        if "to" in words:
-            idx = words.index("to")
-            if idx + 1 < len(words):
-                return words[idx + 1]
-        return ""
-
-    def _extract_reason(self, command: str) -> str:
-        """Extract reason from command"""
-        # Basic extraction - can be enhanced with NLP
-        if "because" in command:
-            return command.split("because")[1].strip()
-        return "personal reasons"
-
-    def _handle_mac_command(self, command: str) -> str:
-        """Handle Mac-specific commands"""
-        try:
-            # Development workflow commands
-            if "setup project" in command:
-                project_type = "react" if "react" in command else "python"
-                name = command.split()[-1]
-                return asyncio.run(self.mac.create_project_scaffold(project_type, name))
-                
-            # Code review workflow
-            elif "review pr" in command:
-                parts = command.split()
-                repo_url = parts[-2]
-                pr_number = parts[-1]
-                return asyncio.run(self.mac.code_review_setup(repo_url, pr_number))
-                
-            # Meeting preparation
-            elif "prepare meeting" in command:
-                calendar_event = self._get_next_meeting()
-                return asyncio.run(self.mac.meeting_preparation(calendar_event))
-                
-            # Development environment
-            elif "start dev" in command:
-                project_path = self._extract_project_path(command)
-                return asyncio.run(self.mac.start_development_environment(project_path))
-                
-            # System maintenance
-            elif "cleanup system" in command:
-                return asyncio.run(self.mac.deep_system_cleanup())
-                
-            # Fall back to existing simple commands
-            return self._handle_basic_mac_command(command)
-            
-        except Exception as e:
-            self.logger.error(f"Error in Mac command handling: {e}")
-            return f"I encountered an error: {str(e)}"
-
-    def _handle_basic_mac_command(self, command: str) -> str:
-        """Handle basic Mac commands (existing implementation)"""
-        # Workspace commands
-        if "setup workspace" in command:
-            if "coding" in command:
-                return self.mac.workspace_management("coding")
-            elif "writing" in command:
-                return self.mac.workspace_management("writing")
-            elif "research" in command:
-                return self.mac.workspace_management("research")
-                
-        # Quick actions
-        if "take screenshot" in command:
-            return self.mac.quick_actions("screenshot_area")
-        elif "lock screen" in command:
-            return self.mac.quick_actions("lock_screen")
-            
-        # Smart automation sequences
-        if "start work" in command:
-            return self.mac.smart_automation("start_work", {
-                "apps": ["Mail", "Slack", "Chrome"],
-                "workspace": "coding"
-            })
-        elif "end work" in command:
-            return self.mac.smart_automation("end_work", {
-                "clean_downloads": True
-            })
-        elif "focus mode" in command:
-            return self.mac.smart_automation("focus_mode", {
-                "duration": 25,
-                "focus_type": "coding"
-            })
-        elif "break time" in command:
-            return self.mac.smart_automation("break_time", {
-                "duration": 5
-            })
-
-        # Window management
-        if "minimize" in command:
-            app_name = self._extract_app_name(command)
-            if app_name:
-                return self.mac.manage_windows("minimize", app_name)
-        elif "maximize" in command:
-            app_name = self._extract_app_name(command)
-            if app_name:
-                return self.mac.manage_windows("maximize", app_name)
-
-        # System controls
-        if "dark mode" in command:
-            return self.mac.quick_actions("toggle_dark_mode")
-        elif "do not disturb" in command:
-            enable = "on" in command or "enable" in command
-            return self.mac.toggle_do_not_disturb(enable)
-
-        return "I'm not sure how to handle that command"
-
-    def _extract_app_name(self, command: str) -> Optional[str]:
-        """Extract application name from command"""
-        # Remove command words
-        for prefix in ["open", "launch", "start"]:
-            command = command.replace(prefix, "")
-            
-        # Clean and get the app name
-        app_name = command.strip()
-        
-        if app_name:
-            return app_name
-        return None
-
     def _get_next_meeting(self) -> Dict[str, Any]:
         """Get next meeting details from calendar"""
         try:
@@ -422,12 +659,32 @@ class FRIDAY:
             return {}
 
 if __name__ == "__main__":
-    friday = FRIDAY()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FRIDAY voice assistant")
+    parser.add_argument("--headless", action="store_true",
+                        help="read commands from stdin and print responses; no audio, browser or camera")
+    parser.add_argument("--file", help="run the commands in FILE headless, one per line")
+    parser.add_argument("--socket", help="serve headless commands on a Unix socket at this path")
+    args = parser.parse_args()
+    headless = args.headless or bool(args.file) or bool(args.socket)
+
+    # Headless stdout carries only responses
+    status = sys.stderr if headless else sys.stdout
+    friday = FRIDAY(headless=headless)
     try:
-        friday.run()
+        if args.socket:
+            friday.serve_socket(args.socket)
+        elif args.file:
+            with open(args.file) as f:
+                friday.run_headless(f)
+        elif headless:
+            friday.run_headless(sys.stdin)
+        else:
+            friday.run()
     except KeyboardInterrupt:
-        print("\nShutting down FRIDAY...")
+        print("\nShutting down FRIDAY...", file=status)
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=status)
     finally:
-        print("Goodbye!")
\ No newline at end of file
+        print("Goodbye!", file=status)
\ No newline at end of file
@@ -1,11 +1,19 @@
-from .speech import Speech
-from .tasks import TaskManager
-from .memory import Memory
-from .mac_automation import MacAutomation
-from .personality import Personality
-from .brain import Brain
-from .communication_manager import CommunicationManager
-from .web_assistant import WebAssistant
+import importlib
+
+# Public classes and the submodule that defines each one. Submodules are only
+# imported on first attribute access so that `import modules` (or importing a
+# single light submodule such as modules.memory) does not pull in whisper,
+# spacy, nltk, selenium or the macOS automation libraries.
+_LAZY_ATTRS = {
+    'Speech': '.speech',
+    'TaskManager': '.tasks',
+    'Memory': '.memory',
+    'MacAutomation': '.mac_automation',
+    'Personality': '.personality',
+    'Brain': '.brain',
+    'CommunicationManager': '.communication_manager',
+    'WebAssistant': '.web_assistant'
+}
 
 __all__ = [
     'Speech',
@@ -17,3 +25,17 @@ __all__ = [
     'CommunicationManager',
     'WebAssistant'
 ]
+
+
+def __getattr__(name):
+    module_path = _LAZY_ATTRS.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_path, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,138 @@
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Type
+import numpy as np
+
+
+@dataclass(frozen=True)
+class DecodingProfile:
+    """Decoding settings shared by every backend"""
+    name: str
+    language: Optional[str] = "en"          # None = auto-detect (costs an extra pass)
+    beam_size: Optional[int] = None         # None = greedy
+    best_of: Optional[int] = None
+    temperatures: Tuple[float, ...] = (0.0,)  # more than one = fallback on low confidence
+    max_tokens: Optional[int] = None
+    condition_on_previous_text: bool = False
+    without_timestamps: bool = True
+    initial_prompt: Optional[str] = None
+
+
+PROFILES: Dict[str, DecodingProfile] = {
+    # Short spoken commands: fixed language, one greedy pass, bounded output
+    "command": DecodingProfile(
+        name="command",
+        language="en",
+        temperatures=(0.0,),
+        max_tokens=64,
+    ),
+    # Free-form speech: beam search with Whisper's usual temperature fallback
+    "dictation": DecodingProfile(
+        name="dictation",
+        language=None,
+        beam_size=5,
+        best_of=5,
+        temperatures=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        condition_on_previous_text=True,
+        without_timestamps=False,
+    ),
+}
+
+
+def get_profile(name: str) -> DecodingProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown ASR profile {name!r}; choose from {', '.join(PROFILES)}") from None
+
+
+class ASRBackend:
+    """Speech-to-text engine; audio is 16 kHz mono float32"""
+
+    name = "base"
+
+    def transcribe(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        raise NotImplementedError
+
+
+class WhisperBackend(ASRBackend):
+    """Reference openai-whisper (PyTorch)"""
+
+    name = "whisper"
+
+    def __init__(self, model_name: str, **options):
+        import whisper
+        self.logger = logging.getLogger('FRIDAY.ASR')
+        self.model = whisper.load_model(model_name)
+        self.fp16 = self.model.device.type != "cpu"
+
+    def transcribe(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        options = dict(
+            language=profile.language,
+            temperature=profile.temperatures if len(profile.temperatures) > 1 else profile.temperatures[0],
+            condition_on_previous_text=profile.condition_on_previous_text,
+            initial_prompt=profile.initial_prompt,
+            without_timestamps=profile.without_timestamps,
+            fp16=self.fp16,
+        )
+        if profile.beam_size:
+            options["beam_size"] = profile.beam_size
+        if profile.best_of:
+            options["best_of"] = profile.best_of
+        if profile.max_tokens:
+            options["sample_len"] = profile.max_tokens
+        return self.model.transcribe(audio, **options)["text"].strip()
+
+
+class FasterWhisperBackend(ASRBackend):
+    """CTranslate2 Whisper (faster-whisper), int8-quantized on CPU by default"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str, compute_type: str = "int8", cpu_threads: int = 0, **options):
+        from faster_whisper import WhisperModel
+        self.logger = logging.getLogger('FRIDAY.ASR')
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads or (os.cpu_count() or 4)
+        )
+
+    def transcribe(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        segments, _ = self.model.transcribe(
+            audio,
+            language=profile.language,
+            beam_size=profile.beam_size or 1,
+            best_of=profile.best_of or 1,
+            temperature=list(profile.temperatures),
+            condition_on_previous_text=profile.condition_on_previous_text,
+            initial_prompt=profile.initial_prompt,
+            without_timestamps=profile.without_timestamps,
+            max_new_tokens=profile.max_tokens,
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+
+BACKENDS: Dict[str, Type[ASRBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: str, model_name: str, fallback: Optional[str] = WhisperBackend.name,
+                   **options) -> ASRBackend:
+    """Instantiate a backend by name, falling back if its package is missing"""
+    logger = logging.getLogger('FRIDAY.ASR')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend {name!r}; choose from {', '.join(BACKENDS)}")
+    try:
+        backend = BACKENDS[name](model_name, **options)
+    except ImportError as e:
+        if not fallback or fallback == name:
+            raise
+        logger.warning(f"ASR backend {name!r} unavailable ({e}); using {fallback!r}")
+        backend = BACKENDS[fallback](model_name, **options)
+    logger.info(f"ASR backend: {backend.name} ({model_name})")
+    return backend
@@ -0,0 +1,186 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from modules.asr_backends import ASRBackend, DecodingProfile, create_backend
+
+# Set in each worker process by _init_worker
+_backend: Optional[ASRBackend] = None
+_ready = None  # barrier shared by the pool's workers, see ASRPool.start()
+
+# How long start() waits for every worker to load its model
+START_TIMEOUT = 300.0
+
+
+def _init_worker(backend_name: str, model_name: str, options: Dict[str, Any], ready) -> None:
+    global _backend, _ready
+    logging.basicConfig(level=logging.INFO)
+    _ready = ready
+    _backend = create_backend(backend_name, model_name, **options)
+
+
+def _wait_for_peers() -> int:
+    """Runs once per worker: a task only starts after the initializer loaded the model,
+    and none returns until all of them are running, so each lands on its own process"""
+    _ready.wait(START_TIMEOUT)
+    return os.getpid()
+
+
+def _transcribe_shared(shm_name: str, samples: int, profile: DecodingProfile) -> Tuple[str, float]:
+    """Worker side: decode audio straight out of the shared block"""
+    shm = SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+        start = time.perf_counter()
+        text = _backend.transcribe(audio, profile)
+        decode_seconds = time.perf_counter() - start
+        del audio  # the buffer export must be released before close()
+        return text, decode_seconds
+    finally:
+        shm.close()
+
+
+class ASRPool(ASRBackend):
+    """Transcription in worker processes, each holding its own model
+
+    Audio is copied once into a shared memory block that the worker decodes
+    in place; only the block name and the text cross the process boundary.
+    Calls from several threads run in parallel up to the worker count.
+    """
+
+    def __init__(self, backend_name: str, model_name: str, workers: int = 1,
+                 history: int = 200, **options):
+        self.logger = logging.getLogger('FRIDAY.ASRPool')
+        self.name = f"{backend_name}-pool"
+        self.workers = workers
+        self._backend_args = (backend_name, model_name, options)
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._latency = deque(maxlen=history)   # submit -> result, seconds
+        self._decode = deque(maxlen=history)    # time inside the model, seconds
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context("spawn")
+        # Sync primitives reach spawned workers only through their start arguments
+        self._ready = context.Barrier(self.workers)
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(*self._backend_args, self._ready)
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace an executor whose worker died; the model reloads on the next request"""
+        with self._lock:
+            if self._executor is not broken:
+                return  # another caller already replaced it
+            self._executor = self._create_executor()
+            self._restarts += 1
+        self.logger.warning("An ASR worker died; restarted the pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> None:
+        """Spawn every worker and wait until each has loaded its model"""
+        executor = self._executor
+        futures = [executor.submit(_wait_for_peers) for _ in range(self.workers)]
+        pids = {f.result() for f in futures}
+        self.logger.info(f"ASR pool ready: {len(pids)} worker(s)")
+
+    def submit(self, audio: np.ndarray, profile: DecodingProfile) -> Future:
+        """Queue audio for transcription; the future resolves to the text"""
+        shm = SharedMemory(create=True, size=max(1, audio.nbytes))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        result: Future = Future()
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def finished(inner: Future) -> None:
+            shm.close()
+            shm.unlink()
+            # exception() raises CancelledError for a cancelled future (e.g. shutdown)
+            cancelled = inner.cancelled()
+            error = None if cancelled else inner.exception()
+            with self._lock:
+                self._pending -= 1
+                if cancelled:
+                    pass
+                elif error is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                    self._latency.append(time.perf_counter() - submitted)
+                    self._decode.append(inner.result()[1])
+            if isinstance(error, BrokenProcessPool):
+                self._restart(executor)
+            if cancelled:
+                result.cancel()
+            elif error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(inner.result()[0])
+
+        try:
+            try:
+                executor = self._executor
+                inner = executor.submit(_transcribe_shared, shm.name, len(audio), profile)
+            except BrokenProcessPool:
+                self._restart(executor)
+                executor = self._executor
+                inner = executor.submit(_transcribe_shared, shm.name, len(audio), profile)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            with self._lock:
+                self._pending -= 1
+            raise
+        inner.add_done_callback(finished)
+        return result
+
+    def transcribe(self, audio: np.ndarray, profile: DecodingProfile) -> str:
+        return self.submit(audio, profile).result()
+
+    def worker_pids(self) -> List[int]:
+        """Process ids of the running workers (each holds a copy of the model)"""
+        return list(self._executor._processes or ())
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests submitted and not yet finished (running or waiting)"""
+        return self._pending
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            latency = np.array(self._latency) * 1000
+            decode = np.array(self._decode) * 1000
+            stats = {
+                "workers": self.workers,
+                "queue_depth": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "restarts": self._restarts,
+            }
+        if len(latency):
+            p50, p95 = np.percentile(latency, [50, 95])
+            stats.update({
+                "latency_p50_ms": float(p50),
+                "latency_p95_ms": float(p95),
+                "decode_mean_ms": float(decode.mean()),
+                "queue_wait_mean_ms": float((latency - decode).mean()),
+            })
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
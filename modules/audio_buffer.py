@@ -0,0 +1,178 @@
+import time
+import logging
+import threading
+from typing import Optional
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer addressed by absolute sample position
+
+    Every sample is written twice (at i and i + capacity), so any window of
+    up to `capacity` samples is one contiguous slice and view() never copies.
+    Views alias the buffer: a consumer holding one for longer than the buffer
+    duration will see it overwritten, so copy if you need to keep it.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._written = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_array(cls, audio: np.ndarray) -> "AudioRingBuffer":
+        """Closed buffer holding a whole recording, for offline processing"""
+        buffer = cls(max(1, len(audio)))
+        buffer.write(audio)
+        buffer.close()
+        return buffer
+
+    @property
+    def position(self) -> int:
+        """Total samples written since creation"""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Oldest absolute position still held in the buffer"""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the tail can survive; account for the dropped head
+            with self._cond:
+                self._written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        cap = self.capacity
+        pos = self._written % cap
+        first = min(n, cap - pos)
+        data = self._data
+        data[pos:pos + first] = samples[:first]
+        data[pos + cap:pos + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            data[:rest] = samples[first:]
+            data[cap:cap + rest] = samples[first:]
+
+        with self._cond:
+            self._written += n
+            self._cond.notify_all()
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Zero-copy view of absolute samples [start, end)"""
+        if end < start:
+            raise ValueError("end must not precede start")
+        if end - start > self.capacity:
+            raise ValueError(f"window of {end - start} samples exceeds capacity {self.capacity}")
+        if start < self.oldest:
+            raise ValueError(f"samples from {start} have been overwritten (oldest is {self.oldest})")
+        if end > self._written:
+            raise ValueError(f"samples up to {end} not captured yet (position {self._written})")
+        offset = start % self.capacity
+        return self._data[offset:offset + (end - start)]
+
+    def latest(self, n: int) -> np.ndarray:
+        """Zero-copy view of the most recent n samples"""
+        end = self._written
+        return self.view(max(self.oldest, end - n), end)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Mark end of stream; waiters for data past the end return immediately"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Block until `position` samples have been written (False on timeout or end of stream)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._written >= position or self._closed, timeout)
+            return self._written >= position
+
+
+class AudioCapture:
+    """Keeps one input stream open and feeds an AudioRingBuffer from a thread"""
+
+    def __init__(self, audio, audio_format, rate: int, channels: int, chunk: int, buffer_seconds: float):
+        self.logger = logging.getLogger('FRIDAY.AudioCapture')
+        self.audio = audio
+        self.format = audio_format
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.buffer = AudioRingBuffer(int(rate * buffer_seconds))
+        self.stream = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+    @property
+    def position(self) -> int:
+        return self.buffer.position
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.stream = self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk
+        )
+        self._running.set()
+        self._thread = threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)
+        self._thread.start()
+        self.logger.info("Audio capture started")
+
+    def _capture_loop(self) -> None:
+        while self._running.is_set():
+            try:
+                data = self.stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                self.logger.debug(f"Non-critical error during recording: {e}")
+                time.sleep(self.chunk / self.rate)
+                continue
+            samples = np.frombuffer(data, dtype=np.float32)
+            if self.channels > 1:
+                samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+            self.buffer.write(samples)
+
+    def read(self, start: int, n: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Wait for samples [start, start + n) and return a view of them"""
+        if timeout is None:
+            timeout = n / self.rate + 1.0
+        if not self.buffer.wait_for(start + n, timeout):
+            self.logger.warning("Timed out waiting for audio")
+            return None
+        end = start + n
+        start = max(start, self.buffer.oldest)
+        return self.buffer.view(start, end)
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            finally:
+                self.stream = None
+        self.logger.info("Audio capture stopped")
@@ -0,0 +1,55 @@
+import wave
+from pathlib import Path
+from typing import Tuple, Union
+import numpy as np
+
+_SAMPLE_TYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def read_wav(path: Union[str, Path], rate: int = 16000) -> np.ndarray:
+    """Load a PCM WAV file as mono float32 in [-1, 1], resampled to `rate`"""
+    with wave.open(str(path), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        file_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width not in _SAMPLE_TYPES:
+        raise ValueError(f"Unsupported sample width {width} in {path}")
+    samples = np.frombuffer(raw, dtype=_SAMPLE_TYPES[width]).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128.0) / 128.0
+    else:
+        samples /= float(2 ** (8 * width - 1))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if file_rate != rate:
+        samples = resample(samples, file_rate, rate)
+    return samples.astype(np.float32, copy=False)
+
+
+def write_wav(path: Union[str, Path], audio: np.ndarray, rate: int = 16000) -> None:
+    """Save float32 mono audio as 16-bit PCM"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Linear-interpolation resampling; adequate for speech features and fixtures"""
+    if src_rate == dst_rate or not len(audio):
+        return audio
+    duration = len(audio) / src_rate
+    n = int(round(duration * dst_rate))
+    src_t = np.arange(len(audio)) / src_rate
+    dst_t = np.arange(n) / dst_rate
+    return np.interp(dst_t, src_t, audio).astype(np.float32)
+
+
+def wav_duration(path: Union[str, Path]) -> Tuple[float, int]:
+    """(seconds, sample rate) without decoding the samples"""
+    with wave.open(str(path), 'rb') as wav:
+        return wav.getnframes() / wav.getframerate(), wav.getframerate()
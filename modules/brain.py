@@ -1,4 +1,3 @@
-import spacy
 import json
 import logging
 import os
@@ -8,20 +7,15 @@ from datetime import datetime, timedelta
 import re
 from config import Config
 import time
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
-
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('averaged_perceptron_tagger')
+from modules.nlp_resources import NLPResources
+from modules.intent_engine import IntentEngine, ParsedCommand, INTENT_VERBS
 
 class Brain:
     def __init__(self, config: Config):
         self.config = config
-        self.nlp = spacy.load("en_core_web_sm")
+        self.logger = logging.getLogger('FRIDAY.Brain')
+        # NLTK/spaCy models are verified and loaded on first use, never at import
+        self.resources = NLPResources(config)
         self.current_context = {}
         self.conversation_history = []
         self.last_interaction_time = None
@@ -29,31 +23,57 @@ class Brain:
         self.user_preferences = self._load_preferences()
         self.learning_data_file = Path(self.config.PERSONAL_DATA_DIR) / "learning_data.json"
         self.learning_data = self._load_learning_data()
-        self.logger = logging.getLogger('FRIDAY.Brain')
+        # Compiled once; most commands never reach the NLTK tagger
+        self.intent_engine = IntentEngine.build(self.learning_data)
+
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded only when an entity path needs it"""
+        return self.resources.spacy()
         
     def process_input(self, text: str) -> Tuple[str, Dict, float]:
         """
         Process user input to understand intent, entities, and context
         Returns: (intent, entities, confidence)
         """
+        parsed = self.parse(text)
+        return parsed.intent, parsed.entities, parsed.confidence
+
+    def parse(self, text: str) -> ParsedCommand:
+        """Intent, entities, confidence and slots for text in one pass"""
         try:
-            # Tokenize and tag parts of speech
-            tokens = word_tokenize(text.lower())
-            tagged = pos_tag(tokens)
-            
-            # Extract key information
-            intent = self._determine_intent(tagged)
-            entities = self._extract_entities(tagged)
-            confidence = self._calculate_confidence(intent, entities)
+            # Fast path: phrase trie over the leading command words
+            match = self.intent_engine.classify(text)
+            parsed = ParsedCommand.from_text(text, match.tokens)
+            if match.confident:
+                intent = match.intent
+                entities = match.entities()
+            else:
+                # Fall back to tokenizing and tagging parts of speech
+                tagged = self._tag(text)
+                intent = self._determine_intent(tagged)
+                entities = self._extract_entities(tagged)
+            parsed.intent = intent
+            parsed.entities = entities
+            parsed.confidence = self._calculate_confidence(intent, entities)
             
             # Update conversation context
             self._update_context(text, intent, entities)
             
-            return intent, entities, confidence
+            return parsed
             
         except Exception as e:
             self.logger.error(f"Error processing input: {e}")
-            return "error", {}, 0.0
+            parsed = ParsedCommand.from_text(text)
+            parsed.intent = "error"
+            return parsed
+        
+    def _tag(self, text: str) -> List[Tuple[str, str]]:
+        """Tokenize and POS-tag text with NLTK"""
+        self.resources.ensure_nltk()
+        from nltk.tokenize import word_tokenize
+        from nltk.tag import pos_tag
+        return pos_tag(word_tokenize(text.lower()))
         
     def _determine_intent(self, tagged_tokens: List[Tuple[str, str]]) -> str:
         """Determine the user's intent from the text"""
@@ -65,14 +85,9 @@ class Brain:
             return "query"
             
         action = verbs[0]
-        if action in ["search", "find", "look"]:
-            return "search"
-        elif action in ["send", "write", "email"]:
-            return "email"
-        elif action in ["open", "start", "launch"]:
-            return "app_control"
-        elif action in ["set", "change", "update"]:
-            return "settings"
+        for intent, intent_verbs in INTENT_VERBS.items():
+            if action in intent_verbs:
+                return intent
         
         return "general_command"
         
@@ -127,6 +142,12 @@ class Brain:
         })
         self._trim_context()
         
+    def _trim_context(self):
+        """Keep only the most recent CONTEXT_MEMORY_SIZE entries"""
+        overflow = len(self.conversation_context) - self.config.CONTEXT_MEMORY_SIZE
+        if overflow > 0:
+            del self.conversation_context[:overflow]
+        
     def _get_relevant_context(self) -> List[Dict]:
         """Get relevant conversation context"""
         return self.conversation_context[-5:]  # Last 5 exchanges
@@ -140,6 +161,7 @@ class Brain:
         """Learn from user interactions"""
         # Update learning data based on interaction
         self.learning_data.setdefault(intent, {}).setdefault('examples', []).append(text)
+        self.intent_engine.add_examples({intent: {'examples': [text]}})
         self._update_user_preferences(intent, entities)
         self._save_learning_data()
         
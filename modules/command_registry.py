@@ -0,0 +1,222 @@
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Iterable, Set
+
+# Expected latency classes
+LATENCY_INSTANT = "instant"        # pure Python, well under 10 ms
+LATENCY_FAST = "fast"              # a single osascript/shell call, under a second
+LATENCY_SLOW = "slow"              # launches apps or chains several scripts
+LATENCY_BACKGROUND = "background"  # long-running; should not block the voice loop
+
+LATENCY_CLASSES = (LATENCY_INSTANT, LATENCY_FAST, LATENCY_SLOW, LATENCY_BACKGROUND)
+
+
+@dataclass
+class CommandStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+@dataclass
+class CommandSpec:
+    intent: str
+    resolver: Callable[[], Callable]
+    is_async: bool = False
+    latency: str = LATENCY_FAST
+    side_effects: bool = True
+    source: str = ""
+    stats: CommandStats = field(default_factory=CommandStats)
+    _handler: Optional[Callable] = field(default=None, repr=False)
+
+    @property
+    def handler(self) -> Callable:
+        """Bound handler, resolved (and its component created) on first use"""
+        if self._handler is None:
+            self._handler = self.resolver()
+        return self._handler
+
+
+class CommandRegistry:
+    """Every command intent mapped to its handler plus scheduling metadata
+
+    Built once at startup. Handlers of lazily created components are bound on
+    first invocation, so registering them does not instantiate anything.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger('FRIDAY.Commands')
+        self._specs: Dict[str, CommandSpec] = {}
+        self._stats_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()  # handlers running on the loop (loop thread only)
+
+    def register(self, intent: str, handler: Callable, latency: str = LATENCY_FAST,
+                 side_effects: bool = True, source: str = "", is_async: Optional[bool] = None) -> CommandSpec:
+        """Register an already bound handler"""
+        if is_async is None:
+            is_async = inspect.iscoroutinefunction(handler)
+        return self._add(CommandSpec(
+            intent=intent,
+            resolver=lambda: handler,
+            is_async=is_async,
+            latency=latency,
+            side_effects=side_effects,
+            source=source,
+            _handler=handler
+        ))
+
+    def register_component(self, source: str, component_cls: type, get_instance: Callable[[], Any]) -> None:
+        """Register every action table a component declares in COMMAND_GROUPS
+
+        COMMAND_GROUPS entries are (group, {action: method name}, latency,
+        side effects); actions listed in READ_ONLY_ACTIONS have no side effects.
+        Methods missing from the class are skipped.
+        """
+        read_only = getattr(component_cls, 'READ_ONLY_ACTIONS', frozenset())
+        for group, table, latency, side_effects in component_cls.COMMAND_GROUPS:
+            for action, method_name in table.items():
+                method = getattr(component_cls, method_name, None)
+                if method is None:
+                    self.logger.debug(f"{component_cls.__name__}.{method_name} not implemented; skipping {action}")
+                    continue
+                intent = ".".join(part for part in (source, group, action) if part)
+                self._add(CommandSpec(
+                    intent=intent,
+                    resolver=lambda name=method_name: getattr(get_instance(), name),
+                    is_async=inspect.iscoroutinefunction(method),
+                    latency=latency,
+                    side_effects=side_effects and action not in read_only,
+                    source=source
+                ))
+
+    def _add(self, spec: CommandSpec) -> CommandSpec:
+        if spec.latency not in LATENCY_CLASSES:
+            raise ValueError(f"Unknown latency class for {spec.intent}: {spec.latency}")
+        if spec.intent in self._specs:
+            raise ValueError(f"Duplicate command intent: {spec.intent}")
+        self._specs[spec.intent] = spec
+        return spec
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def get(self, intent: str) -> CommandSpec:
+        try:
+            return self._specs[intent]
+        except KeyError:
+            raise KeyError(f"Unknown command intent: {intent}") from None
+
+    def specs(self, source: Optional[str] = None, latency: Optional[str] = None) -> List[CommandSpec]:
+        return [
+            s for s in self._specs.values()
+            if (source is None or s.source == source) and (latency is None or s.latency == latency)
+        ]
+
+    def invoke(self, intent: str, *args, **kwargs) -> Any:
+        """Call a handler synchronously, recording its latency"""
+        return self._call(self.get(intent), *args, **kwargs)
+
+    def invoker(self, intent: str) -> Callable:
+        """Callable that invokes intent; the spec lookup happens once"""
+        spec = self.get(intent)
+        return lambda *args, **kwargs: self._call(spec, *args, **kwargs)
+
+    def _call(self, spec: CommandSpec, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        failed = False
+        deferred = False
+        try:
+            result = spec.handler(*args, **kwargs)
+            if spec.is_async:
+                if self._loop is None:
+                    return asyncio.run(result)
+                future = self._submit(result)
+                if spec.latency == LATENCY_BACKGROUND:
+                    # Keeps running on the loop; stats are recorded when it finishes
+                    future.add_done_callback(
+                        lambda f: self.record(spec, time.perf_counter() - start,
+                                              f.cancelled() or f.exception() is not None)
+                    )
+                    deferred = True
+                    return future
+                return future.result()
+            return result
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if not deferred:
+                self.record(spec, time.perf_counter() - start, failed)
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Run async handlers on a long-lived loop instead of asyncio.run per call
+
+        Background-class coroutines then return a concurrent.futures.Future
+        immediately. invoke() must not be called from the loop's own thread.
+        """
+        self._loop = loop
+
+    def detach_loop(self) -> None:
+        self._loop = None
+
+    def _submit(self, coro) -> Future:
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            coro.close()
+            raise RuntimeError("Synchronous command invoked on the event loop thread; offload it to the executor")
+        return asyncio.run_coroutine_threadsafe(self._tracked(coro), self._loop)
+
+    async def _tracked(self, coro) -> Any:
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            return await coro
+        finally:
+            self._tasks.discard(task)
+
+    async def cancel_pending(self) -> int:
+        """Cancel handlers still running on the attached loop and wait until they have unwound"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return len(tasks)
+
+    def record(self, spec: CommandSpec, seconds: float, failed: bool = False) -> None:
+        with self._stats_lock:
+            stats = spec.stats
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def metrics(self, intents: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Per-intent call counts and latency for everything invoked so far"""
+        selected = self._specs.values() if intents is None else (self.get(i) for i in intents)
+        return {
+            s.intent: {
+                "calls": s.stats.calls,
+                "errors": s.stats.errors,
+                "mean_ms": s.stats.mean_seconds * 1000,
+                "max_ms": s.stats.max_seconds * 1000,
+                "latency_class": s.latency
+            }
+            for s in selected if s.stats.calls
+        }
@@ -0,0 +1,175 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Any, Optional, Callable, Iterator
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton; one pass over the text finds every pattern"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str) -> None:
+        if not pattern:
+            raise ValueError("Empty patterns are not allowed")
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if pattern not in self._out[state]:
+            self._out[state].append(pattern)
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + [
+                    p for p in self._out[self._fail[nxt]] if p not in self._out[nxt]
+                ]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, pattern) for every occurrence, in order of match end"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in out[state]:
+                yield i - len(pattern) + 1, pattern
+
+
+@dataclass(frozen=True)
+class Route:
+    """One routing rule; lower priority values are tried first"""
+    name: str
+    patterns: Tuple[str, ...]
+    handler: Callable[..., Optional[Any]]
+    priority: int
+    requires: Tuple[str, ...] = ()      # every one of these must also appear
+    requires_any: Tuple[str, ...] = ()  # at least one of these must also appear
+    prefix: bool = False                # trigger pattern must start the text
+
+
+@dataclass
+class RouteExplanation:
+    route: str
+    priority: int
+    pattern: Optional[str]
+    position: Optional[int]
+    status: str  # "selected", "eligible" or why the route was rejected
+
+
+class CommandRouter:
+    """Routing table compiled into a single Aho-Corasick automaton
+
+    Handlers are tried in priority order among eligible routes; a handler may
+    return None to decline and let the next eligible route run.
+    """
+
+    def __init__(self, routes: Optional[List[Route]] = None):
+        self.routes: List[Route] = []
+        self._automaton = AhoCorasick()
+        self._triggers: Dict[str, List[Route]] = {}
+        for route in routes or []:
+            self.add(route)
+
+    def add(self, route: Route) -> None:
+        if any(r.name == route.name for r in self.routes):
+            raise ValueError(f"Duplicate route name: {route.name}")
+        self.routes.append(route)
+        for pattern in route.patterns:
+            self._triggers.setdefault(pattern, []).append(route)
+        for pattern in route.patterns + route.requires + route.requires_any:
+            self._automaton.add(pattern)
+
+    def compile(self) -> None:
+        self._automaton.build()
+
+    def _scan(self, text: str) -> Dict[str, List[int]]:
+        found: Dict[str, List[int]] = {}
+        for start, pattern in self._automaton.iter_matches(text):
+            found.setdefault(pattern, []).append(start)
+        return found
+
+    def _evaluate(self, route: Route, found: Dict[str, List[int]]) -> Tuple[Optional[str], Optional[int], str]:
+        """Return (pattern, position, status) for a route given the scan result"""
+        hits = [(p, found[p][0]) for p in route.patterns if p in found]
+        if not hits:
+            return None, None, "no trigger"
+        if route.prefix:
+            hits = [(p, 0) for p in route.patterns if 0 in found.get(p, ())]
+            if not hits:
+                return None, None, "trigger not at start"
+        pattern, position = min(hits, key=lambda h: h[1])
+        missing = [p for p in route.requires if p not in found]
+        if missing:
+            return pattern, position, f"missing required {missing}"
+        if route.requires_any and not any(p in found for p in route.requires_any):
+            return pattern, position, f"missing one of {list(route.requires_any)}"
+        return pattern, position, "eligible"
+
+    def candidates(self, text: str) -> List[Tuple[Route, str, int]]:
+        """Eligible routes for text, best first"""
+        found = self._scan(text)
+        seen = set()
+        eligible = []
+        for pattern in found:
+            for route in self._triggers.get(pattern, ()):
+                if route.name in seen:
+                    continue
+                seen.add(route.name)
+                hit, position, status = self._evaluate(route, found)
+                if status == "eligible":
+                    eligible.append((route, hit, position))
+        eligible.sort(key=lambda c: c[0].priority)
+        return eligible
+
+    def dispatch(self, text: str, *args) -> Tuple[Optional[Route], Optional[Any]]:
+        """Run the best eligible handler; returns (route, result) or (None, None)"""
+        for route, _, _ in self.candidates(text):
+            result = route.handler(text, *args)
+            if result is not None:
+                return route, result
+        return None, None
+
+    def explain(self, text: str) -> List[RouteExplanation]:
+        """Every route with a trigger in text and why it was or wasn't chosen
+
+        Handlers are not run, so the first eligible route is reported as
+        selected even though its handler could still decline.
+        """
+        found = self._scan(text)
+        explanations = []
+        selected = False
+        for route in sorted(self.routes, key=lambda r: r.priority):
+            pattern, position, status = self._evaluate(route, found)
+            if status == "no trigger":
+                continue
+            if status == "eligible" and not selected:
+                status, selected = "selected", True
+            explanations.append(RouteExplanation(route.name, route.priority, pattern, position, status))
+        return explanations
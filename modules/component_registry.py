@@ -0,0 +1,199 @@
+import time
+import logging
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+try:
+    import psutil
+except ImportError:  # RSS reporting is optional
+    psutil = None
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes (0 if unavailable)"""
+    if psutil is None:
+        return 0
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class ComponentDisabledError(RuntimeError):
+    """Raised when code reaches a component that was switched off for this run"""
+
+
+@dataclass
+class ComponentStats:
+    name: str
+    init_seconds: float = 0.0
+    rss_before: int = 0
+    rss_after: int = 0
+    loaded_by: str = ""
+    error: Optional[str] = None
+
+    @property
+    def rss_delta(self) -> int:
+        return self.rss_after - self.rss_before
+
+
+class ComponentRegistry:
+    """Creates FRIDAY subsystems on first use and records what they cost"""
+
+    def __init__(self):
+        self.logger = logging.getLogger('FRIDAY.Components')
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._stats: Dict[str, ComponentStats] = {}
+        self._disabled: Dict[str, str] = {}
+        self._prewarm_threads: List[threading.Thread] = []
+        self._created_at = time.perf_counter()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Register a zero-argument factory for a component
+
+        Registering over an earlier factory (or a disabled name) replaces it,
+        which is how benchmarks swap in fakes.
+        """
+        self._factories[name] = factory
+        self._disabled.pop(name, None)
+        self._locks[name] = threading.Lock()
+
+    def register_class(self, name: str, module_path: str, class_name: str, *args, **kwargs) -> None:
+        """Register a component whose module is only imported when first needed"""
+        def factory():
+            module = importlib.import_module(module_path)
+            return getattr(module, class_name)(*args, **kwargs)
+        self.register(name, factory)
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def disable(self, names: Iterable[str], reason: str) -> None:
+        """Never create these components; get() raises ComponentDisabledError"""
+        for name in names:
+            if name in self._instances:
+                raise RuntimeError(f"Cannot disable {name}: already initialized")
+            self._disabled[name] = reason
+
+    def is_disabled(self, name: str) -> bool:
+        return name in self._disabled
+
+    def get(self, name: str) -> Any:
+        """Return the component, instantiating it on first access"""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        if name not in self._factories:
+            raise KeyError(f"Unknown component: {name}")
+        if name in self._disabled:
+            raise ComponentDisabledError(f"{name} is not available ({self._disabled[name]})")
+
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name in self._instances:
+                return self._instances[name]
+
+            stats = ComponentStats(
+                name=name,
+                rss_before=_current_rss(),
+                loaded_by=threading.current_thread().name
+            )
+            start = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                stats.error = str(e)
+                stats.init_seconds = time.perf_counter() - start
+                stats.rss_after = _current_rss()
+                self._stats[name] = stats
+                self.logger.error(f"Error initializing {name}: {e}")
+                raise
+
+            stats.init_seconds = time.perf_counter() - start
+            stats.rss_after = _current_rss()
+            self._stats[name] = stats
+            self._instances[name] = instance
+            self.logger.info(f"Initialized {name} in {stats.init_seconds * 1000:.1f} ms")
+            return instance
+
+    def prewarm(self, names: Iterable[str], background: bool = True) -> None:
+        """Instantiate components ahead of first use, optionally off the main thread"""
+        for name in names:
+            if name not in self._factories:
+                self.logger.warning(f"Cannot prewarm unknown component: {name}")
+                continue
+            if name in self._disabled:
+                continue
+            if not background:
+                self._prewarm_one(name)
+                continue
+            thread = threading.Thread(
+                target=self._prewarm_one,
+                args=(name,),
+                name=f"prewarm-{name}",
+                daemon=True
+            )
+            thread.start()
+            self._prewarm_threads.append(thread)
+
+    def _prewarm_one(self, name: str) -> None:
+        try:
+            self.get(name)
+        except Exception:
+            # Already logged; the next get() will retry and surface the error
+            pass
+
+    def wait_for_prewarm(self, timeout: Optional[float] = None) -> bool:
+        """Block until background prewarming finishes; returns False on timeout"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for thread in self._prewarm_threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            thread.join(remaining)
+            if thread.is_alive():
+                return False
+        return True
+
+    def stats(self) -> List[ComponentStats]:
+        return sorted(self._stats.values(), key=lambda s: s.init_seconds, reverse=True)
+
+    def startup_report(self) -> str:
+        """Per-component init time and RSS, slowest first"""
+        lines = [f"{'component':<22}{'init ms':>10}{'rss +MB':>10}{'rss MB':>10}  loaded by"]
+        for s in self.stats():
+            status = f" (failed: {s.error})" if s.error else ""
+            lines.append(
+                f"{s.name:<22}{s.init_seconds * 1000:>10.1f}"
+                f"{s.rss_delta / 2**20:>10.1f}{s.rss_after / 2**20:>10.1f}  {s.loaded_by}{status}"
+            )
+        pending = [n for n in self._factories if n not in self._stats and n not in self._disabled]
+        if self._disabled:
+            lines.append(f"disabled: {', '.join(self._disabled)}")
+        if pending:
+            lines.append(f"not loaded: {', '.join(pending)}")
+        lines.append(f"uptime {time.perf_counter() - self._created_at:.2f}s, rss {_current_rss() / 2**20:.1f} MB")
+        return "\n".join(lines)
+
+
+class LazyComponent:
+    """Class attribute that resolves through the owner's ComponentRegistry"""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+
+    def __set_name__(self, owner, attr_name):
+        if self.name is None:
+            self.name = attr_name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj.components.get(self.name)
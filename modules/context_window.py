@@ -0,0 +1,178 @@
+import math
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Writes the new rolling summary from the previous one and the turns leaving the window
+Summarizer = Callable[[str, List["Turn"]], Awaitable[str]]
+
+
+class TokenCounter:
+    """Token estimate for the model's tokenizer
+
+    Ollama has no tokenize endpoint for generate models, so counts are
+    estimated from characters. Each reply's prompt_eval_count tells us how
+    many tokens a prompt really was; calibrate() moves the chars/token
+    ratio towards that.
+    """
+
+    def __init__(self, chars_per_token: float = 3.5, smoothing: float = 0.3):
+        self.chars_per_token = chars_per_token
+        self.smoothing = smoothing
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token) if text else 0
+
+    def calibrate(self, text: str, tokens: Optional[int]) -> None:
+        if not tokens or len(text) < 200:  # short prompts are mostly template overhead
+            return
+        observed = len(text) / tokens
+        self.chars_per_token += self.smoothing * (observed - self.chars_per_token)
+
+
+@dataclass
+class Turn:
+    human: str
+    assistant: str
+    tokens: int
+
+    def render(self) -> str:
+        return f"Human: {self.human}\nAssistant: {self.assistant}"
+
+
+class ContextWindow:
+    """Packs system prompt, memory facts and history into a token budget
+
+    budget is what the prompt may use: num_ctx minus room for the reply.
+    Facts and the rolling summary get capped shares; the newest turns fill
+    the rest. Once history outgrows compact_at of its share, the oldest
+    turns are handed to the summarizer as a background task and replaced
+    by the summary when it finishes. Until then pack() simply leaves out
+    whatever doesn't fit, so a turn never waits for summarization.
+    add_turn(compact=False) defers that while the next request won't send
+    the window anyway.
+    """
+
+    def __init__(self, budget: int, fact_tokens: int = 256, summary_tokens: int = 256,
+                 compact_at: float = 0.75, summarizer: Optional[Summarizer] = None,
+                 counter: Optional[TokenCounter] = None):
+        self.logger = logging.getLogger('FRIDAY.ContextWindow')
+        self.budget = budget
+        self.fact_tokens = fact_tokens
+        self.summary_tokens = summary_tokens
+        self.compact_at = compact_at
+        self.summarizer = summarizer
+        self.counter = counter or TokenCounter()
+        self.turns: List[Turn] = []
+        self.summary = ""
+        self.compactions = 0
+        self._fixed_tokens = 0  # system prompt + facts at the last pack()
+        self._compacting: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config, summarizer: Optional[Summarizer] = None) -> "ContextWindow":
+        return cls(
+            budget=config.OLLAMA_NUM_CTX - config.CONTEXT_RESPONSE_TOKENS,
+            fact_tokens=config.CONTEXT_FACT_TOKENS,
+            summary_tokens=config.CONTEXT_SUMMARY_TOKENS,
+            summarizer=summarizer,
+        )
+
+    @property
+    def history_budget(self) -> int:
+        return max(0, self.budget - self._fixed_tokens - self.counter.count(self.summary))
+
+    def history_tokens(self) -> int:
+        return sum(turn.tokens for turn in self.turns)
+
+    def add_turn(self, human: str, assistant: str, compact: bool = True) -> None:
+        """Record a finished turn; with compact, may start compacting older turns in the background"""
+        turn = Turn(human, assistant, 0)
+        turn.tokens = self.counter.count(turn.render())
+        self.turns.append(turn)
+        if compact and self.history_tokens() > self.compact_at * self.history_budget:
+            self._start_compaction()
+
+    def revise_last(self, assistant: str) -> None:
+        """Replace the newest turn's answer (e.g. with the part heard before a barge-in)"""
+        if self.turns:
+            turn = self.turns[-1]
+            turn.assistant = assistant
+            turn.tokens = self.counter.count(turn.render())
+
+    def clear(self) -> None:
+        if self._compacting is not None:
+            self._compacting.cancel()
+        self.turns = []
+        self.summary = ""
+
+    def pack(self, system: str, prompt: str, facts: Optional[List[str]] = None) -> Tuple[str, str]:
+        """System text and prompt transcript for a request that fits the budget"""
+        parts = [system]
+        if facts:
+            parts.append("Known facts about the user:\n" + self._fit_lines(facts, self.fact_tokens))
+        self._fixed_tokens = sum(self.counter.count(p) for p in parts)
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation: {self.summary}")
+
+        current = f"Human: {prompt}"
+        room = self.history_budget - self.counter.count(current)
+        recent: List[str] = []
+        for turn in reversed(self.turns):
+            if turn.tokens > room:
+                break
+            room -= turn.tokens
+            recent.append(turn.render())
+        recent.reverse()
+        return "\n\n".join(parts), "\n".join(recent + [current])
+
+    def _fit_lines(self, lines: List[str], budget: int) -> str:
+        kept = []
+        for line in lines:
+            budget -= self.counter.count(line) + 1
+            if budget < 0:
+                break
+            kept.append(f"- {line}")
+        return "\n".join(kept)
+
+    def _start_compaction(self) -> None:
+        if self.summarizer is None or (self._compacting is not None and not self._compacting.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync caller: pack() still drops the oldest turns
+        # Summarize the oldest turns until half the share is left for recent ones
+        keep = self.history_budget // 2
+        old, total = [], self.history_tokens()
+        for turn in self.turns[:-1]:
+            if total <= keep:
+                break
+            old.append(turn)
+            total -= turn.tokens
+        if old:
+            self._compacting = loop.create_task(self._compact(old))
+
+    async def _compact(self, old: List[Turn]) -> None:
+        try:
+            summary = await self.summarizer(self.summary, old)
+        except Exception as e:
+            self.logger.warning(f"Could not summarize {len(old)} turn(s): {e}")
+            return
+        summary = summary.strip()
+        limit = int(self.summary_tokens * self.counter.chars_per_token)
+        if len(summary) > limit:
+            summary = summary[:limit].rsplit(" ", 1)[0]
+        # Turns added meanwhile stay; only the summarized ones leave
+        self.turns = [turn for turn in self.turns if not any(turn is o for o in old)]
+        self.summary = summary
+        self.compactions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "turns": len(self.turns),
+            "history_tokens": self.history_tokens(),
+            "summary_tokens": self.counter.count(self.summary),
+            "compactions": self.compactions,
+        }
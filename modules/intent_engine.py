@@ -0,0 +1,207 @@
+import re
+from functools import cached_property
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Optional, Any, Iterable
+
+# Leading command verbs for each intent; Brain._determine_intent uses the same table
+INTENT_VERBS: Dict[str, List[str]] = {
+    "search": ["search", "find", "look"],
+    "email": ["send", "write", "email"],
+    "app_control": ["open", "start", "launch"],
+    "settings": ["set", "change", "update"]
+}
+
+# Multi-word phrases that should win over their first word alone
+INTENT_PHRASES: Dict[str, List[str]] = {
+    "search": ["look up", "look for", "search for"],
+    "email": ["send an email", "write an email", "draft an email"],
+    "app_control": ["open up", "start up"],
+    "settings": ["turn up", "turn down", "turn on", "turn off"]
+}
+
+# Words a command may start with before the verb ("hey friday, please open safari")
+LEADING_FILLERS = frozenset([
+    "hey", "ok", "okay", "friday", "please", "can", "could", "would", "will",
+    "you", "kindly", "just", "now", "i", "want", "to", "need", "like", "go", "and"
+])
+
+STOPWORDS = frozenset([
+    "a", "an", "the", "to", "for", "of", "on", "in", "at", "my", "me", "it",
+    "this", "that", "and", "or", "with", "up", "please", "is", "are", "be"
+])
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Slot patterns, run once over the normalized text by extract_slots
+_APP_RE = re.compile(r"\b(?:open|launch|start|minimize|maximize)\s+(?:(?:the|window|app)\s+)*(.+)$")
+_QUERY_RE = re.compile(r"search|look up|find")
+_REASON_RE = re.compile(r"\bbecause\b(.*)$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; a cheap stand-in for nltk.word_tokenize"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass
+class IntentMatch:
+    intent: Optional[str]
+    tokens: List[str]
+    phrase: Tuple[str, ...] = ()
+    start: int = 0
+    confident: bool = False
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.phrase)
+
+    def entities(self) -> Dict[str, List[str]]:
+        """Entities in the shape Brain._extract_entities produces"""
+        rest = self.tokens[self.end:] if self.intent else self.tokens
+        return {
+            "nouns": [t for t in rest if t not in STOPWORDS],
+            "verbs": list(self.phrase[:1]),
+            "adjectives": [],
+            "targets": []
+        }
+
+
+def extract_slots(normalized: str, tokens: List[str]) -> Dict[str, str]:
+    """Arguments the command handlers need, pulled out of one utterance"""
+    slots: Dict[str, str] = {}
+    match = _APP_RE.search(normalized)
+    if match:
+        slots["app"] = match.group(1).strip()
+    if "to" in tokens:
+        position = tokens.index("to")
+        if position + 1 < len(tokens):
+            slots["recipient"] = tokens[position + 1]
+    match = _REASON_RE.search(normalized)
+    if match and match.group(1).strip():
+        slots["reason"] = match.group(1).strip()
+    query = " ".join(_QUERY_RE.sub("", normalized).split())
+    if query != normalized:
+        slots["query"] = query
+    for word in normalized.split():
+        if "/" in word or word.startswith("~"):
+            slots["path"] = word
+            break
+    return slots
+
+
+@dataclass
+class ParsedCommand:
+    """One utterance, parsed once and passed to routing, handlers, personality and memory
+
+    text is what the user said, normalized the lowercased form routes match
+    against. intent, entities and confidence are filled by Brain.parse;
+    a command built with from_text() alone has intent None. Slots are
+    extracted on first access, since most routes never need them.
+    """
+    text: str
+    normalized: str
+    tokens: List[str]
+    intent: Optional[str] = None
+    entities: Dict[str, List[str]] = field(default_factory=dict)
+    confidence: float = 0.0
+
+    @classmethod
+    def from_text(cls, text: str, tokens: Optional[List[str]] = None) -> "ParsedCommand":
+        normalized = text.lower().strip()
+        return cls(text, normalized, tokenize(normalized) if tokens is None else tokens)
+
+    @cached_property
+    def slots(self) -> Dict[str, str]:
+        return extract_slots(self.normalized, self.tokens)
+
+    def has_any(self, *words: str) -> bool:
+        """True if any of the words is one of the command's tokens"""
+        return any(word in self.tokens for word in words)
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    intent: Optional[str] = None
+
+
+class IntentEngine:
+    """Token trie over known command phrases with longest-match lookup
+
+    A match that starts the utterance (after filler words) is treated as
+    confident; anything else is left to the POS-tagger path in Brain.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.phrase_count = 0
+
+    @classmethod
+    def build(cls, learning_data: Optional[Dict[str, Any]] = None) -> "IntentEngine":
+        engine = cls()
+        for intent, verbs in INTENT_VERBS.items():
+            for verb in verbs:
+                engine.add_phrase(verb, intent)
+        for intent, phrases in INTENT_PHRASES.items():
+            for phrase in phrases:
+                engine.add_phrase(phrase, intent)
+        if learning_data:
+            engine.add_examples(learning_data)
+        return engine
+
+    def add_examples(self, learning_data: Dict[str, Any]) -> None:
+        """Index utterances stored by Brain._learn_from_interaction"""
+        for intent, data in learning_data.items():
+            if not isinstance(data, dict) or intent in ("error", "query"):
+                continue
+            for example in data.get("examples", []):
+                self.add_phrase(example, intent)
+
+    def add_phrase(self, phrase: str, intent: str) -> None:
+        tokens = tokenize(phrase)
+        # Learned examples are matched from the verb onwards, like the built-in phrases
+        while tokens and tokens[0] in LEADING_FILLERS:
+            tokens = tokens[1:]
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.children.setdefault(token, _TrieNode())
+        if node.intent is None:
+            self.phrase_count += 1
+        node.intent = intent
+
+    def _longest_match(self, tokens: List[str], start: int) -> Tuple[Optional[str], int]:
+        node = self.root
+        best_intent, best_len = None, 0
+        for i in range(start, len(tokens)):
+            node = node.children.get(tokens[i])
+            if node is None:
+                break
+            if node.intent is not None:
+                best_intent, best_len = node.intent, i - start + 1
+        return best_intent, best_len
+
+    def classify(self, text: str) -> IntentMatch:
+        tokens = tokenize(text)
+        start = 0
+        while start < len(tokens) and tokens[start] in LEADING_FILLERS:
+            intent, length = self._longest_match(tokens, start)
+            if intent:
+                break
+            start += 1
+
+        for position in range(start, len(tokens)):
+            intent, length = self._longest_match(tokens, position)
+            if intent:
+                return IntentMatch(
+                    intent=intent,
+                    tokens=tokens,
+                    phrase=tuple(tokens[position:position + length]),
+                    start=position,
+                    confident=position == start
+                )
+        return IntentMatch(intent=None, tokens=tokens)
+
+    def classify_many(self, texts: Iterable[str]) -> List[IntentMatch]:
+        return [self.classify(text) for text in texts]
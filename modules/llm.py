@@ -1,102 +1,235 @@
-import requests
 import json
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
 import asyncio
-import aiohttp
+from modules.llm_transport import LLMTransportError, shared_transport, DEFAULT_OLLAMA_API
+from modules.context_window import ContextWindow, Turn
+from modules.response_cache import shared_cache
 
 class EnhancedLLM:
+    """Conversational generation that keeps Ollama's token context between turns
+
+    Each reply carries a `context` array (the conversation so far as
+    tokens); sending it back lets Ollama skip re-evaluating the transcript.
+    The prompt is rebuilt by the ContextWindow (system prompt, memory facts,
+    rolling summary, recent turns) when there is no usable context: first
+    turn, model or system prompt changed, context close to num_ctx, or
+    Ollama rejected it. History is only summarized once the next turn
+    will be rebuilt: a summary request meanwhile would compete with the
+    answer for the model and evict the context Ollama keeps for reuse.
+    """
+
+    # Past this share of num_ctx the context is dropped and the prompt rebuilt from recent turns
+    CONTEXT_FILL_LIMIT = 0.75
+
     def __init__(self, config):
         self.config = config
-        self.conversation_history = []
-        self.max_history = 10
+        self.logger = logging.getLogger('FRIDAY.LLM')
+        self.transport = shared_transport(config)
+        self.window = ContextWindow.from_config(config, summarizer=self._summarize)
+        self.context: Optional[List[int]] = None
+        self._context_key = None
+        self.context_reused = 0
+        self.context_rebuilt = 0
+        self.last_stats: Dict[str, Any] = {}
+        self._sent_text = ""  # rebuilt system + prompt, to calibrate the token estimate
         
-    async def generate_async(self, prompt: str) -> str:
-        """Asynchronous generation using Ollama API"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.config.OLLAMA_API,
-                json={
-                    "model": self.config.MODEL,
-                    "prompt": self._build_prompt(prompt),
-                    "system": self.config.SYSTEM_PROMPT,
-                    "stream": False
-                }
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    self._update_history(prompt, result["response"])
-                    return result["response"]
-                else:
-                    raise Exception(f"API error: {response.status}")
-                    
-    def _build_prompt(self, current_prompt: str) -> str:
-        """Build prompt with conversation history"""
-        context = "\n".join([
-            f"Human: {h['human']}\nAssistant: {h['assistant']}"
-            for h in self.conversation_history[-self.max_history:]
-        ])
-        return f"{context}\nHuman: {current_prompt}"
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        return [{"human": t.human, "assistant": t.assistant} for t in self.window.turns]
+        
+    def preload(self) -> None:
+        """Load the model into memory ahead of the first question"""
+        try:
+            self.transport.preload(self.config.MODEL, self._options())
+        except LLMTransportError as e:
+            self.logger.warning(f"Could not preload {self.config.MODEL}: {e}")
+        
+    def reset_context(self) -> None:
+        self.context = None
+        self._context_key = None
+        
+    def _options(self) -> Dict[str, Any]:
+        # Same options on every request; a different num_ctx makes Ollama reload the model
+        return {"num_ctx": self.config.OLLAMA_NUM_CTX}
+        
+    def _can_reuse_context(self) -> bool:
+        if self.context is None:
+            return False
+        if self._context_key != (self.config.MODEL, self.config.SYSTEM_PROMPT):
+            return False
+        return len(self.context) < self.CONTEXT_FILL_LIMIT * self.config.OLLAMA_NUM_CTX
+        
+    def _payload(self, prompt: str, use_context: bool, facts: Optional[List[str]] = None) -> Dict[str, Any]:
+        payload = {"model": self.config.MODEL, "options": self._options()}
+        if use_context:
+            # The system prompt is already part of the context
+            payload.update(prompt=prompt, context=self.context)
+        else:
+            system, transcript = self.window.pack(self.config.SYSTEM_PROMPT, prompt, facts)
+            self._sent_text = system + transcript
+            payload.update(prompt=transcript, system=system)
+        return payload
+        
+    def _finish(self, prompt: str, response: str, final: Dict[str, Any], used_context: bool) -> None:
+        if final.get("context"):
+            self.context = final["context"]
+            self._context_key = (self.config.MODEL, self.config.SYSTEM_PROMPT)
+        else:
+            self.reset_context()
+        self.window.add_turn(prompt, response, compact=not self._can_reuse_context())
+        if used_context:
+            self.context_reused += 1
+        else:
+            self.context_rebuilt += 1
+            self.window.counter.calibrate(self._sent_text, final.get("prompt_eval_count"))
+        self.last_stats = {
+            "reused_context": used_context,
+            "prompt_eval_count": final.get("prompt_eval_count"),
+            "prompt_eval_ms": final.get("prompt_eval_duration", 0) / 1e6,
+        }
+        
+    def _context_rejected(self, error: LLMTransportError, use_context: bool) -> bool:
+        """Ollama answered with an error while we sent a context: retry without it"""
+        if not use_context or error.status is None:
+            return False
+        self.logger.warning(f"Ollama rejected the saved context ({error}); rebuilding the prompt")
+        self.reset_context()
+        return True
         
-    def _update_history(self, human_input: str, assistant_response: str):
-        self.conversation_history.append({
-            "human": human_input,
-            "assistant": assistant_response
+    async def generate_async(self, prompt: str, facts: Optional[List[str]] = None) -> str:
+        """Asynchronous generation using Ollama API; facts are offered to the model on a rebuild"""
+        use_context = self._can_reuse_context()
+        try:
+            result = await self.transport.post_async({**self._payload(prompt, use_context, facts), "stream": False})
+        except LLMTransportError as e:
+            if not self._context_rejected(e, use_context):
+                raise
+            use_context = False
+            result = await self.transport.post_async({**self._payload(prompt, use_context, facts), "stream": False})
+        self._finish(prompt, result["response"], result, use_context)
+        return result["response"]
+        
+    async def stream_async(self, prompt: str, facts: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """Yield response tokens as Ollama generates them; history is updated at the end
+
+        A listener that stops early (barge-in) still leaves a turn with the
+        text handed out so far; see revise_last_response().
+        """
+        use_context = self._can_reuse_context()
+        parts = []
+        final: Dict[str, Any] = {}
+        try:
+            while True:
+                try:
+                    async for chunk in self.transport.stream_async(self._payload(prompt, use_context, facts)):
+                        token = chunk.get("response", "")
+                        if token:
+                            parts.append(token)
+                            yield token
+                        if chunk.get("done"):
+                            final = chunk
+                    break
+                except LLMTransportError as e:
+                    if parts or not self._context_rejected(e, use_context):
+                        raise
+                    use_context = False
+        finally:
+            # Without the final chunk there is no context, so the next turn rebuilds from history
+            if parts or final:
+                self._finish(prompt, "".join(parts), final, use_context)
+                
+    def revise_last_response(self, text: str) -> None:
+        """Record what the user actually heard of the last answer"""
+        self.window.revise_last(text)
+                    
+    async def _summarize(self, summary: str, turns: List[Turn]) -> str:
+        """Fold turns leaving the window into the rolling summary"""
+        transcript = "\n".join(turn.render() for turn in turns)
+        prompt = (f"Summary so far: {summary or '(none)'}\n\nConversation:\n{transcript}\n\n"
+                  "Update the summary with the conversation above in a few sentences. Keep names, "
+                  "facts and open requests. Reply with the summary only.")
+        result = await self.transport.post_async({
+            "model": self.config.MODEL,
+            "prompt": prompt,
+            "stream": False,
+            "options": self._options(),
         })
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history.pop(0)
+        return result.get("response", "")
 
 class LLM:
-    def __init__(self):
-        self.api_url = "http://localhost:11434/api/generate"  # Ollama API endpoint
-        self.model = "llama2:13b"  # Using Llama 2 13B model
+    def __init__(self, config=None):
+        self.api_url = config.OLLAMA_API if config else DEFAULT_OLLAMA_API  # Ollama API endpoint
+        self.model = config.MODEL if config else "llama2:13b"  # Using Llama 2 13B model
+        self.num_ctx = config.OLLAMA_NUM_CTX if config else 4096
+        self.transport = shared_transport(config)
+        self.cache = shared_cache(config)
         self.conversation_history = []
         
-    def generate(self, prompt: str) -> str:
-        """Synchronous generation using local Llama through Ollama"""
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 40,
+                "num_ctx": self.num_ctx
+            }
+        }
+        
+    def generate(self, prompt: str, use_cache: bool = True) -> str:
+        """Synchronous generation using local Llama through Ollama
+
+        Answers come from the response cache when possible; use_cache=False
+        asks the model again and refreshes the cached answer.
+        """
+        payload = self._payload(prompt)
+        if self.cache is not None:
+            cached = self.cache.get(prompt, self.model, payload["options"], bypass=not use_cache)
+            if cached is not None:
+                return cached
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "num_ctx": 4096
-                    }
-                }
-            )
-            response.raise_for_status()
-            return response.json()["response"]
-        except requests.exceptions.RequestException as e:
+            response = self.transport.post(payload)["response"]
+        except LLMTransportError as e:
             print(f"Error connecting to Ollama: {e}")
             return "I'm having trouble accessing my language model."
+        if self.cache is not None:
+            self.cache.put(prompt, self.model, payload["options"], response)
+        return response
+            
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Synchronous generation, yielding tokens as they arrive"""
+        produced = False
+        try:
+            for chunk in self.transport.stream(self._payload(prompt)):
+                if chunk.get("response"):
+                    produced = True
+                    yield chunk["response"]
+        except LLMTransportError as e:
+            print(f"Error connecting to Ollama: {e}")
+            if not produced:
+                yield "I'm having trouble accessing my language model."
             
     async def generate_async(self, prompt: str) -> str:
         """Asynchronous generation using local Llama through Ollama"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url,
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,
-                            "top_p": 0.9,
-                            "top_k": 40,
-                            "num_ctx": 4096
-                        }
-                    }
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result["response"]
-                    else:
-                        raise Exception(f"Ollama API error: {response.status}")
+            result = await self.transport.post_async(self._payload(prompt))
+            return result["response"]
         except Exception as e:
             print(f"Error in async generation: {e}")
-            return "I'm having trouble accessing my language model."
\ No newline at end of file
+            return "I'm having trouble accessing my language model."
+            
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        """Asynchronous generation, yielding tokens as they arrive"""
+        produced = False
+        try:
+            async for chunk in self.transport.stream_async(self._payload(prompt)):
+                if chunk.get("response"):
+                    produced = True
+                    yield chunk["response"]
+        except LLMTransportError as e:
+            print(f"Error in async generation: {e}")
+            if not produced:
+                yield "I'm having trouble accessing my language model."
\ No newline at end of file
@@ -0,0 +1,323 @@
+import time
+import json
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:  # only needed by async callers
+    aiohttp = None
+
+# Connect timeouts are retried like refused connections (aiohttp >= 3.10 tells them apart)
+_CONNECT_TIMEOUTS = getattr(aiohttp, "ConnectionTimeoutError", ())
+
+DEFAULT_OLLAMA_API = "http://localhost:11434/api/generate"
+
+# Worth retrying: Ollama restarting or still loading the model
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+
+class LLMTransportError(RuntimeError):
+    """An Ollama request failed after any retries"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _Retryable(Exception):
+    pass
+
+
+class OllamaTransport:
+    """Pooled HTTP client shared by every Ollama caller
+
+    Sync callers share one requests.Session and async callers one
+    aiohttp.ClientSession per event loop, so connections stay open between
+    turns. At most max_concurrency requests are in flight per side (sync and
+    async are counted separately); extra callers wait for a slot. Connection
+    failures and 429/5xx answers are retried with exponential backoff; a
+    read timeout is not, since the model was already working on it.
+    """
+
+    def __init__(self, url: str = DEFAULT_OLLAMA_API, connect_timeout: float = 3.0,
+                 read_timeout: float = 120.0, max_concurrency: int = 2, retries: int = 2,
+                 backoff: float = 0.5, keep_alive: Optional[str] = None):
+        self.logger = logging.getLogger('FRIDAY.LLMTransport')
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        # Sent with every request that doesn't set its own; how long Ollama keeps the model loaded
+        self.keep_alive = keep_alive
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Per event loop: (aiohttp session, semaphore, closer task); aiohttp sessions are loop-bound
+        self._async: Dict[asyncio.AbstractEventLoop, Tuple[Any, asyncio.Semaphore, asyncio.Task]] = {}
+        self._async_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+    @classmethod
+    def from_config(cls, config) -> "OllamaTransport":
+        return cls(
+            url=config.OLLAMA_API,
+            connect_timeout=config.OLLAMA_CONNECT_TIMEOUT,
+            read_timeout=config.OLLAMA_READ_TIMEOUT,
+            max_concurrency=config.OLLAMA_MAX_CONCURRENCY,
+            retries=config.OLLAMA_RETRIES,
+            keep_alive=config.OLLAMA_KEEP_ALIVE,
+        )
+
+    def _delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter before retry number attempt (1-based)"""
+        return self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def _count(self, retried: int = 0, failed: bool = False) -> None:
+        with self._stats_lock:
+            self.requests += 1
+            self.retried += retried
+            self.failed += int(failed)
+
+    def _prepare(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.keep_alive is not None and "keep_alive" not in payload:
+            return {**payload, "keep_alive": self.keep_alive}
+        return payload
+
+    def _send(self, payload: Dict[str, Any], timeout: Optional[float], stream: bool,
+              url: Optional[str] = None) -> requests.Response:
+        """POST with retries; returns a 200 response. Caller holds a slot."""
+        payload = self._prepare(payload)
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(url or self.url, json=payload, stream=stream,
+                                              timeout=(self.connect_timeout, timeout or self.read_timeout))
+                if response.status_code in RETRY_STATUSES:
+                    response.close()
+                    raise _Retryable(f"HTTP {response.status_code}")
+                if response.status_code != 200:
+                    response.close()
+                    self._count(attempt, True)
+                    raise LLMTransportError(f"Ollama API error: {response.status_code}", response.status_code)
+                self._count(attempt)
+                return response
+            except (_Retryable, requests.exceptions.ConnectionError) as e:
+                error = e
+            except requests.exceptions.RequestException as e:
+                self._count(attempt, True)
+                raise LLMTransportError(f"Ollama request failed: {e}") from e
+            attempt += 1
+            if attempt > self.retries:
+                self._count(attempt - 1, True)
+                raise LLMTransportError(f"Ollama unavailable after {attempt} attempt(s): {error}")
+            self.logger.warning(f"Ollama request failed ({error}); retry {attempt}/{self.retries}")
+            time.sleep(self._delay(attempt))
+
+    def post(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded reply
+
+        timeout overrides the read timeout for this call.
+        """
+        with self._slots:
+            response = self._send(payload, timeout, stream=False)
+            try:
+                return response.json()
+            except ValueError as e:
+                raise LLMTransportError(f"Invalid reply from Ollama: {e}") from e
+
+    def embed(self, model: str, text: str) -> List[float]:
+        """Embedding of text from Ollama's /api/embeddings on the same host"""
+        url = self.url.rsplit("/", 1)[0] + "/embeddings"
+        with self._slots:
+            response = self._send({"model": model, "prompt": text}, None, stream=False, url=url)
+            try:
+                return response.json()["embedding"]
+            except (ValueError, KeyError) as e:
+                raise LLMTransportError(f"Invalid embedding reply from Ollama: {e}") from e
+
+    def stream(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """POST with "stream": true and yield each JSON chunk as it arrives
+
+        Only connecting is retried; once chunks flow, errors are raised.
+        Closing the generator early closes the connection (the model stops).
+        """
+        with self._slots:
+            response = self._send({**payload, "stream": True}, timeout, stream=True)
+            try:
+                # Read to the end of the body so the connection goes back to the pool
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise LLMTransportError(f"Ollama error: {chunk['error']}")
+                    yield chunk
+            except (requests.exceptions.RequestException, ValueError) as e:
+                raise LLMTransportError(f"Ollama stream failed: {e}") from e
+            finally:
+                response.close()
+
+    def _loop_state(self) -> Tuple[Any, asyncio.Semaphore]:
+        if aiohttp is None:
+            raise LLMTransportError("aiohttp is not installed")
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            state = self._async.get(loop)
+            if state is None:
+                # Loops closed without cancelling their tasks (asyncio.run does cancel them)
+                for old in [l for l in self._async if l.is_closed()]:
+                    self._discard(self._async.pop(old)[0])
+                connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+                session = aiohttp.ClientSession(connector=connector)
+                closer = loop.create_task(self._close_with_loop(loop, session))
+                state = self._async[loop] = (session, asyncio.Semaphore(self.max_concurrency), closer)
+        return state[0], state[1]
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, session) -> None:
+        """Idles until cancelled; asyncio.run() cancels leftover tasks before closing the
+        loop, so the session is closed while its loop can still run the close"""
+        try:
+            await asyncio.Event().wait()
+        finally:
+            with self._async_lock:
+                state = self._async.get(loop)
+                if state is not None and state[0] is session:
+                    del self._async[loop]
+            await session.close()
+
+    def _discard(self, session) -> None:
+        """Release a session whose loop is already closed and can't await close()"""
+        if session.closed:
+            return
+        try:
+            session.connector._close()
+        except Exception as e:
+            self.logger.debug(f"Could not close connector of a finished event loop: {e}")
+
+    async def _send_async(self, session, payload: Dict[str, Any], timeout: Optional[float]):
+        """Async _send(); the caller releases the response"""
+        client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout,
+                                               sock_read=timeout or self.read_timeout)
+        payload = self._prepare(payload)
+        attempt = 0
+        while True:
+            try:
+                response = await session.post(self.url, json=payload, timeout=client_timeout)
+                if response.status in RETRY_STATUSES:
+                    response.release()
+                    raise _Retryable(f"HTTP {response.status}")
+                if response.status != 200:
+                    response.release()
+                    self._count(attempt, True)
+                    raise LLMTransportError(f"Ollama API error: {response.status}", response.status)
+                self._count(attempt)
+                return response
+            except asyncio.TimeoutError as e:
+                if not isinstance(e, _CONNECT_TIMEOUTS):
+                    self._count(attempt, True)
+                    raise LLMTransportError(f"Ollama read timed out: {e}") from e
+                error = e
+            except (_Retryable, aiohttp.ClientConnectionError) as e:
+                error = e
+            except aiohttp.ClientError as e:
+                self._count(attempt, True)
+                raise LLMTransportError(f"Ollama request failed: {e}") from e
+            attempt += 1
+            if attempt > self.retries:
+                self._count(attempt - 1, True)
+                raise LLMTransportError(f"Ollama unavailable after {attempt} attempt(s): {error}")
+            self.logger.warning(f"Ollama request failed ({error}); retry {attempt}/{self.retries}")
+            await asyncio.sleep(self._delay(attempt))
+
+    async def post_async(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async post(); shares connections with other calls on the same event loop"""
+        session, slots = self._loop_state()
+        async with slots:
+            response = await self._send_async(session, payload, timeout)
+            try:
+                return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                raise LLMTransportError(f"Invalid reply from Ollama: {e}") from e
+            finally:
+                response.release()
+
+    async def stream_async(self, payload: Dict[str, Any],
+                           timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async stream(): an async iterator of JSON chunks"""
+        session, slots = self._loop_state()
+        async with slots:
+            response = await self._send_async(session, {**payload, "stream": True}, timeout)
+            finished = False
+            try:
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise LLMTransportError(f"Ollama error: {chunk['error']}")
+                    yield chunk
+                finished = True
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                raise LLMTransportError(f"Ollama stream failed: {e}") from e
+            finally:
+                # A fully read response keeps its connection; an abandoned one is dropped
+                if finished:
+                    response.release()
+                else:
+                    response.close()
+
+    def preload(self, model: str, options: Optional[Dict[str, Any]] = None) -> None:
+        """Ask Ollama to load model now (an empty prompt only loads it)
+
+        Pass the same options later requests use; a different num_ctx
+        would make Ollama load the model again.
+        """
+        payload = {"model": model, "stream": False}
+        if options:
+            payload["options"] = options
+        self.post(payload)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {"requests": self.requests, "retried": self.retried, "failed": self.failed}
+
+    async def aclose(self) -> None:
+        """Close the aiohttp session of the running loop"""
+        with self._async_lock:
+            state = self._async.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            state[2].cancel()
+            await state[0].close()
+
+    def close(self) -> None:
+        self._session.close()
+
+
+_shared: Dict[str, OllamaTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_transport(config=None) -> OllamaTransport:
+    """The process-wide transport for config.OLLAMA_API (defaults without a config)"""
+    url = config.OLLAMA_API if config is not None else DEFAULT_OLLAMA_API
+    with _shared_lock:
+        transport = _shared.get(url)
+        if transport is None:
+            transport = OllamaTransport.from_config(config) if config is not None else OllamaTransport(url)
+            _shared[url] = transport
+        return transport
@@ -4,23 +4,108 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-import applescript
-import pyautogui
 import json
 from config import Config
+from modules.command_registry import LATENCY_FAST, LATENCY_SLOW, LATENCY_BACKGROUND
 import time  # Add this import at the top with other imports
 import psutil
 import shutil
 import requests
-import pyperclip
 from collections import deque
 
 class MacAutomation:
+    # Action tables (action -> method name), bound once per instance
+    QUICK_ACTIONS = {
+        "screenshot_area": "_take_area_screenshot",
+        "screenshot_window": "_take_window_screenshot",
+        "empty_trash": "_empty_trash",
+        "show_desktop": "_show_desktop",
+        "lock_screen": "_lock_screen",
+        "toggle_dark_mode": "_toggle_dark_mode",
+        "start_screensaver": "_start_screensaver"
+    }
+    WORKSPACES = {
+        "coding": "_setup_coding_workspace",
+        "writing": "_setup_writing_workspace",
+        "research": "_setup_research_workspace",
+        "presentation": "_setup_presentation_workspace"
+    }
+    AUTOMATIONS = {
+        "start_work": "_start_work_sequence",
+        "end_work": "_end_work_sequence",
+        "prepare_meeting": "_prepare_meeting_sequence",
+        "focus_mode": "_focus_mode_sequence",
+        "break_time": "_break_time_sequence"
+    }
+    NETWORK_ACTIONS = {
+        "wifi_toggle": "_toggle_wifi",
+        "wifi_status": "_get_wifi_status",
+        "ping": "_ping_host",
+        "speed_test": "_run_speed_test",
+        "dns_flush": "_flush_dns",
+        "proxy_set": "_set_proxy",
+        "scan_ports": "_scan_ports"
+    }
+    WINDOW_ACTIONS = {
+        "tile_windows": "_tile_all_windows",
+        "cascade_windows": "_cascade_windows",
+        "center_window": "_center_current_window",
+        "split_screen": "_setup_split_screen",
+        "save_layout": "_save_window_layout",
+        "load_layout": "_load_window_layout"
+    }
+    POWER_ACTIONS = {
+        "sleep": "_sleep_system",
+        "restart": "_restart_system",
+        "shutdown": "_shutdown_system",
+        "energy_profile": "_set_energy_profile",
+        "battery_info": "_get_battery_info",
+        "display_sleep": "_set_display_sleep"
+    }
+    DEV_WORKFLOWS = {
+        "code_review": "code_review_setup",
+        "meeting_preparation": "meeting_preparation",
+        "dev_environment": "start_development_environment",
+        "project_scaffold": "create_project_scaffold",
+        "system_cleanup": "deep_system_cleanup",
+        "backup": "backup_system"
+    }
+
+    # (group, table, latency class, side effects) for CommandRegistry
+    COMMAND_GROUPS = [
+        ("quick", QUICK_ACTIONS, LATENCY_FAST, True),
+        ("workspace", WORKSPACES, LATENCY_SLOW, True),
+        ("automation", AUTOMATIONS, LATENCY_SLOW, True),
+        ("network", NETWORK_ACTIONS, LATENCY_FAST, True),
+        ("window", WINDOW_ACTIONS, LATENCY_FAST, True),
+        ("power", POWER_ACTIONS, LATENCY_FAST, True),
+        ("workflow", DEV_WORKFLOWS, LATENCY_BACKGROUND, True)
+    ]
+    READ_ONLY_ACTIONS = frozenset(["wifi_status", "ping", "speed_test", "battery_info"])
+
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger('MacAutomation')
         self.current_workspace = None
         
+        self._quick_actions = self._bind_actions(self.QUICK_ACTIONS)
+        self._workspaces = self._bind_actions(self.WORKSPACES)
+        self._automations = self._bind_actions(self.AUTOMATIONS)
+        self._network_actions = self._bind_actions(self.NETWORK_ACTIONS)
+        self._window_actions = self._bind_actions(self.WINDOW_ACTIONS)
+        self._power_actions = self._bind_actions(self.POWER_ACTIONS)
+        
+    def _bind_actions(self, table: Dict[str, str]) -> Dict[str, Any]:
+        """Bind an action table to this instance, skipping unimplemented methods"""
+        bound = {}
+        for action, method_name in table.items():
+            method = getattr(self, method_name, None)
+            if method is None:
+                self.logger.debug(f"{method_name} not implemented; '{action}' unavailable")
+                continue
+            bound[action] = method
+        return bound
+        
     def execute_system_command(self, command: str) -> str:
         """Execute system command using osascript"""
         try:
@@ -99,18 +184,9 @@ class MacAutomation:
 
     def quick_actions(self, action: str) -> str:
         """Execute quick actions and shortcuts"""
-        actions = {
-            "screenshot_area": self._take_area_screenshot,
-            "screenshot_window": self._take_window_screenshot,
-            "empty_trash": self._empty_trash,
-            "show_desktop": self._show_desktop,
-            "lock_screen": self._lock_screen,
-            "toggle_dark_mode": self._toggle_dark_mode,
-            "start_screensaver": self._start_screensaver
-        }
-        
-        if action in actions:
-            return actions[action]()
+        handler = self._quick_actions.get(action)
+        if handler:
+            return handler()
         return "Action not recognized"
 
     def _take_area_screenshot(self) -> str:
@@ -171,15 +247,9 @@ class MacAutomation:
 
     def workspace_management(self, action: str, data: Optional[Dict] = None) -> str:
         """Manage workspaces and app layouts"""
-        actions = {
-            "coding": self._setup_coding_workspace,
-            "writing": self._setup_writing_workspace,
-            "research": self._setup_research_workspace,
-            "presentation": self._setup_presentation_workspace
-        }
-        
-        if action in actions:
-            return actions[action](data if data else {})
+        handler = self._workspaces.get(action)
+        if handler:
+            return handler(data if data else {})
         return "Workspace configuration not recognized"
 
     def _setup_coding_workspace(self, data: Dict) -> str:
@@ -341,16 +411,9 @@ class MacAutomation:
 
     def smart_automation(self, action: str, params: Optional[Dict] = None) -> str:
         """Execute smart automation sequences"""
-        automations = {
-            "start_work": self._start_work_sequence,
-            "end_work": self._end_work_sequence,
-            "prepare_meeting": self._prepare_meeting_sequence,
-            "focus_mode": self._focus_mode_sequence,
-            "break_time": self._break_time_sequence
-        }
-        
-        if action in automations:
-            return automations[action](params if params else {})
+        handler = self._automations.get(action)
+        if handler:
+            return handler(params if params else {})
         return "Automation sequence not recognized"
 
     def _start_work_sequence(self, params: Dict) -> str:
@@ -689,18 +752,9 @@ class MacAutomation:
     def manage_network(self, action: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Network management functions"""
         try:
-            actions = {
-                "wifi_toggle": self._toggle_wifi,
-                "wifi_status": self._get_wifi_status,
-                "ping": self._ping_host,
-                "speed_test": self._run_speed_test,
-                "dns_flush": self._flush_dns,
-                "proxy_set": self._set_proxy,
-                "scan_ports": self._scan_ports
-            }
-            
-            if action in actions:
-                return {"success": True, "result": actions[action](params)}
+            handler = self._network_actions.get(action)
+            if handler:
+                return {"success": True, "result": handler(params)}
             return {"success": False, "error": "Invalid network action"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -749,27 +803,21 @@ class MacAutomation:
             return {"success": False, "error": str(e)}
 
     def _copy_to_clipboard(self, data: str) -> Dict:
+        import pyperclip
         pyperclip.copy(data)
         self._clipboard_history.append(data)
         return {"copied": data}
 
     def _paste_from_clipboard(self) -> Dict:
+        import pyperclip
         return {"content": pyperclip.paste()}
 
     def advanced_window_management(self, action: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Advanced window management features"""
         try:
-            actions = {
-                "tile_windows": self._tile_all_windows,
-                "cascade_windows": self._cascade_windows,
-                "center_window": self._center_current_window,
-                "split_screen": self._setup_split_screen,
-                "save_layout": self._save_window_layout,
-                "load_layout": self._load_window_layout
-            }
-
-            if action in actions:
-                return {"success": True, "result": actions[action](params)}
+            handler = self._window_actions.get(action)
+            if handler:
+                return {"success": True, "result": handler(params)}
             return {"success": False, "error": "Invalid window action"}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -837,17 +885,9 @@ class MacAutomation:
     def power_management(self, action: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Power management features"""
         try:
-            actions = {
-                "sleep": self._sleep_system,
-                "restart": self._restart_system,
-                "shutdown": self._shutdown_system,
-                "energy_profile": self._set_energy_profile,
-                "battery_info": self._get_battery_info,
-                "display_sleep": self._set_display_sleep
-            }
-
-            if action in actions:
-                return {"success": True, "result": actions[action](params)}
+            handler = self._power_actions.get(action)
+            if handler:
+                return {"success": True, "result": handler(params)}
             return {"success": False, "error": "Invalid power action"}
         except Exception as e:
             return {"success": False, "error": str(e)}
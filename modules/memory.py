@@ -1,8 +1,9 @@
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from datetime import datetime
 import os
 from config import Config
+from modules.intent_engine import ParsedCommand
 
 class Memory:
     def __init__(self, config: Config):
@@ -27,12 +28,23 @@ class Memory:
         except Exception as e:
             print(f"Error saving memory: {e}")
             
-    def add_interaction(self, command: str, response: str):
-        self.short_term.append({
-            'timestamp': datetime.now().isoformat(),
-            'command': command,
-            'response': response
-        })
+    def add_interaction(self, command: Union[str, ParsedCommand], response: str):
+        if isinstance(command, ParsedCommand):
+            # Keep what the brain already worked out instead of re-parsing later
+            entry = {
+                'timestamp': datetime.now().isoformat(),
+                'command': command.text,
+                'intent': command.intent,
+                'slots': command.slots,
+                'response': response
+            }
+        else:
+            entry = {
+                'timestamp': datetime.now().isoformat(),
+                'command': command,
+                'response': response
+            }
+        self.short_term.append(entry)
         if len(self.short_term) > 10:
             self.short_term.pop(0)
             
@@ -45,6 +57,15 @@ class Memory:
         }
         self.save()
         
+    def facts(self) -> List[str]:
+        """Remembered facts as "category key: value", newest first"""
+        entries = [
+            (fact.get('timestamp', ''), f"{category} {key}: {fact.get('value')}")
+            for category, facts in self.long_term.items() if isinstance(facts, dict)
+            for key, fact in facts.items() if isinstance(fact, dict)
+        ]
+        return [line for _, line in sorted(entries, reverse=True)]
+        
     def get_context(self) -> Dict[str, Any]:
         return {
             'short_term': self.short_term[-3:],
@@ -0,0 +1,198 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any
+from config import Config
+
+
+class ResourceUnavailableError(RuntimeError):
+    """A required NLP model is missing and downloads are not allowed"""
+
+
+class NLPResources:
+    """Verifies NLTK/spaCy models once and loads them from the Friday data dir
+
+    Nothing here touches the network unless NLP_ALLOW_DOWNLOADS is set or
+    bootstrap() is called explicitly (see `python -m modules.nlp_resources`).
+    """
+
+    # nltk.download() name -> nltk.data.find() path
+    NLTK_RESOURCES = {
+        'punkt': 'tokenizers/punkt',
+        'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger'
+    }
+    SPACY_MODEL = "en_core_web_sm"
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.logger = logging.getLogger('FRIDAY.NLPResources')
+        self.data_dir = Path(self.config.NLP_DATA_DIR).expanduser()
+        self.nltk_dir = self.data_dir / "nltk_data"
+        self.spacy_dir = self.data_dir / "spacy"
+        self.stamp_file = self.data_dir / "verified.json"
+        self.allow_downloads = self.config.NLP_ALLOW_DOWNLOADS
+        self._lock = threading.Lock()
+        self._nltk_ready = False
+        self._nlp = None
+
+    def ensure_nltk(self) -> None:
+        """Make the tokenizer and tagger available, or raise ResourceUnavailableError"""
+        if self._nltk_ready:
+            return
+        with self._lock:
+            if self._nltk_ready:
+                return
+            import nltk
+            if str(self.nltk_dir) not in nltk.data.path:
+                nltk.data.path.insert(0, str(self.nltk_dir))
+
+            if self._stamp_valid(nltk):
+                self._nltk_ready = True
+                return
+
+            found = self._find_nltk(nltk)
+            missing = [name for name, path in found.items() if path is None]
+            if missing and not self.allow_downloads:
+                raise ResourceUnavailableError(
+                    f"Missing NLTK resources {missing} in {self.nltk_dir}; "
+                    f"run `python -m modules.nlp_resources --download` on a connected host"
+                )
+            for name in missing:
+                self._download_nltk(nltk, name)
+            if missing:
+                found = self._find_nltk(nltk)
+
+            self._write_stamp(nltk_version=nltk.__version__, nltk_paths=found)
+            self._nltk_ready = True
+
+    def _stamp_valid(self, nltk) -> bool:
+        """The stamp matches this NLTK and every resource it recorded is still on disk"""
+        stamp = self._read_stamp()
+        paths = stamp.get('nltk_paths')
+        if stamp.get('nltk_version') != nltk.__version__ or not isinstance(paths, dict):
+            return False
+        return all(paths.get(name) and os.path.exists(paths[name]) for name in self.NLTK_RESOURCES)
+
+    def _find_nltk(self, nltk) -> Dict[str, Any]:
+        """Directory or zip each resource resolves to on nltk.data.path, None if missing"""
+        found = {}
+        for name, resource_path in self.NLTK_RESOURCES.items():
+            try:
+                pointer = nltk.data.find(resource_path)
+            except LookupError:
+                found[name] = None
+                continue
+            archive = getattr(pointer, 'zipfile', None)
+            found[name] = archive.filename if archive is not None else pointer.path
+        return found
+
+    def _copy_system_nltk(self, nltk) -> None:
+        """Copy resources found elsewhere on nltk.data.path into the data dir for offline use"""
+        roots = [os.path.realpath(root) for root in nltk.data.path]
+        local = os.path.realpath(self.nltk_dir)
+        for name, path in self._find_nltk(nltk).items():
+            real = os.path.realpath(path) if path else None
+            root = next((r for r in roots if real and real.startswith(r + os.sep)), None)
+            if root is None or root == local:
+                continue
+            target = self.nltk_dir / os.path.relpath(real, root)
+            self.logger.info(f"Copying NLTK resource {name} from {path} to {target}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if os.path.isdir(path):
+                shutil.copytree(path, target, dirs_exist_ok=True)
+            else:
+                shutil.copy2(path, target)
+        self._write_stamp(nltk_version=nltk.__version__, nltk_paths=self._find_nltk(nltk))
+
+    def _download_nltk(self, nltk, name: str) -> None:
+        self.nltk_dir.mkdir(parents=True, exist_ok=True)
+        self.logger.info(f"Downloading NLTK resource {name} to {self.nltk_dir}")
+        if not nltk.download(name, download_dir=str(self.nltk_dir), quiet=True, raise_on_error=True):
+            raise ResourceUnavailableError(f"Failed to download NLTK resource {name}")
+
+    def spacy(self):
+        """Load the spaCy pipeline on first use"""
+        if self._nlp is not None:
+            return self._nlp
+        with self._lock:
+            if self._nlp is None:
+                self._nlp = self._load_spacy()
+        return self._nlp
+
+    def _load_spacy(self):
+        import spacy
+        local_model = self.spacy_dir / self.SPACY_MODEL
+        if local_model.exists():
+            return spacy.load(local_model)
+        try:
+            return spacy.load(self.SPACY_MODEL)
+        except OSError:
+            if not self.allow_downloads:
+                raise ResourceUnavailableError(
+                    f"spaCy model {self.SPACY_MODEL} is not installed and downloads are disabled"
+                )
+        self._download_spacy()
+        return spacy.load(local_model)
+
+    def _download_spacy(self) -> None:
+        """Install the spaCy model and keep a copy under the data dir"""
+        import spacy
+        from spacy.cli import download
+        self.logger.info(f"Downloading spaCy model {self.SPACY_MODEL}")
+        download(self.SPACY_MODEL)
+        self.spacy_dir.mkdir(parents=True, exist_ok=True)
+        spacy.load(self.SPACY_MODEL).to_disk(self.spacy_dir / self.SPACY_MODEL)
+
+    def bootstrap(self, include_spacy: bool = True) -> Dict[str, Any]:
+        """Fetch every resource into the data dir; the only intended online step"""
+        self.allow_downloads = True
+        self._nltk_ready = False
+        self.ensure_nltk()
+        import nltk
+        with self._lock:
+            self._copy_system_nltk(nltk)
+        status = {'nltk': str(self.nltk_dir)}
+        if include_spacy:
+            self.spacy()
+            status['spacy'] = self.SPACY_MODEL
+        return status
+
+    def _read_stamp(self) -> Dict[str, Any]:
+        try:
+            with open(self.stamp_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_stamp(self, **values) -> None:
+        try:
+            stamp = self._read_stamp()
+            stamp.update(values)
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.stamp_file, 'w') as f:
+                json.dump(stamp, f, indent=4)
+        except OSError as e:
+            self.logger.debug(f"Could not write resource stamp: {e}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verify or fetch FRIDAY's NLP models")
+    parser.add_argument("--download", action="store_true", help="download missing models")
+    parser.add_argument("--no-spacy", action="store_true", help="skip the spaCy model")
+    args = parser.parse_args()
+
+    resources = NLPResources(Config.load())
+    try:
+        if args.download:
+            print(resources.bootstrap(include_spacy=not args.no_spacy))
+        else:
+            resources.ensure_nltk()
+            print(f"NLTK resources OK in {resources.nltk_dir}")
+    except ResourceUnavailableError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
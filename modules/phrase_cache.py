@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+
+class PhraseCache:
+    """Pre-rendered audio for fixed phrases, stored on disk
+
+    Entries are keyed by the text plus the voice, rate and volume they were
+    rendered with. The index records those settings; when they change (e.g.
+    a new VOICE_ID) every old rendering is deleted on load.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: Union[str, Path], voice: str, rate: int, volume: float,
+                 extension: str = ".aiff"):
+        self.logger = logging.getLogger('FRIDAY.PhraseCache')
+        self.cache_dir = Path(os.path.expanduser(str(cache_dir)))
+        self.settings = {"voice": voice, "rate": rate, "volume": volume}
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._index: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, text: str) -> str:
+        payload = json.dumps([self.settings["voice"], self.settings["rate"],
+                              self.settings["volume"], text.strip()])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[str]:
+        """Path of the rendered phrase, or None if it hasn't been rendered"""
+        with self._lock:
+            filename = self._index.get(self.key(text))
+        path = self.cache_dir / filename if filename else None
+        if path is not None and path.exists():
+            self.hits += 1
+            return str(path)
+        self.misses += 1
+        return None
+
+    def missing(self, phrases: Iterable[str]) -> List[str]:
+        with self._lock:
+            known = {k for k, f in self._index.items() if (self.cache_dir / f).exists()}
+        return [p for p in dict.fromkeys(phrases) if self.key(p) not in known]
+
+    def render(self, engine, text: str) -> str:
+        """Render text with engine (on the engine's own thread) and index it"""
+        key = self.key(text)
+        filename = f"{key}{self.extension}"
+        path = self.cache_dir / filename
+        partial = path.with_suffix(".partial" + self.extension)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        engine.save_to_file(text, str(partial))
+        engine.runAndWait()
+        if not partial.exists() or partial.stat().st_size == 0:
+            raise RuntimeError(f"TTS engine produced no audio for {text!r}")
+        os.replace(partial, path)
+        with self._lock:
+            self._index[key] = filename
+            self._save()
+        self.logger.debug(f"Rendered {text!r} to {path}")
+        return str(path)
+
+    def clear(self) -> None:
+        """Delete every rendered phrase"""
+        with self._lock:
+            for filename in self._index.values():
+                try:
+                    (self.cache_dir / filename).unlink()
+                except FileNotFoundError:
+                    pass
+            self._index = {}
+            self._save()
+
+    def _load(self) -> None:
+        index_path = self.cache_dir / self.INDEX_FILE
+        try:
+            with open(index_path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.error(f"Ignoring unreadable phrase cache index: {e}")
+            return
+        self._index = data.get("phrases", {})
+        if data.get("settings") != self.settings:
+            self.logger.info("Voice settings changed; discarding pre-rendered phrases")
+            self.clear()
+
+    def _save(self) -> None:
+        """Write the index; caller holds the lock"""
+        if not self.cache_dir.exists():
+            return
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp = index_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"settings": self.settings, "phrases": self._index}, f, indent=2)
+        os.replace(tmp, index_path)
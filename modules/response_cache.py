@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+
+# Embeds a normalized prompt for near-duplicate lookup
+Embedder = Callable[[str], List[float]]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, single spaces, no trailing punctuation"""
+    return " ".join(prompt.lower().split()).rstrip("?!. ")
+
+
+class ResponseCache:
+    """LLM responses stored in SQLite, keyed by normalized prompt, model and options
+
+    Entries expire ttl seconds after they were generated. Beyond max_entries
+    the least recently used are evicted. With an embedder, an exact miss
+    falls back to the most similar cached prompt for the same model and
+    options, if cosine similarity reaches threshold. embed_model names the
+    embedder and is part of the scope, so vectors of different models never
+    mix. get(bypass=True) skips the lookup; putting the fresh response then
+    refreshes the entry. A failing lookup counts as a miss and a failing
+    store is skipped; either is logged.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = 86400, max_entries: int = 500,
+                 embedder: Optional[Embedder] = None, threshold: float = 0.92,
+                 embed_model: Optional[str] = None):
+        self.logger = logging.getLogger('FRIDAY.ResponseCache')
+        self.path = Path(os.path.expanduser(str(path)))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self.embed_model = embed_model
+        self.threshold = threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, scope TEXT, prompt TEXT, response TEXT,
+                created REAL, last_used REAL, embedding BLOB
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        # Per scope: keys and unit-length embeddings of live entries, reloaded after writes
+        self._vectors: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        # The embedding of the last missed prompt, reused when its response is put
+        self._last_embedding: Optional[Tuple[str, np.ndarray]] = None
+
+    @classmethod
+    def from_config(cls, config) -> "ResponseCache":
+        embedder = None
+        if config.RESPONSE_CACHE_EMBED_MODEL:
+            from modules.llm_transport import shared_transport
+            transport, model = shared_transport(config), config.RESPONSE_CACHE_EMBED_MODEL
+            embedder = lambda text: transport.embed(model, text)
+        return cls(
+            config.RESPONSE_CACHE_FILE,
+            ttl=config.RESPONSE_CACHE_TTL,
+            max_entries=config.RESPONSE_CACHE_SIZE,
+            embedder=embedder,
+            threshold=config.RESPONSE_CACHE_SIMILARITY,
+            embed_model=config.RESPONSE_CACHE_EMBED_MODEL or None,
+        )
+
+    def scope(self, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """Entries only match requests with the same model and options (and embedding model)"""
+        key = [model, options or {}] + ([self.embed_model] if self.embed_model else [])
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _key(scope: str, normalized: str) -> str:
+        return hashlib.sha256(f"{scope}\0{normalized}".encode()).hexdigest()
+
+    def get(self, prompt: str, model: str, options: Optional[Dict[str, Any]] = None,
+            bypass: bool = False) -> Optional[str]:
+        """Cached response for prompt, or None"""
+        if bypass:
+            self._count("bypassed")
+            return None
+        normalized = normalize_prompt(prompt)
+        scope = self.scope(model, options)
+        response, outcome = None, "misses"
+        try:
+            response = self._fresh(self._key(scope, normalized))
+            if response is not None:
+                outcome = "hits"
+            elif self.embedder is not None:
+                response = self._nearest(scope, normalized)
+                if response is not None:
+                    outcome = "near_hits"
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.warning(f"Response cache lookup failed, treated as a miss: {e}")
+        self._count(outcome)
+        return response
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def put(self, prompt: str, model: str, options: Optional[Dict[str, Any]], response: str) -> None:
+        """Store a successful generation"""
+        if not response.strip():
+            return
+        normalized = normalize_prompt(prompt)
+        scope = self.scope(model, options)
+        vector = self._embed(normalized) if self.embedder is not None else None
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self._key(scope, normalized), scope, normalized, response, now, now,
+                     vector.tobytes() if vector is not None else None)
+                )
+                self._evict(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not store response in the cache: {e}")
+            self._vectors.clear()
+
+    def _fresh(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries (lock held)"""
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        with self._lock:
+            last = self._last_embedding
+        if last is not None and last[0] == normalized:
+            return last[1]
+        try:
+            vector = np.asarray(self.embedder(normalized), dtype=np.float32)
+        except Exception as e:
+            self.logger.warning(f"Could not embed prompt, near-duplicate lookup skipped: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        vector /= norm
+        with self._lock:
+            self._last_embedding = (normalized, vector)
+        return vector
+
+    def _nearest(self, scope: str, normalized: str) -> Optional[str]:
+        vector = self._embed(normalized)
+        if vector is None:
+            return None
+        with self._lock:
+            keys, matrix = self._scope_vectors(scope)
+        if not keys or matrix.shape[1] != vector.shape[0]:
+            return None
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self._fresh(keys[best])
+
+    def _scope_vectors(self, scope: str) -> Tuple[List[str], np.ndarray]:
+        """Embeddings of live entries in scope (lock held)"""
+        cached = self._vectors.get(scope)
+        if cached is not None:
+            return cached
+        rows = self._conn.execute(
+            "SELECT key, embedding FROM responses WHERE scope = ? AND embedding IS NOT NULL AND created >= ?",
+            (scope, time.time() - self.ttl)
+        ).fetchall()
+        keys = [key for key, _ in rows]
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]) if rows else np.empty((0, 0))
+        self._vectors[scope] = (keys, matrix)
+        return keys, matrix
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._vectors.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            hits, near_hits, misses, bypassed = self.hits, self.near_hits, self.misses, self.bypassed
+        lookups = hits + near_hits + misses
+        return {
+            "entries": entries,
+            "hits": hits,
+            "near_hits": near_hits,
+            "misses": misses,
+            "bypassed": bypassed,
+            "hit_rate": (hits + near_hits) / lookups if lookups else 0.0,
+        }
+
+
+_shared: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(config=None) -> Optional[ResponseCache]:
+    """The process-wide cache for config.RESPONSE_CACHE_FILE; None without a config or when disabled"""
+    if config is None or not config.RESPONSE_CACHE_ENABLED:
+        return None
+    path = os.path.expanduser(config.RESPONSE_CACHE_FILE)
+    with _shared_lock:
+        cache = _shared.get(path)
+        if cache is None:
+            cache = _shared[path] = ResponseCache.from_config(config)
+        return cache
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the LLM response cache")
+    parser.add_argument("--clear", action="store_true", help="delete every cached response")
+    args = parser.parse_args()
+
+    cache = ResponseCache.from_config(Config.load())
+    if args.clear:
+        cache.clear()
+    print(f"{cache.path}: {cache.metrics()['entries']} entries")
@@ -1,78 +1,277 @@
 import os
 import time
-import whisper
-import pyaudio
+import asyncio
+import shutil
 import wave
-import pyttsx3
 import logging
-from typing import Optional
+from collections import deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import numpy as np
 from config import Config
+from modules.audio_buffer import AudioCapture
+from modules.vad import VoiceActivityDetector, Endpointer, EndpointMetrics
+from modules.wake_word import WakeWordDetector
+from modules.streaming_asr import StreamingTranscriber, PartialTranscript, StreamMetrics
+from modules.tts_worker import (
+    TTSWorker, BargeInMonitor, SentenceBuffer, StreamedSpeech, PRIORITY_NORMAL, PRIORITY_LOW
+)
+from modules.phrase_cache import PhraseCache
+from modules.asr_backends import ASRBackend, DecodingProfile, create_backend, get_profile
+from modules.asr_pool import ASRPool
+
+try:
+    import pyaudio
+except ImportError:  # headless hosts pass their own audio source
+    pyaudio = None
 
 class Speech:
-    def __init__(self, config: Config):
+    # Voice properties for better clarity
+    SPEECH_RATE = 150     # Speed of speech
+    SPEECH_VOLUME = 0.9   # Volume (0.0 to 1.0)
+    
+    def __init__(self, config: Config, audio=None):
+        """`audio` replaces pyaudio.PyAudio() (anything with a compatible open())"""
         self.config = config
         self.logger = logging.getLogger('FRIDAY.Speech')
         
-        # Initialize whisper model
-        self.model = whisper.load_model(self.config.WHISPER_MODEL)
+        # Speech recognition engine and default decoding profile; with
+        # ASR_WORKERS the model lives in worker processes instead of this one
+        workers = self.config.ASR_WORKERS
+        cpu_threads = self.config.ASR_CPU_THREADS
+        if workers > 0 and not cpu_threads:
+            cpu_threads = max(1, (os.cpu_count() or 4) // workers)
+        if workers > 0:
+            self.asr: ASRBackend = ASRPool(
+                self.config.ASR_BACKEND,
+                self.config.WHISPER_MODEL,
+                workers=workers,
+                compute_type=self.config.ASR_COMPUTE_TYPE,
+                cpu_threads=cpu_threads
+            )
+            self.asr.start()
+        else:
+            self.asr = create_backend(
+                self.config.ASR_BACKEND,
+                self.config.WHISPER_MODEL,
+                compute_type=self.config.ASR_COMPUTE_TYPE,
+                cpu_threads=cpu_threads
+            )
+        self.profile = get_profile(self.config.ASR_PROFILE)
+        # Running ASR total plus the stage timings of the last listen, for tracing
+        self.asr_seconds = 0.0
+        self.last_timings: Dict[str, float] = {}
         
-        # Initialize text-to-speech engine
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('voice', self.config.VOICE_ID)
+        # Fixed phrases are rendered to audio once and played back directly
+        player = shutil.which("afplay")
+        self.phrases = None
+        if self.config.PHRASE_CACHE_ENABLED and player:
+            self.phrases = PhraseCache(
+                self.config.PHRASE_CACHE_DIR,
+                self.config.VOICE_ID,
+                self.SPEECH_RATE,
+                self.SPEECH_VOLUME
+            )
         
-        # Adjust voice properties for better clarity
-        self.engine.setProperty('rate', 150)    # Speed of speech
-        self.engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
+        # Text-to-speech runs on its own thread so speaking never blocks the loop
+        self.tts = TTSWorker(self._create_engine, on_idle=self._on_tts_idle, player=player)
+        self.tts.start()
         
         # Audio recording settings
         self.chunk = self.config.CHUNK_SIZE
-        self.format = pyaudio.paFloat32
+        self.format = pyaudio.paFloat32 if pyaudio is not None else None
         self.channels = self.config.CHANNELS
         self.rate = self.config.SAMPLE_RATE
         self.record_seconds = self.config.RECORD_SECONDS
         
-        self.audio = pyaudio.PyAudio()
+        self.audio = audio if audio is not None else pyaudio.PyAudio()
         
-    def listen_and_transcribe(self) -> Optional[str]:
-        """Record audio and transcribe it to text"""
-        try:
-            # Open audio stream
-            stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk
+        # One stream stays open; a capture thread fills a preallocated ring buffer
+        self.capture = AudioCapture(
+            self.audio,
+            self.format,
+            rate=self.rate,
+            channels=self.channels,
+            chunk=self.chunk,
+            buffer_seconds=self.config.AUDIO_BUFFER_SECONDS
+        )
+        self.capture.start()
+        # Absolute sample position the next recording starts from
+        self._read_cursor = self.capture.position
+        
+        # Voice-activity endpointing replaces the fixed recording window
+        self.endpointer = None
+        if self.config.VAD_ENABLED:
+            self.endpointer = Endpointer(
+                VoiceActivityDetector(self.rate, frame_ms=self.config.VAD_FRAME_MS),
+                trailing_silence_ms=self.config.VAD_TRAILING_SILENCE_MS,
+                max_utterance_seconds=self.config.VAD_MAX_UTTERANCE_SECONDS,
+                no_speech_timeout=self.record_seconds
             )
+        self.pre_roll = int(self.rate * self.config.VAD_PRE_ROLL_MS / 1000)
+        self.endpoint_metrics: "deque[EndpointMetrics]" = deque(maxlen=100)
+        
+        # Partial transcripts while the user is still speaking
+        self.streamer = None
+        if self.endpointer is not None and self.config.ASR_STREAMING:
+            self.streamer = StreamingTranscriber(
+                self.endpointer,
+                self._transcribe,
+                self.rate,
+                step_ms=self.config.ASR_STREAM_STEP_MS,
+                pre_roll=self.pre_roll
+            )
+        self.stream_metrics: "deque[StreamMetrics]" = deque(maxlen=100)
+        
+        # Stop talking when the user talks over us
+        self.barge_in = None
+        if self.config.TTS_BARGE_IN:
+            self.barge_in = BargeInMonitor(
+                self.capture.buffer,
+                VoiceActivityDetector(self.rate, frame_ms=self.config.VAD_FRAME_MS),
+                self.tts,
+                self._on_barge_in,
+                margin_db=self.config.TTS_BARGE_IN_MARGIN_DB
+            )
+            self.barge_in.start()
+        
+        # Cheap keyword spotting in front of Whisper once templates are enrolled
+        self.wake_detector = WakeWordDetector(
+            self.rate,
+            self.config.WAKE_WORD_TEMPLATE_DIR,
+            threshold=self.config.WAKE_WORD_THRESHOLD
+        )
+        
+    def _create_engine(self):
+        """Called on the TTS thread, which owns the engine from then on"""
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty('voice', self.config.VOICE_ID)
+        engine.setProperty('rate', self.SPEECH_RATE)
+        engine.setProperty('volume', self.SPEECH_VOLUME)
+        return engine
+        
+    def _on_tts_idle(self, interrupted: bool) -> None:
+        # Don't transcribe what we just said; after a barge-in the user's speech is kept
+        if not interrupted:
+            self.skip_pending_audio()
             
+    def _on_barge_in(self, onset: int) -> None:
+        """The TTS worker was interrupted; keep the user's speech from its onset"""
+        self._read_cursor = max(onset - self.pre_roll, self.capture.buffer.oldest)
+        
+    def record(self, seconds: float) -> Optional[np.ndarray]:
+        """Next `seconds` of audio as a zero-copy view of the capture buffer
+
+        Continues from where the previous recording ended so nothing said
+        between calls is lost, but never replays more than one window of
+        backlog.
+        """
+        n = int(self.rate * seconds)
+        start = max(self._read_cursor, self.capture.position - n)
+        audio_data = self.capture.read(start, n)
+        if audio_data is not None:
+            self._read_cursor = start + n
+        return audio_data
+        
+    def record_utterance(self) -> Optional[np.ndarray]:
+        """Audio from speech onset (plus pre-roll) to the endpoint, or None if nobody spoke"""
+        start = max(self._read_cursor, self.capture.position - self.endpointer.no_speech_samples)
+        segment, scanned, metrics = self.endpointer.find_utterance(self.capture.buffer, start)
+        self.endpoint_metrics.append(metrics)
+        self._read_cursor = scanned
+        if segment is None:
+            return None
+        onset, end = segment
+        self.logger.debug(
+            f"Endpoint: onset {metrics.onset_ms:.0f} ms, speech {metrics.speech_ms:.0f} ms, "
+            f"decision lag {metrics.decision_lag_ms:.0f} ms"
+        )
+        return self.capture.buffer.view(max(onset - self.pre_roll, self.capture.buffer.oldest), end)
+        
+    def skip_pending_audio(self) -> None:
+        """Drop captured audio up to now (e.g. our own voice while speaking)"""
+        self._read_cursor = self.capture.position
+        
+    def _transcribe(self, audio_data: np.ndarray, profile: Optional[DecodingProfile] = None) -> str:
+        start = time.perf_counter()
+        try:
+            return self.asr.transcribe(audio_data, profile or self.profile)
+        finally:
+            self.asr_seconds += time.perf_counter() - start
+        
+    def stream_transcribe(self, profile: Optional[str] = None) -> Iterator[PartialTranscript]:
+        """Partial transcripts of the next utterance, ending with a final one
+
+        Yields nothing if nobody spoke before the no-speech timeout.
+        """
+        start = max(self._read_cursor, self.capture.position - self.endpointer.no_speech_samples)
+        transcribe = None
+        if profile is not None:
+            decoding = get_profile(profile)
+            transcribe = lambda audio_data: self._transcribe(audio_data, decoding)
+        session = self.streamer.stream(self.capture.buffer, start, transcribe)
+        try:
+            while True:
+                try:
+                    partial = next(session)
+                except StopIteration as done:
+                    self._read_cursor, metrics = done.value
+                    self.endpoint_metrics.append(metrics.endpoint)
+                    self.stream_metrics.append(metrics)
+                    self.logger.debug(
+                        f"Streamed ASR: {metrics.decodes} decodes, first partial "
+                        f"{metrics.first_partial_ms or 0:.0f} ms, finalize {metrics.finalize_ms:.0f} ms"
+                    )
+                    return
+                yield partial
+        finally:
+            if session.gi_frame is not None:
+                # Abandoned mid-utterance: don't hand the rest of it to the next listener
+                session.close()
+                self._read_cursor = self.capture.position
+        
+    def listen_and_transcribe(self, on_partial: Optional[Callable[[PartialTranscript], None]] = None,
+                              profile: Optional[str] = None) -> Optional[str]:
+        """Record audio and transcribe it to text
+
+        `profile` names a decoding profile ("command", "dictation"); defaults
+        to ASR_PROFILE. Stage timings are left in last_timings.
+        """
+        start = time.perf_counter()
+        asr_before = self.asr_seconds
+        try:
+            return self._listen(on_partial, profile)
+        finally:
+            listen_ms = (time.perf_counter() - start) * 1000
+            asr_ms = (self.asr_seconds - asr_before) * 1000
+            self.last_timings = {"listen_ms": listen_ms, "asr_ms": asr_ms, "capture_ms": listen_ms - asr_ms}
+            
+    def _listen(self, on_partial: Optional[Callable[[PartialTranscript], None]],
+                profile: Optional[str]) -> Optional[str]:
+        try:
             self.logger.info("Listening...")
-            frames = []
+            if self.streamer is not None:
+                final = None
+                for partial in self.stream_transcribe(profile):
+                    if partial.final:
+                        final = partial.text
+                    elif on_partial is not None:
+                        on_partial(partial)
+                self.logger.info("Finished recording")
+                return final or None
             
-            # Record audio
-            for _ in range(0, int(self.rate / self.chunk * self.record_seconds)):
-                try:
-                    data = stream.read(self.chunk, exception_on_overflow=False)
-                    frames.append(np.frombuffer(data, dtype=np.float32))
-                except Exception as e:
-                    self.logger.debug(f"Non-critical error during recording: {e}")
-                    continue
-                
+            if self.endpointer is not None:
+                audio_data = self.record_utterance()
+            else:
+                audio_data = self.record(self.record_seconds)
             self.logger.info("Finished recording")
             
-            # Stop and close the stream
-            stream.stop_stream()
-            stream.close()
-            
-            if not frames:
+            if audio_data is None or not len(audio_data):
                 return None
             
-            # Convert audio to numpy array
-            audio_data = np.concatenate(frames, axis=0)
-            
-            # Transcribe using whisper
-            result = self.model.transcribe(audio_data)
-            transcribed_text = result["text"].strip()
+            # Transcribe using the configured backend
+            transcribed_text = self._transcribe(audio_data, get_profile(profile) if profile else None)
             
             if transcribed_text:
                 self.logger.debug(f"Transcribed text: {transcribed_text}")
@@ -83,18 +282,128 @@ class Speech:
             self.logger.error(f"Error in listen_and_transcribe: {e}")
             return None
             
-    def speak(self, text: str) -> None:
-        """Convert text to speech"""
+    def wait_for_wake_word(self) -> Tuple[bool, Optional[str]]:
+        """Listen for one utterance; returns (wake word heard, transcript if one was made)
+
+        With enrolled templates and VAD this never runs Whisper; otherwise the
+        utterance is transcribed and searched for WAKE_WORD.
+        """
+        if self.endpointer is None or not self.wake_detector.enrolled:
+            text = self.listen_and_transcribe()
+            self.last_timings["wake_ms"] = self.last_timings["asr_ms"]
+            return bool(text) and self.config.WAKE_WORD.lower() in text.lower(), text
+        try:
+            audio_data = self.record_utterance()
+            if audio_data is None:
+                return False, None
+            start = time.perf_counter()
+            detected, score = self.wake_detector.detect(audio_data)
+            self.last_timings = {"wake_ms": (time.perf_counter() - start) * 1000}
+            self.logger.debug(f"Wake word score {score:.2f} (threshold {self.wake_detector.threshold:.2f})")
+            return detected, None
+        except Exception as e:
+            self.logger.error(f"Error in wait_for_wake_word: {e}")
+            return False, None
+            
+    def say(self, text: str, priority: int = PRIORITY_NORMAL,
+            on_start: Optional[Callable[[], None]] = None) -> Future:
+        """Queue text to be spoken; the future resolves to False if it was cut off"""
+        self.logger.info(f"Speaking: {text}")
+        rendered = self.phrases.get(text) if self.phrases is not None else None
+        if rendered is not None:
+            return self.tts.play(rendered, text, priority, on_start)
+        return self.tts.say(text, priority, on_start)
+        
+    async def say_stream(self, tokens: AsyncIterator[str], priority: int = PRIORITY_NORMAL) -> StreamedSpeech:
+        """Speak generated text sentence by sentence while it is still arriving
+
+        Stops consuming tokens (which closes the generation request) once
+        the user barges in. Returns the full text and time-to-first-audio.
+        """
+        result = StreamedSpeech(started_at=time.perf_counter())
+        buffer = SentenceBuffer(self.tts.max_chunk_chars)
+        pending: List[Future] = []
+        queued: List[str] = []
+        parts: List[str] = []
+        first_audio: List[float] = []  # appended on the TTS thread
+        
+        def elapsed_ms() -> float:
+            return (time.perf_counter() - result.started_at) * 1000
+        
+        def started() -> None:
+            if not first_audio:
+                first_audio.append(time.perf_counter())
+        
+        def queue(sentence: str) -> None:
+            if result.first_sentence_ms is None:
+                result.first_sentence_ms = elapsed_ms()
+            pending.append(self.say(sentence, priority, on_start=started))
+            queued.append(sentence)
+            result.sentences += 1
+        
+        def cut_off() -> bool:
+            return any(f.done() and (f.cancelled() or f.result() is False) for f in pending)
+        
+        try:
+            async for token in tokens:
+                if result.first_token_ms is None:
+                    result.first_token_ms = elapsed_ms()
+                parts.append(token)
+                for sentence in buffer.feed(token):
+                    queue(sentence)
+                if cut_off():
+                    result.completed = False
+                    break
+            else:
+                for sentence in buffer.flush():
+                    queue(sentence)
+        finally:
+            if hasattr(tokens, "aclose"):
+                await tokens.aclose()
+        
+        spoken = [False if f.cancelled() else await asyncio.wrap_future(f) for f in pending]
+        result.completed = result.completed and all(spoken)
+        result.text = "".join(parts).strip()
+        result.spoken_text = " ".join(s for s, done in zip(queued, spoken) if done)
+        if first_audio:
+            result.first_audio_ms = (first_audio[0] - result.started_at) * 1000
+        result.total_ms = elapsed_ms()
+        self.logger.info(f"Streamed reply: first audio after {result.first_audio_ms} ms, "
+                         f"{result.sentences} sentence(s)")
+        return result
+        
+    def prerender(self, phrases: Iterable[str]) -> List[Future]:
+        """Render fixed phrases to the phrase cache in the background"""
+        if self.phrases is None:
+            return []
+        futures = []
+        for text in self.phrases.missing(phrases):
+            future = self.tts.run_job(lambda engine, text=text: self.phrases.render(engine, text), PRIORITY_LOW)
+            future.add_done_callback(self._log_render_failure)
+            futures.append(future)
+        return futures
+        
+    def _log_render_failure(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Could not pre-render phrase: {future.exception()}")
+        
+    def speak(self, text: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """Convert text to speech and wait until it has been spoken"""
         try:
-            self.logger.info(f"Speaking: {text}")
-            self.engine.say(text)
-            self.engine.runAndWait()
+            return self.say(text, priority).result()
         except Exception as e:
             self.logger.error(f"Error in speak: {e}")
+            return False
             
     def __del__(self):
         """Cleanup resources"""
         try:
+            if self.barge_in is not None:
+                self.barge_in.stop()
+            self.tts.stop()
+            self.capture.stop()
             self.audio.terminate()
+            if isinstance(self.asr, ASRPool):
+                self.asr.shutdown(wait=False)
         except:
             pass
\ No newline at end of file
@@ -0,0 +1,151 @@
+import re
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Generator, List, Optional, Tuple
+import numpy as np
+from modules.audio_buffer import AudioRingBuffer
+from modules.vad import Endpointer, EndpointMetrics
+
+_PUNCTUATION = re.compile(r"[^\w']+")
+
+
+@dataclass
+class PartialTranscript:
+    """One hypothesis for the utterance in progress"""
+    text: str                 # stable words plus the current tentative tail
+    stable: str               # agreed on by consecutive decodes; never revised
+    final: bool = False
+    audio_ms: float = 0.0     # utterance audio this hypothesis covers
+    decode_ms: float = 0.0
+
+
+@dataclass
+class StreamMetrics:
+    """Cost and latency of one streamed utterance (wall-clock milliseconds)"""
+    decodes: int = 0
+    decode_ms: float = 0.0
+    first_partial_ms: Optional[float] = None  # speech onset detected -> first partial
+    finalize_ms: float = 0.0                  # endpoint decided -> final transcript
+    reused_final: bool = False                # last partial already covered all speech
+    endpoint: EndpointMetrics = field(default_factory=EndpointMetrics)
+
+
+def _normalize(word: str) -> str:
+    return _PUNCTUATION.sub("", word.lower())
+
+
+def _common_prefix(a: List[str], b: List[str]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if _normalize(x) != _normalize(y):
+            break
+        n += 1
+    return n
+
+
+class StreamingTranscriber:
+    """Transcribes an utterance repeatedly while it is being spoken
+
+    Each decode covers the utterance from onset to the newest audio, so
+    consecutive windows overlap. Words on which two consecutive hypotheses
+    agree become stable. A decode is also triggered as soon as the speaker
+    pauses, so by the time the trailing silence has been waited out the
+    final transcript is usually already available and no decode remains.
+    """
+
+    def __init__(self, endpointer: Endpointer, transcribe: Callable[[np.ndarray], str], rate: int,
+                 step_ms: int = 500, settle_ms: int = 150, pre_roll: int = 0):
+        self.logger = logging.getLogger('FRIDAY.StreamingASR')
+        self.endpointer = endpointer
+        self.transcribe = transcribe
+        self.rate = rate
+        self.step = int(rate * step_ms / 1000)
+        self.settle = int(rate * settle_ms / 1000)
+        self.pre_roll = pre_roll
+
+    def stream(self, buffer: AudioRingBuffer, start: int,
+               transcribe: Optional[Callable[[np.ndarray], str]] = None) -> Generator[
+            PartialTranscript, None, Tuple[int, StreamMetrics]]:
+        """Yield partial transcripts, then a final one if anybody spoke
+
+        `transcribe` overrides the default for this utterance. Returns
+        (scanned-up-to position, metrics) as the generator's value.
+        """
+        transcribe = transcribe or self.transcribe
+        metrics = StreamMetrics()
+        scan = self.endpointer.scan(buffer, start)
+        onset_wall = None
+        audio_start = None
+        decoded_to = None
+        hypothesis: List[str] = []
+        stable: List[str] = []
+
+        while True:
+            try:
+                progress = next(scan)
+            except StopIteration as done:
+                segment, scanned, metrics.endpoint = done.value
+                break
+            if progress.onset is None:
+                continue
+            if audio_start is None:
+                onset_wall = time.perf_counter()
+                audio_start = max(progress.onset - self.pre_roll, buffer.oldest)
+                decoded_to = progress.onset
+            if progress.last_speech_end <= decoded_to:
+                continue  # nothing new has been said since the last decode
+            pending = progress.scanned - decoded_to
+            paused = progress.scanned - progress.last_speech_end >= self.settle
+            if pending < self.step and not paused:
+                continue
+
+            audio_start = max(audio_start, buffer.oldest)
+            words, decode_ms = self._decode(transcribe, buffer, audio_start, progress.scanned, metrics)
+            decoded_to = progress.scanned
+            agreed = _common_prefix(hypothesis, words)
+            if agreed > len(stable):
+                stable = stable + words[len(stable):agreed]
+            hypothesis = words
+            tail = words[len(stable):]
+            if metrics.first_partial_ms is None:
+                metrics.first_partial_ms = (time.perf_counter() - onset_wall) * 1000
+            yield PartialTranscript(
+                text=" ".join(stable + tail),
+                stable=" ".join(stable),
+                audio_ms=(decoded_to - audio_start) * 1000 / self.rate,
+                decode_ms=decode_ms
+            )
+
+        if segment is None:
+            return scanned, metrics
+
+        end_wall = time.perf_counter()
+        onset, end = segment
+        if audio_start is None:
+            audio_start = max(onset - self.pre_roll, buffer.oldest)
+        if decoded_to is not None and decoded_to >= end and hypothesis:
+            words, decode_ms = hypothesis, 0.0
+            metrics.reused_final = True
+        else:
+            audio_start = max(audio_start, buffer.oldest)
+            words, decode_ms = self._decode(transcribe, buffer, audio_start, end, metrics)
+        metrics.finalize_ms = (time.perf_counter() - end_wall) * 1000
+        text = " ".join(words)
+        yield PartialTranscript(
+            text=text,
+            stable=text,
+            final=True,
+            audio_ms=(end - audio_start) * 1000 / self.rate,
+            decode_ms=decode_ms
+        )
+        return scanned, metrics
+
+    def _decode(self, transcribe: Callable[[np.ndarray], str], buffer: AudioRingBuffer,
+                start: int, end: int, metrics: StreamMetrics) -> Tuple[List[str], float]:
+        t0 = time.perf_counter()
+        text = transcribe(buffer.view(start, end))
+        decode_ms = (time.perf_counter() - t0) * 1000
+        metrics.decodes += 1
+        metrics.decode_ms += decode_ms
+        return text.split(), decode_ms
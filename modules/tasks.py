@@ -11,32 +11,42 @@ import requests
 from typing import Dict, Optional
 import logging
 from config import Config
+from modules.command_registry import LATENCY_FAST, LATENCY_SLOW
 
 class TaskManager:
+    # First command word -> handler method name
+    # Launch or arrange applications
+    APP_COMMANDS = {
+        'open': '_open_application',
+        'close': '_close_application',
+        'safari': '_handle_safari',
+        'mail': '_handle_mail',
+        'music': '_handle_music',
+        'workspace': '_handle_workspace'
+    }
+    
+    # Single system setting or power action
+    SYSTEM_COMMANDS = {
+        'brightness': '_adjust_brightness',
+        'volume': '_adjust_volume',
+        'focus': '_handle_focus_mode',
+        'sleep': '_system_sleep',
+        'restart': '_system_restart',
+        'shutdown': '_system_shutdown'
+    }
+    
+    COMMANDS = {**APP_COMMANDS, **SYSTEM_COMMANDS}
+
+    # (group, table, latency class, side effects) for CommandRegistry; intents are tasks.<word>
+    COMMAND_GROUPS = [
+        ("", APP_COMMANDS, LATENCY_SLOW, True),
+        ("", SYSTEM_COMMANDS, LATENCY_FAST, True)
+    ]
+
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger('FRIDAY.TaskManager')
-        self.command_map = {
-            # System commands
-            'open': self._open_application,
-            'close': self._close_application,
-            'brightness': self._adjust_brightness,
-            'volume': self._adjust_volume,
-            
-            # Application commands
-            'safari': self._handle_safari,
-            'mail': self._handle_mail,
-            'music': self._handle_music,
-            
-            # Workspace commands
-            'workspace': self._handle_workspace,
-            'focus': self._handle_focus_mode,
-            
-            # System controls
-            'sleep': self._system_sleep,
-            'restart': self._system_restart,
-            'shutdown': self._system_shutdown
-        }
+        self.command_map = {word: getattr(self, name) for word, name in self.COMMANDS.items()}
 
     def execute_command(self, command: str) -> str:
         """Execute a given command"""
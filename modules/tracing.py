@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+import numpy as np
+
+
+@dataclass
+class Span:
+    trace_id: str
+    name: str
+    start: float            # epoch seconds
+    offset_ms: float        # since the start of the trace
+    duration_ms: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace": self.trace_id,
+            "span": self.name,
+            "ts": round(self.start, 6),
+            "offset_ms": round(self.offset_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            **self.attrs,
+        }
+
+
+class Trace:
+    """Spans of one interaction; written to the sink when finished"""
+
+    def __init__(self, tracer: "Tracer", name: str, **attrs):
+        self.tracer = tracer
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.spans: List[Span] = []
+        self._start = time.time()
+        self._t0 = time.perf_counter()
+        self._finished = False
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """Time a block; the yielded dict can take extra attributes"""
+        t0 = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self._add(name, t0, time.perf_counter(), attrs)
+
+    def record(self, name: str, duration_ms: float, end: Optional[float] = None, **attrs) -> None:
+        """Add a span measured elsewhere, ending at end (a perf_counter() time) or now"""
+        if end is None:
+            end = time.perf_counter()
+        self._add(name, end - duration_ms / 1000, end, attrs)
+
+    def _add(self, name: str, t0: float, t1: float, attrs: Dict[str, Any]) -> None:
+        self.spans.append(Span(
+            self.id, name,
+            start=self._start + (t0 - self._t0),
+            offset_ms=(t0 - self._t0) * 1000,
+            duration_ms=(t1 - t0) * 1000,
+            attrs=attrs
+        ))
+
+    def finish(self, **attrs) -> None:
+        """Close the trace with a span covering all of it and flush"""
+        if self._finished:
+            return
+        self._finished = True
+        self._add(self.name, self._t0, time.perf_counter(), {**self.attrs, **attrs})
+        self.tracer.emit(self)
+
+    def __enter__(self) -> "Trace":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.finish(**({"error": exc_type.__name__} if exc_type else {}))
+
+
+class JSONLSink:
+    """One JSON object per span, appended to a file"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(s.to_dict()) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class SQLiteSink:
+    """Spans in a `spans` table, for ad-hoc SQL"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS spans (
+                trace_id TEXT, name TEXT, ts REAL, offset_ms REAL, duration_ms REAL, attrs TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS spans_ts ON spans (ts)")
+        self._conn.commit()
+
+    def write(self, spans: List[Span]) -> None:
+        rows = [(s.trace_id, s.name, s.start, s.offset_ms, s.duration_ms, json.dumps(s.attrs)) for s in spans]
+        with self._lock:
+            self._conn.executemany("INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT trace_id, name, ts, offset_ms, duration_ms, attrs FROM spans ORDER BY ts"
+            ).fetchall()
+        for trace_id, name, ts, offset_ms, duration_ms, attrs in rows:
+            yield {"trace": trace_id, "span": name, "ts": ts, "offset_ms": offset_ms,
+                   "duration_ms": duration_ms, **json.loads(attrs or "{}")}
+
+
+def open_sink(path: Union[str, Path]):
+    """SQLite for .db/.sqlite paths, JSONL otherwise"""
+    path = Path(os.path.expanduser(str(path)))
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteSink(path)
+    return JSONLSink(path)
+
+
+class Tracer:
+    """Creates traces and hands finished ones to the sink
+
+    Without a sink traces are still timed but discarded, so call sites
+    don't need to check whether tracing is on.
+    """
+
+    def __init__(self, sink=None):
+        self.logger = logging.getLogger('FRIDAY.Tracer')
+        self.sink = sink
+
+    def start(self, name: str = "interaction", **attrs) -> Trace:
+        return Trace(self, name, **attrs)
+
+    def emit(self, trace: Trace) -> None:
+        if self.sink is None:
+            return
+        try:
+            self.sink.write(trace.spans)
+        except Exception as e:
+            self.logger.error(f"Could not write trace {trace.id}: {e}")
+
+
+def stage_report(records: Iterator[Dict[str, Any]], since: Optional[float] = None) -> str:
+    """Count, mean and p50/p95/p99 per span name, in pipeline order"""
+    durations: Dict[str, List[float]] = {}
+    offsets: Dict[str, List[float]] = {}
+    for r in records:
+        if since is not None and r.get("ts", 0) < since:
+            continue
+        durations.setdefault(r["span"], []).append(r["duration_ms"])
+        offsets.setdefault(r["span"], []).append(r.get("offset_ms", 0.0))
+    if not durations:
+        return "no spans recorded"
+
+    order = sorted(durations, key=lambda name: np.mean(offsets[name]))
+    width = max(len(name) for name in order)
+    lines = [f"{'stage':<{width}} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)"]
+    for name in order:
+        values = np.array(durations[name])
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        lines.append(f"{name:<{width}} {len(values):>7} {values.mean():>9.1f} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from FRIDAY traces")
+    parser.add_argument("path", nargs="?", help="trace file (default TRACE_FILE)")
+    parser.add_argument("--hours", type=float, help="only spans from the last N hours")
+    args = parser.parse_args()
+
+    path = args.path or Config.load().TRACE_FILE
+    since = time.time() - args.hours * 3600 if args.hours else None
+    print(stage_report(open_sink(path).read(), since))
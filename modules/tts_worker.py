@@ -0,0 +1,380 @@
+import re
+import time
+import heapq
+import subprocess
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+import numpy as np
+from modules.audio_buffer import AudioRingBuffer
+from modules.vad import VoiceActivityDetector
+
+# Lower runs first
+PRIORITY_URGENT = 0     # errors, shutdown
+PRIORITY_NORMAL = 10    # replies to the user
+PRIORITY_LOW = 20       # background notifications
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+_CLAUSE_END = re.compile(r"(?<=,)\s+")
+
+
+def split_sentences(text: str, max_chars: int = 200) -> List[str]:
+    """Sentence-sized chunks; overlong sentences are split at commas, then words"""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for piece in _CLAUSE_END.split(sentence):
+            for word in piece.split(" ") if len(piece) > max_chars else [piece]:
+                if current and len(current) + len(word) + 1 > max_chars:
+                    chunks.append(current)
+                    current = word
+                else:
+                    current = f"{current} {word}" if current else word
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class SentenceBuffer:
+    """Collects streamed text and releases it a sentence at a time
+
+    A sentence is complete once the whitespace after its punctuation has
+    arrived, so "3." followed by "5" is not split. Text that grows past
+    max_chars without a sentence end is released at commas or words.
+    """
+
+    def __init__(self, max_chars: int = 200):
+        self.max_chars = max_chars
+        self._text = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._text += text
+        parts = _SENTENCE_END.split(self._text)
+        self._text = parts.pop()
+        ready = [p for p in parts if p.strip()]
+        if len(self._text) > self.max_chars:
+            # Keep the trailing space, or the next token is glued to the last word
+            trailing = self._text[len(self._text.rstrip()):]
+            chunks = split_sentences(self._text, self.max_chars)
+            ready.extend(chunks[:-1])
+            self._text = chunks[-1] + trailing
+        return ready
+
+    def flush(self) -> List[str]:
+        rest, self._text = self._text.strip(), ""
+        return [rest] if rest else []
+
+
+@dataclass
+class StreamedSpeech:
+    """What speaking a token stream cost; times are ms from the start of the stream"""
+    started_at: float                       # time.perf_counter() at the start
+    text: str = ""
+    spoken_text: str = ""                      # sentences the user heard in full
+    sentences: int = 0
+    first_token_ms: Optional[float] = None
+    first_sentence_ms: Optional[float] = None  # first sentence handed to TTS
+    first_audio_ms: Optional[float] = None     # TTS started speaking it
+    total_ms: float = 0.0
+    completed: bool = True                     # False if the user cut us off
+
+
+@dataclass
+class Utterance:
+    """Queued text; done resolves True once fully spoken, False if cancelled
+
+    With `audio` set, that pre-rendered file is played instead of
+    synthesizing the text. on_start is called on the worker thread just
+    before the first chunk is spoken.
+    """
+    text: str
+    chunks: List[str]
+    priority: int
+    audio: Optional[str] = None
+    done: Future = field(default_factory=Future)
+    spoken: int = 0
+    on_start: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class EngineJob:
+    """Work that needs the engine but produces no sound (e.g. rendering to a file)"""
+    func: Callable[[Any], Any]
+    done: Future = field(default_factory=Future)
+
+
+class TTSWorker:
+    """Speaks queued utterances on a dedicated thread that owns the engine
+
+    Utterances are spoken one sentence at a time and requeued between
+    sentences, so an urgent message gets in after the current sentence and
+    an interrupt never has to wait for a whole paragraph.
+    """
+
+    def __init__(self, engine_factory: Callable, on_idle: Optional[Callable[[bool], None]] = None,
+                 max_chunk_chars: int = 200, player: Optional[str] = None):
+        self.logger = logging.getLogger('FRIDAY.TTS')
+        self.engine_factory = engine_factory
+        self.engine = None
+        self.player = player
+        self._playback: Optional[subprocess.Popen] = None
+        self.on_idle = on_idle
+        self.max_chunk_chars = max_chunk_chars
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._interrupted = False
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self.speaking = threading.Event()
+        # Set once sound is actually being produced for the current reply
+        self.audible = threading.Event()
+        self._engine_reports_start = False
+
+    def start(self) -> None:
+        """Start the worker thread and wait until the engine is initialized"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def say(self, text: str, priority: int = PRIORITY_NORMAL,
+            on_start: Optional[Callable[[], None]] = None) -> Future:
+        """Queue text; returns a future resolving to True when spoken"""
+        chunks = split_sentences(text, self.max_chunk_chars)
+        utterance = Utterance(text, chunks, priority, on_start=on_start)
+        if not chunks or not self._running:
+            utterance.done.set_result(not chunks)
+            return utterance.done
+        return self._push(priority, utterance)
+
+    def play(self, path: str, text: str = "", priority: int = PRIORITY_NORMAL,
+             on_start: Optional[Callable[[], None]] = None) -> Future:
+        """Queue a pre-rendered audio file (requires a player)
+
+        Playback counts as speaking like synthesized text: barge-in can cut
+        it off and the audio captured meanwhile is skipped afterwards.
+        """
+        utterance = Utterance(text, [text], priority, audio=path, on_start=on_start)
+        if not self._running or not self.player:
+            utterance.done.set_result(False)
+            return utterance.done
+        return self._push(priority, utterance)
+
+    def run_job(self, func: Callable[[Any], Any], priority: int = PRIORITY_LOW) -> Future:
+        """Run func(engine) on the worker thread; the future carries its result"""
+        job = EngineJob(func)
+        if not self._running:
+            job.done.set_exception(RuntimeError("TTS worker is not running"))
+            return job.done
+        return self._push(priority, job)
+
+    def _push(self, priority: int, item) -> Future:
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._seq), item))
+            self._cond.notify()
+        return item.done
+
+    def interrupt(self) -> int:
+        """Barge-in: cut off the current sentence and drop everything queued"""
+        with self._cond:
+            dropped = [entry[2] for entry in self._queue if isinstance(entry[2], Utterance)]
+            self._queue = [entry for entry in self._queue if isinstance(entry[2], EngineJob)]
+            heapq.heapify(self._queue)
+            self._interrupted = True
+        for utterance in dropped:
+            utterance.done.set_result(False)
+        playback = self._playback
+        if playback is not None:
+            playback.terminate()
+        if self.speaking.is_set() and self.engine is not None:
+            try:
+                self.engine.stop()
+            except Exception as e:
+                self.logger.debug(f"engine.stop() failed: {e}")
+        return len(dropped)
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self.speaking.is_set() or any(isinstance(entry[2], Utterance) for entry in self._queue)
+
+    def _run(self) -> None:
+        try:
+            self.engine = self.engine_factory()
+            if hasattr(self.engine, "connect"):
+                # pyttsx3 reports when the synthesizer starts producing sound
+                self.engine.connect('started-utterance', lambda name: self.audible.set())
+                self._engine_reports_start = True
+        except Exception as e:
+            self.logger.error(f"Could not initialize TTS engine: {e}")
+            self._running = False
+        finally:
+            self._ready.set()
+
+        while self._running:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                priority, seq, utterance = heapq.heappop(self._queue)
+                if isinstance(utterance, EngineJob):
+                    job = utterance
+                else:
+                    # Text and pre-rendered audio alike; only engine jobs are silent
+                    job = None
+                    self._interrupted = False
+                    self.speaking.set()
+
+            if job is not None:
+                self._run_job(job)
+                continue
+
+            chunk = utterance.chunks[utterance.spoken]
+            if utterance.spoken == 0 and utterance.on_start is not None:
+                try:
+                    utterance.on_start()
+                except Exception as e:
+                    self.logger.error(f"on_start callback failed: {e}")
+            try:
+                if utterance.audio is not None:
+                    self._play(utterance.audio)
+                else:
+                    if not self._engine_reports_start:
+                        self.audible.set()
+                    self.engine.say(chunk)
+                    self.engine.runAndWait()
+            except Exception as e:
+                self.logger.error(f"Error speaking {chunk!r}: {e}")
+            utterance.spoken += 1
+
+            with self._cond:
+                interrupted = self._interrupted
+                if interrupted:
+                    utterance.done.set_result(False)
+                elif utterance.spoken < len(utterance.chunks):
+                    # Same (priority, seq): urgent items go first, order is otherwise kept
+                    heapq.heappush(self._queue, (priority, seq, utterance))
+                else:
+                    utterance.done.set_result(True)
+                idle = not any(isinstance(entry[2], Utterance) for entry in self._queue)
+                if idle:
+                    self.audible.clear()
+                    self.speaking.clear()
+            if idle and self.on_idle is not None:
+                self.on_idle(interrupted)
+
+    def _run_job(self, job: EngineJob) -> None:
+        try:
+            job.done.set_result(job.func(self.engine))
+        except Exception as e:
+            job.done.set_exception(e)
+
+    def _play(self, path: str) -> None:
+        self._playback = subprocess.Popen([self.player, path],
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.audible.set()
+        try:
+            self._playback.wait()
+        finally:
+            self._playback = None
+
+    def stop(self) -> None:
+        self.interrupt()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        with self._cond:
+            pending, self._queue = self._queue, []
+        for entry in pending:
+            entry[2].done.cancel()
+
+
+class BargeInMonitor:
+    """Interrupts the TTS worker when the user talks over it
+
+    The microphone also hears our own voice, so the reference level is
+    measured over the first frames of each reply once the worker reports
+    it audible (not when synthesis starts, which is still silent) and the
+    user must exceed it by margin_db for min_speech_ms.
+    """
+
+    def __init__(self, buffer: AudioRingBuffer, vad: VoiceActivityDetector, worker: TTSWorker,
+                 on_barge_in: Callable[[int], None], margin_db: float = 12.0,
+                 min_speech_ms: int = 200, calibration_ms: int = 300):
+        self.logger = logging.getLogger('FRIDAY.BargeIn')
+        self.buffer = buffer
+        self.vad = vad
+        self.worker = worker
+        self.on_barge_in = on_barge_in
+        self.margin_db = margin_db
+        self.min_frames = max(1, int(vad.rate * min_speech_ms / 1000) // vad.frame)
+        self.calibration_frames = max(1, int(vad.rate * calibration_ms / 1000) // vad.frame)
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        frame = self.vad.frame
+        while self._running.is_set():
+            if not self.worker.speaking.wait(timeout=0.5):
+                continue
+            # Calibrate on our own voice, not the silence before it starts
+            if not self.worker.audible.wait(timeout=0.1):
+                continue
+            pos = self.buffer.position
+            levels: List[float] = []
+            reference = None
+            run = 0
+            while self._running.is_set() and self.worker.speaking.is_set():
+                if not self.buffer.wait_for(pos + frame * 3, timeout=0.5):
+                    continue
+                pos = max(pos, self.buffer.oldest)
+                n = (self.buffer.position - pos) // frame
+                energy_db, _ = self.vad.features(self.buffer.view(pos, pos + n * frame))
+                for i, level in enumerate(energy_db):
+                    if reference is None:
+                        levels.append(float(level))
+                        if len(levels) >= self.calibration_frames:
+                            reference = float(np.median(levels))
+                        continue
+                    run = run + 1 if level > reference + self.margin_db else 0
+                    if run >= self.min_frames:
+                        onset = pos + (i + 1 - run) * frame
+                        self.logger.info("User started speaking; interrupting")
+                        self.worker.interrupt()
+                        self.on_barge_in(onset)
+                        break
+                pos += n * frame
+                if run >= self.min_frames:
+                    # The current sentence is being cut off; wait for the worker to go idle
+                    while self._running.is_set() and self.worker.speaking.is_set():
+                        time.sleep(0.05)
+                    break
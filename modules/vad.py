@@ -0,0 +1,189 @@
+import time
+import logging
+from dataclasses import dataclass
+from typing import Generator, NamedTuple, Optional, Tuple
+import numpy as np
+from modules.audio_buffer import AudioRingBuffer
+
+
+@dataclass
+class EndpointMetrics:
+    """Timing for one endpointed utterance (all in milliseconds of audio unless noted)"""
+    onset_ms: Optional[float] = None      # audio before speech started
+    speech_ms: float = 0.0                # onset to last speech frame
+    trailing_silence_ms: float = 0.0      # silence waited out before ending
+    total_ms: float = 0.0                 # audio examined in total
+    wall_ms: float = 0.0                  # wall-clock time spent endpointing
+    decision_lag_ms: float = 0.0          # wall-clock delay between speech end and the endpoint decision
+    frames: int = 0
+    hit_max_length: bool = False
+    no_speech: bool = False
+
+
+class EndpointProgress(NamedTuple):
+    """Endpointer state after a block: absolute sample positions"""
+    onset: Optional[int]            # None until speech has started
+    last_speech_end: Optional[int]
+    scanned: int
+
+
+class VoiceActivityDetector:
+    """Frame-level speech/non-speech decisions from energy and zero-crossing rate
+
+    Features are computed for a whole block of frames at once with numpy.
+    The noise floor adapts on frames classified as non-speech.
+    """
+
+    ZCR_UNVOICED = (0.25, 0.6)  # zero-crossing band typical of fricatives
+
+    def __init__(self, rate: int, frame_ms: int = 30, margin_db: float = 10.0,
+                 min_energy_db: float = -60.0, adapt_rate: float = 0.05):
+        self.rate = rate
+        self.frame = int(rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_energy_db = min_energy_db
+        self.adapt_rate = adapt_rate
+        self.noise_floor_db: Optional[float] = None
+
+    def features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-frame energy (dBFS) and zero-crossing rate; trailing partial frame is ignored"""
+        n = len(audio) // self.frame
+        frames = audio[:n * self.frame].reshape(n, self.frame)
+        power = np.einsum('ij,ij->i', frames, frames) / self.frame
+        energy_db = 10.0 * np.log10(power + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame - 1)
+        return energy_db, zcr
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        energy_db, zcr = self.features(audio)
+        if not len(energy_db):
+            return np.zeros(0, dtype=bool)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(np.percentile(energy_db, 20))
+
+        floor = max(self.noise_floor_db, self.min_energy_db)
+        loud = energy_db > floor + self.margin_db
+        fricative = (
+            (energy_db > floor + self.margin_db / 2)
+            & (zcr >= self.ZCR_UNVOICED[0]) & (zcr <= self.ZCR_UNVOICED[1])
+        )
+        mask = loud | fricative
+
+        quiet = energy_db[~mask]
+        if len(quiet):
+            self.noise_floor_db += self.adapt_rate * (float(quiet.mean()) - self.noise_floor_db)
+        return mask
+
+
+class Endpointer:
+    """Finds one utterance in an AudioRingBuffer: starts at onset, ends after trailing silence"""
+
+    def __init__(self, vad: VoiceActivityDetector, trailing_silence_ms: int = 700,
+                 onset_ms: int = 90, max_utterance_seconds: float = 15.0,
+                 no_speech_timeout: float = 3.0, block_ms: int = 100):
+        self.logger = logging.getLogger('FRIDAY.Endpointer')
+        self.vad = vad
+        frame = vad.frame
+        self.frame = frame
+        self.onset_frames = max(1, int(vad.rate * onset_ms / 1000) // frame)
+        self.trailing_frames = max(1, int(vad.rate * trailing_silence_ms / 1000) // frame)
+        self.max_samples = int(vad.rate * max_utterance_seconds)
+        self.no_speech_samples = int(vad.rate * no_speech_timeout)
+        self.block_frames = max(1, int(vad.rate * block_ms / 1000) // frame)
+
+    def _ms(self, samples: int) -> float:
+        return samples * 1000.0 / self.vad.rate
+
+    def find_utterance(self, buffer: AudioRingBuffer,
+                       start: int) -> Tuple[Optional[Tuple[int, int]], int, EndpointMetrics]:
+        """Scan buffer from `start`; returns ((onset, end) or None, scanned-up-to, metrics)
+
+        If the stream ends or stalls mid-utterance, the utterance ends at the
+        last speech frame seen.
+        """
+        scan = self.scan(buffer, start)
+        while True:
+            try:
+                next(scan)
+            except StopIteration as done:
+                return done.value
+
+    def scan(self, buffer: AudioRingBuffer, start: int) -> Generator[
+            EndpointProgress, None, Tuple[Optional[Tuple[int, int]], int, EndpointMetrics]]:
+        """find_utterance() as a generator yielding progress after every block
+
+        Lets a consumer work on the utterance (e.g. partial transcription)
+        while it is still being spoken; the generator's return value is the
+        find_utterance() result.
+        """
+        frame = self.frame
+        metrics = EndpointMetrics()
+        wall_start = time.perf_counter()
+        pos = start
+        onset = None
+        last_speech_end = None
+        speech_run = 0
+        silence_run = 0
+        speech_end_wall = None
+        end = None
+
+        while end is None:
+            target = pos + self.block_frames * frame
+            ready = buffer.wait_for(target, timeout=self.block_frames * frame / self.vad.rate + 1.0)
+            pos = max(pos, buffer.oldest)
+            nframes = (buffer.position - pos) // frame
+            if not ready and not buffer.closed:
+                self.logger.warning("Timed out waiting for audio")
+            mask = self.vad.speech_mask(buffer.view(pos, pos + nframes * frame))
+            metrics.frames += nframes
+
+            for i, is_speech in enumerate(mask):
+                frame_start = pos + i * frame
+                if onset is None:
+                    speech_run = speech_run + 1 if is_speech else 0
+                    if speech_run >= self.onset_frames:
+                        onset = frame_start - (self.onset_frames - 1) * frame
+                        last_speech_end = frame_start + frame
+                elif is_speech:
+                    silence_run = 0
+                    speech_end_wall = None
+                    last_speech_end = frame_start + frame
+                else:
+                    if silence_run == 0:
+                        speech_end_wall = time.perf_counter()
+                    silence_run += 1
+                    if silence_run >= self.trailing_frames:
+                        end = last_speech_end
+                        pos = frame_start + frame
+                        break
+            else:
+                pos += nframes * frame
+
+            if end is not None:
+                break
+            yield EndpointProgress(onset, last_speech_end, pos)
+            if not ready:
+                # End of stream (or a stalled stream): close any open utterance
+                if onset is not None:
+                    end = last_speech_end
+                break
+            if onset is None and pos - start >= self.no_speech_samples:
+                metrics.no_speech = True
+                break
+            if onset is not None and pos - onset >= self.max_samples:
+                metrics.hit_max_length = True
+                end = onset + self.max_samples
+                break
+
+        metrics.wall_ms = (time.perf_counter() - wall_start) * 1000
+        metrics.total_ms = self._ms(pos - start)
+        if onset is None or end is None:
+            return None, pos, metrics
+
+        metrics.onset_ms = self._ms(onset - start)
+        metrics.speech_ms = self._ms(end - onset)
+        metrics.trailing_silence_ms = self._ms(pos - end)
+        if speech_end_wall is not None:
+            metrics.decision_lag_ms = (time.perf_counter() - speech_end_wall) * 1000
+        return (onset, end), pos, metrics
@@ -0,0 +1,314 @@
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+import numpy as np
+from modules.audio_buffer import AudioRingBuffer
+from modules.audio_io import read_wav, write_wav
+from modules.vad import VoiceActivityDetector, Endpointer
+
+
+class MFCC:
+    """Mel-frequency cepstral coefficients with per-utterance mean normalization
+
+    Window, mel filterbank and DCT matrix are built once; each call is a
+    handful of vectorized numpy operations.
+    """
+
+    def __init__(self, rate: int, n_mfcc: int = 13, n_mels: int = 26,
+                 frame_ms: int = 25, hop_ms: int = 10, preemphasis: float = 0.97):
+        self.rate = rate
+        self.frame = int(rate * frame_ms / 1000)
+        self.hop = int(rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.frame - 1).bit_length()
+        self.preemphasis = preemphasis
+        self.window = np.hamming(self.frame).astype(np.float32)
+        self.filterbank = self._mel_filterbank(n_mels)
+        self.dct = self._dct_matrix(n_mels, n_mfcc)
+
+    def _mel_filterbank(self, n_mels: int) -> np.ndarray:
+        def to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def to_hz(mel):
+            return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+        mels = np.linspace(to_mel(0.0), to_mel(self.rate / 2), n_mels + 2)
+        bins = np.floor((self.n_fft + 1) * to_hz(mels) / self.rate).astype(int)
+        bank = np.zeros((n_mels, self.n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return bank.T
+
+    @staticmethod
+    def _dct_matrix(n_mels: int, n_mfcc: int) -> np.ndarray:
+        n = np.arange(n_mels)
+        k = np.arange(n_mfcc)[:, None]
+        dct = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+        dct[0] /= np.sqrt(2.0)
+        return dct.T.astype(np.float32)
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """(frames, n_mfcc) features; empty if audio is shorter than one frame"""
+        if len(audio) < self.frame:
+            return np.zeros((0, self.dct.shape[1]), dtype=np.float32)
+        emphasized = np.empty_like(audio, dtype=np.float32)
+        emphasized[0] = audio[0]
+        np.subtract(audio[1:], self.preemphasis * audio[:-1], out=emphasized[1:])
+        frames = np.lib.stride_tricks.sliding_window_view(emphasized, self.frame)[::self.hop]
+        spectrum = np.fft.rfft(frames * self.window, n=self.n_fft)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) / self.n_fft
+        features = np.log(power @ self.filterbank + 1e-10) @ self.dct
+        return features - features.mean(axis=0)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray, band: float = 0.3) -> float:
+    """Length-normalized DTW distance between two feature sequences
+
+    Rows are computed whole: the left-neighbour dependency of the recurrence
+    unrolls into a cumulative sum plus a running minimum. `band` is the
+    Sakoe-Chiba width as a fraction of the longer sequence.
+    """
+    n, m = len(a), len(b)
+    if not n or not m:
+        return float('inf')
+    cost = np.sqrt(np.maximum(
+        (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * (a @ b.T), 0.0
+    ))
+    width = max(int(band * max(n, m)), abs(n - m) + 1)
+
+    prev = np.full(m + 1, np.inf)
+    prev[0] = 0.0
+    for i in range(1, n + 1):
+        center = i * m // n
+        lo, hi = max(1, center - width), min(m, center + width)
+        row = np.full(m + 1, np.inf)
+        # Best predecessor from the row above: diagonal or vertical step
+        above = np.minimum(prev[lo - 1:hi], prev[lo:hi + 1])
+        run = np.cumsum(cost[i - 1, lo - 1:hi])
+        shifted = np.concatenate(([0.0], run[:-1]))
+        row[lo:hi + 1] = run + np.minimum.accumulate(above - shifted)
+        prev = row
+    return float(prev[m] / (n + m))
+
+
+class WakeWordDetector:
+    """Keyword spotting by DTW against a few enrolled recordings of the wake word
+
+    Candidates are VAD-endpointed segments; anything far from the templates'
+    length is rejected before any features are computed.
+    """
+
+    def __init__(self, rate: int, template_dir: Optional[Union[str, Path]] = None,
+                 threshold: float = 9.0, length_tolerance: float = 0.6):
+        self.logger = logging.getLogger('FRIDAY.WakeWord')
+        self.rate = rate
+        self.threshold = threshold
+        self.length_tolerance = length_tolerance
+        self.mfcc = MFCC(rate)
+        self.templates: List[np.ndarray] = []
+        self.template_dir = Path(os.path.expanduser(str(template_dir))) if template_dir else None
+        if self.template_dir is not None and self.template_dir.is_dir():
+            self.load_templates(self.template_dir)
+
+    @property
+    def enrolled(self) -> bool:
+        return bool(self.templates)
+
+    def load_templates(self, directory: Union[str, Path]) -> int:
+        """Load every WAV in directory as a template; returns the number loaded"""
+        for path in sorted(Path(directory).glob("*.wav")):
+            try:
+                self._add_template(read_wav(path, self.rate))
+            except Exception as e:
+                self.logger.error(f"Could not load wake word template {path}: {e}")
+        self.logger.info(f"Loaded {len(self.templates)} wake word template(s)")
+        return len(self.templates)
+
+    def enroll(self, audio: np.ndarray) -> Optional[Path]:
+        """Add a recording of the wake word, saving it to template_dir if set"""
+        self._add_template(audio)
+        if self.template_dir is None:
+            return None
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+        path = self.template_dir / f"template_{int(time.time() * 1000)}.wav"
+        write_wav(path, audio, self.rate)
+        return path
+
+    def _add_template(self, audio: np.ndarray) -> None:
+        features = self.mfcc(self.trim(audio))
+        if len(features) < 5:
+            raise ValueError("template contains no speech")
+        self.templates.append(features)
+
+    def trim(self, audio: np.ndarray) -> np.ndarray:
+        """Cut leading and trailing non-speech frames"""
+        vad = VoiceActivityDetector(self.rate)
+        speech = np.flatnonzero(vad.speech_mask(audio))
+        if not len(speech):
+            return audio[:0]
+        return audio[speech[0] * vad.frame:(speech[-1] + 1) * vad.frame]
+
+    def score(self, audio: np.ndarray) -> float:
+        """Distance to the closest template (lower is better; inf if out of range)"""
+        if not self.templates:
+            return float('inf')
+        audio = self.trim(audio)
+        frames = max(0, (len(audio) - self.mfcc.frame) // self.mfcc.hop + 1)
+        lengths = [len(t) for t in self.templates]
+        if not (min(lengths) * (1 - self.length_tolerance) <= frames <= max(lengths) * (1 + self.length_tolerance)):
+            return float('inf')
+        features = self.mfcc(audio)
+        return min(dtw_distance(features, template) for template in self.templates)
+
+    def detect(self, audio: np.ndarray) -> Tuple[bool, float]:
+        score = self.score(audio)
+        return score <= self.threshold, score
+
+
+@dataclass
+class WakeWordReport:
+    """Accuracy and cost of the wake word gate over a set of WAV fixtures"""
+    threshold: float
+    positive_scores: List[float] = field(default_factory=list)
+    negative_scores: List[float] = field(default_factory=list)
+    negative_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+    @property
+    def false_reject_rate(self) -> float:
+        scores = self.positive_scores
+        return sum(s > self.threshold for s in scores) / len(scores) if scores else 0.0
+
+    @property
+    def false_accept_rate(self) -> float:
+        scores = self.negative_scores
+        return sum(s <= self.threshold for s in scores) / len(scores) if scores else 0.0
+
+    @property
+    def false_accepts_per_hour(self) -> float:
+        hours = self.negative_seconds / 3600
+        return sum(s <= self.threshold for s in self.negative_scores) / hours if hours else 0.0
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU time per second of audio, as a percentage of one core"""
+        return 100.0 * self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def equal_error_threshold(self) -> Optional[float]:
+        """Threshold where false accepts and false rejects are closest"""
+        candidates = sorted(s for s in self.positive_scores + self.negative_scores if np.isfinite(s))
+        if not candidates or not self.positive_scores or not self.negative_scores:
+            return None
+        pos = np.array(self.positive_scores)
+        neg = np.array(self.negative_scores)
+        return min(candidates, key=lambda t: abs(np.mean(pos > t) - np.mean(neg <= t)))
+
+    def summary(self) -> str:
+        lines = [
+            f"positives: {len(self.positive_scores)}, negatives: {len(self.negative_scores)} "
+            f"({self.negative_seconds:.0f} s), threshold {self.threshold:.2f}",
+            f"false reject rate : {self.false_reject_rate:.1%}",
+            f"false accept rate : {self.false_accept_rate:.1%} ({self.false_accepts_per_hour:.1f}/hour)",
+            f"idle CPU          : {self.cpu_percent:.2f}% of one core "
+            f"({self.cpu_seconds:.2f} s CPU for {self.audio_seconds:.0f} s audio)",
+        ]
+        eer = self.equal_error_threshold()
+        if eer is not None:
+            lines.append(f"equal-error threshold: {eer:.2f}")
+        return "\n".join(lines)
+
+
+def best_score(detector: WakeWordDetector, endpointer: Endpointer, audio: np.ndarray) -> float:
+    """Lowest wake word score over every VAD segment of a recording"""
+    buffer = AudioRingBuffer.from_array(audio)
+    best = float('inf')
+    pos = 0
+    while pos < buffer.position:
+        segment, scanned, _ = endpointer.find_utterance(buffer, pos)
+        if segment is not None:
+            best = min(best, detector.score(buffer.view(*segment)))
+        if scanned <= pos:
+            break
+        pos = scanned
+    return best
+
+
+def evaluate(detector: WakeWordDetector, positives: Iterable[Union[str, Path]],
+             negatives: Iterable[Union[str, Path]], make_endpointer) -> WakeWordReport:
+    """Run the full gate (VAD + MFCC + DTW) over labelled WAV fixtures
+
+    CPU time covers the gate only, not WAV decoding; on negatives it is
+    what the detector costs while idling between commands.
+    """
+    report = WakeWordReport(threshold=detector.threshold)
+    for paths, scores, is_negative in ((positives, report.positive_scores, False),
+                                       (negatives, report.negative_scores, True)):
+        for path in paths:
+            audio = read_wav(path, detector.rate)
+            seconds = len(audio) / detector.rate
+            start = time.process_time()
+            scores.append(best_score(detector, make_endpointer(), audio))
+            report.cpu_seconds += time.process_time() - start
+            report.audio_seconds += seconds
+            if is_negative:
+                report.negative_seconds += seconds
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Enroll or evaluate FRIDAY's wake word detector")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enroll_cmd = sub.add_parser("enroll", help="add WAV recordings of the wake word as templates")
+    enroll_cmd.add_argument("wavs", nargs="+")
+    eval_cmd = sub.add_parser("evaluate", help="report false accept/reject rates and idle CPU")
+    eval_cmd.add_argument("--positives", required=True, help="directory of WAVs containing the wake word")
+    eval_cmd.add_argument("--negatives", required=True, help="directory of WAVs without it")
+    eval_cmd.add_argument("--threshold", type=float, help="override WAKE_WORD_THRESHOLD")
+    for cmd in (enroll_cmd, eval_cmd):
+        cmd.add_argument("--templates", help="template directory (default WAKE_WORD_TEMPLATE_DIR)")
+    args = parser.parse_args()
+
+    config = Config.load()
+    detector = WakeWordDetector(
+        config.SAMPLE_RATE,
+        args.templates or config.WAKE_WORD_TEMPLATE_DIR,
+        threshold=config.WAKE_WORD_THRESHOLD
+    )
+
+    if args.command == "enroll":
+        for wav in args.wavs:
+            print(f"Enrolled {wav} -> {detector.enroll(read_wav(wav, config.SAMPLE_RATE))}")
+        raise SystemExit(0)
+
+    if not detector.enrolled:
+        print(f"Error: no templates in {detector.template_dir}; run 'enroll' first")
+        raise SystemExit(1)
+    if args.threshold is not None:
+        detector.threshold = args.threshold
+
+    def make_endpointer():
+        return Endpointer(
+            VoiceActivityDetector(config.SAMPLE_RATE, frame_ms=config.VAD_FRAME_MS),
+            trailing_silence_ms=config.VAD_TRAILING_SILENCE_MS,
+            max_utterance_seconds=config.VAD_MAX_UTTERANCE_SECONDS,
+            no_speech_timeout=config.RECORD_SECONDS
+        )
+
+    report = evaluate(
+        detector,
+        sorted(Path(args.positives).glob("*.wav")),
+        sorted(Path(args.negatives).glob("*.wav")),
+        make_endpointer
+    )
+    print(report.summary())
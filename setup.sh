@@ -7,6 +7,9 @@ source venv/bin/activate
 # Install dependencies
 pip install -r requirements.txt
 
+# Fetch NLTK/spaCy models into ~/.friday/nlp_data (Friday never downloads at runtime)
+python -m modules.nlp_resources --download
+
 # Create required directories
 mkdir -p logs
 mkdir -p data
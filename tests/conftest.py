@@ -0,0 +1,22 @@
+import os
+import sys
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+# Tests import the app's packages (config, modules, features) from the repo root
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Default Config with every file and data dir it names moved under tmp_path"""
+    from config import Config
+    config = Config()
+    for spec in dataclasses.fields(Config):
+        if spec.name.endswith(("_FILE", "_DIR")):
+            setattr(config, spec.name, str(tmp_path / os.path.basename(getattr(config, spec.name))))
+    return config
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from modules.audio_buffer import AudioRingBuffer
+
+
+def test_view_across_wraparound_is_contiguous_and_zero_copy():
+    buffer = AudioRingBuffer(8)
+    samples = np.arange(13, dtype=np.float32)
+    buffer.write(samples[:6])
+    buffer.write(samples[6:])
+    view = buffer.view(5, 13)
+    np.testing.assert_array_equal(view, samples[5:13])
+    assert np.shares_memory(view, buffer._data)
+    np.testing.assert_array_equal(buffer.latest(3), samples[-3:])
+
+
+def test_oversized_write_keeps_the_tail():
+    buffer = AudioRingBuffer(4)
+    buffer.write(np.arange(10, dtype=np.float32))
+    assert buffer.position == 10
+    assert buffer.oldest == 6
+    np.testing.assert_array_equal(buffer.view(6, 10), [6, 7, 8, 9])
+
+
+@pytest.mark.parametrize("start, end", [(0, 2), (8, 11), (4, 3), (2, 7)])
+def test_invalid_windows_raise(start, end):
+    buffer = AudioRingBuffer(4)
+    buffer.write(np.arange(10, dtype=np.float32))
+    with pytest.raises(ValueError):
+        buffer.view(start, end)
+
+
+
+def test_wait_for_times_out_until_written():
+    buffer = AudioRingBuffer(4)
+    assert not buffer.wait_for(1, timeout=0)
+    buffer.write(np.zeros(2, dtype=np.float32))
+    assert buffer.wait_for(2, timeout=0)
+
+
+def test_wait_for_returns_on_close():
+    buffer = AudioRingBuffer.from_array(np.ones(5, dtype=np.float32))
+    assert buffer.closed
+    assert buffer.wait_for(5, timeout=0)
+    assert not buffer.wait_for(6, timeout=5)
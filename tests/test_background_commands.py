@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from concurrent.futures import Future
+
+import pytest
+
+from modules.command_registry import CommandRegistry, LATENCY_BACKGROUND
+from modules.tts_worker import PRIORITY_LOW
+
+
+class FakeSpeech:
+    def __init__(self):
+        self.said = []
+
+    def say(self, text, priority=None):
+        self.said.append((text, priority))
+
+
+@pytest.fixture
+def friday():
+    """FRIDAY with only the state the background bookkeeping touches"""
+    main = pytest.importorskip("main", reason="main.py needs the full runtime dependencies")
+    friday = object.__new__(main.FRIDAY)
+    friday.logger = logging.getLogger('FRIDAY.test')
+    friday._background = {}
+    friday.__dict__['speech'] = FakeSpeech()
+    return friday
+
+
+def test_cancel_pending_unwinds_running_handlers():
+    registry = CommandRegistry()
+    events = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    registry.register("forever", forever, latency=LATENCY_BACKGROUND)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        registry.attach_loop(loop)
+        future = await loop.run_in_executor(None, registry.invoke, "forever")
+        await asyncio.sleep(0.01)
+        assert await registry.cancel_pending() == 1
+        await asyncio.sleep(0)
+        return future
+
+    future = asyncio.run(run())
+    assert events == ["cancelled"]
+    assert future.cancelled()
+    assert registry.metrics()["forever"]["errors"] == 1
+
+
+def test_cancel_pending_with_nothing_running():
+    assert asyncio.run(CommandRegistry().cancel_pending()) == 0
+
+
+def test_background_result_is_announced_on_completion(friday):
+    future = Future()
+    ack = friday._track_background("setup_project", future)
+    assert "setup project" in ack and friday.speech.said == []
+
+    future.set_result({"success": True})
+    assert friday.speech.said == [("Setup project is done.", PRIORITY_LOW)]
+    assert friday._background == {}
+
+
+def test_background_failure_is_announced(friday):
+    future = Future()
+    friday._track_background("deep_cleanup", future)
+    future.set_result({"success": False, "error": "disk busy"})
+    assert friday.speech.said == [("Deep cleanup failed: disk busy", PRIORITY_LOW)]
+
+
+def test_cancelled_background_work_is_not_announced(friday):
+    future = Future()
+    friday._track_background("deep_cleanup", future)
+    future.cancel()
+    assert friday.speech.said == []
+    assert friday._background == {}
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from modules.command_registry import (
+    CommandRegistry, LATENCY_BACKGROUND, LATENCY_FAST, LATENCY_INSTANT, LATENCY_SLOW
+)
+
+
+@pytest.fixture
+def loop():
+    """Event loop running in its own thread, like FRIDAY's voice loop"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+class Widget:
+    COMMAND_GROUPS = [
+        ("window", {"list": "list_windows", "close": "close_window", "zoom": "zoom_window"}, LATENCY_FAST, True),
+        ("", {"sync": "sync_now"}, LATENCY_BACKGROUND, True),
+    ]
+    READ_ONLY_ACTIONS = frozenset({"list"})
+    created = 0
+
+    def __init__(self):
+        Widget.created += 1
+
+    def list_windows(self):
+        return ["main"]
+
+    def close_window(self, name):
+        return f"closed {name}"
+
+    async def sync_now(self):
+        return "synced"
+
+
+def test_sync_handler_records_stats():
+    registry = CommandRegistry()
+    registry.register("echo", lambda text: text, latency=LATENCY_INSTANT)
+    assert registry.invoke("echo", "hi") == "hi"
+    assert registry.invoker("echo")("again") == "again"
+    metrics = registry.metrics()["echo"]
+    assert (metrics["calls"], metrics["errors"], metrics["latency_class"]) == (2, 0, LATENCY_INSTANT)
+
+
+def test_failures_are_counted_and_reraised():
+    registry = CommandRegistry()
+
+    def broken():
+        raise OSError("no such app")
+
+    registry.register("broken", broken)
+    with pytest.raises(OSError):
+        registry.invoke("broken")
+    assert registry.metrics()["broken"]["errors"] == 1
+
+
+def test_unknown_and_duplicate_intents():
+    registry = CommandRegistry()
+    registry.register("echo", lambda: None)
+    with pytest.raises(KeyError):
+        registry.invoke("missing")
+    with pytest.raises(ValueError):
+        registry.register("echo", lambda: None)
+    with pytest.raises(ValueError):
+        registry.register("other", lambda: None, latency="eventually")
+
+
+def test_async_handler_without_a_loop_runs_to_completion():
+    registry = CommandRegistry()
+
+    async def answer():
+        await asyncio.sleep(0)
+        return 42
+
+    registry.register("answer", answer)
+    assert registry.get("answer").is_async
+    assert registry.invoke("answer") == 42
+
+
+def test_attached_loop_waits_unless_background(loop):
+    registry = CommandRegistry()
+    release = threading.Event()
+
+    async def quick():
+        return "quick"
+
+    async def long_running():
+        await loop.run_in_executor(None, release.wait)
+        return "finished"
+
+    registry.register("quick", quick, latency=LATENCY_SLOW)
+    registry.register("long", long_running, latency=LATENCY_BACKGROUND)
+    registry.attach_loop(loop)
+
+    assert registry.invoke("quick") == "quick"
+    future = registry.invoke("long")
+    assert isinstance(future, Future) and not future.done()
+    assert "long" not in registry.metrics()
+
+    release.set()
+    assert future.result(timeout=5) == "finished"
+    assert registry.metrics()["long"]["calls"] == 1
+
+
+def test_invoking_from_the_loop_thread_is_refused(loop):
+    registry = CommandRegistry()
+
+    async def handler():
+        return "never"
+
+    registry.register("handler", handler)
+    registry.attach_loop(loop)
+
+    async def call_on_loop():
+        registry.invoke("handler")
+
+    with pytest.raises(RuntimeError, match="event loop thread"):
+        asyncio.run_coroutine_threadsafe(call_on_loop(), loop).result(timeout=5)
+
+
+def test_register_component_is_lazy_and_uses_metadata():
+    registry = CommandRegistry()
+    Widget.created = 0
+    instances = []
+
+    def get_instance():
+        if not instances:
+            instances.append(Widget())
+        return instances[0]
+
+    registry.register_component("widget", Widget, get_instance)
+    assert sorted(s.intent for s in registry.specs(source="widget")) == [
+        "widget.sync", "widget.window.close", "widget.window.list"
+    ]
+    assert Widget.created == 0
+
+    assert not registry.get("widget.window.list").side_effects
+    assert registry.get("widget.window.close").side_effects
+    assert registry.get("widget.sync").is_async
+    assert [s.intent for s in registry.specs(latency=LATENCY_BACKGROUND)] == ["widget.sync"]
+
+    assert registry.invoke("widget.window.close", "main") == "closed main"
+    assert registry.invoke("widget.sync") == "synced"
+    assert Widget.created == 1
@@ -0,0 +1,70 @@
+import pytest
+
+from modules.command_router import AhoCorasick, CommandRouter, Route
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick()
+    for pattern in ("he", "she", "his", "hers"):
+        automaton.add(pattern)
+    assert sorted(automaton.iter_matches("ushers")) == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_automaton_rejects_empty_pattern():
+    with pytest.raises(ValueError):
+        AhoCorasick().add("")
+
+
+def make_router(calls):
+    def handler(name, result="ok"):
+        def handle(text):
+            calls.append(name)
+            return result
+        return handle
+
+    return CommandRouter([
+        Route("weather", ("weather",), handler("weather"), priority=20),
+        Route("reminder", ("remind me",), handler("reminder"), priority=10, requires_any=("tomorrow", "tonight")),
+        Route("open", ("open",), handler("open"), priority=5, prefix=True),
+        Route("search", ("search",), handler("search", None), priority=1),
+        Route("note", ("note",), handler("note"), priority=15, requires=("take",)),
+    ])
+
+
+def test_dispatch_prefers_lower_priority():
+    calls = []
+    router = make_router(calls)
+    route, result = router.dispatch("remind me tomorrow about the weather")
+    assert route.name == "reminder"
+    assert result == "ok"
+    assert calls == ["reminder"]
+
+
+def test_declining_handler_falls_through():
+    calls = []
+    route, _ = make_router(calls).dispatch("search the weather")
+    assert route.name == "weather"
+    assert calls == ["search", "weather"]
+
+
+def test_requirements_and_prefix():
+    router = make_router([])
+    assert [r.name for r, _, _ in router.candidates("remind me later")] == []
+    assert [r.name for r, _, _ in router.candidates("please open safari")] == []
+    assert [r.name for r, _, _ in router.candidates("open safari")] == ["open"]
+    assert [r.name for r, _, _ in router.candidates("take a note")] == ["note"]
+    assert make_router([]).dispatch("hello there") == (None, None)
+
+
+def test_explain_reports_why_routes_were_skipped():
+    explanations = {e.route: e for e in make_router([]).explain("remind me about the weather")}
+    assert explanations["reminder"].status == "missing one of ['tomorrow', 'tonight']"
+    assert explanations["weather"].status == "selected"
+    assert explanations["weather"].position == len("remind me about the ")
+    assert "open" not in explanations
+
+
+def test_duplicate_route_names_are_rejected():
+    router = CommandRouter([Route("a", ("x",), lambda text: text, priority=1)])
+    with pytest.raises(ValueError):
+        router.add(Route("a", ("y",), lambda text: text, priority=2))
@@ -0,0 +1,121 @@
+import sys
+import threading
+
+import pytest
+
+from modules.component_registry import ComponentDisabledError, ComponentRegistry, LazyComponent
+
+
+def counting_factory(value="instance"):
+    calls = []
+
+    def factory():
+        calls.append(threading.current_thread().name)
+        return value
+    return factory, calls
+
+
+def test_components_are_created_once_on_first_get():
+    registry = ComponentRegistry()
+    factory, calls = counting_factory()
+    registry.register("speech", factory)
+    assert not registry.is_loaded("speech")
+    assert calls == []
+    assert registry.get("speech") == "instance"
+    assert registry.get("speech") == "instance"
+    assert len(calls) == 1
+    assert registry.is_loaded("speech")
+
+
+def test_concurrent_first_gets_share_one_instance():
+    registry = ComponentRegistry()
+    started = threading.Event()
+
+    def slow_factory():
+        started.wait(1)
+        return object()
+
+    registry.register("brain", slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("brain"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len({id(result) for result in results}) == 1
+
+
+def test_register_class_imports_lazily(tmp_path, monkeypatch):
+    (tmp_path / "lazy_component_probe.py").write_text("class Probe:\n    def __init__(self, value):\n        self.value = value\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = ComponentRegistry()
+    registry.register_class("probe", "lazy_component_probe", "Probe", 42)
+    assert "lazy_component_probe" not in sys.modules
+    assert registry.get("probe").value == 42
+    assert "lazy_component_probe" in sys.modules
+
+
+def test_unknown_and_disabled_components():
+    registry = ComponentRegistry()
+    factory, calls = counting_factory()
+    registry.register("web_assistant", factory)
+    registry.disable(["web_assistant"], "headless mode")
+    with pytest.raises(ComponentDisabledError, match="headless mode"):
+        registry.get("web_assistant")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+    registry.prewarm(["web_assistant"], background=False)
+    assert calls == []
+
+
+def test_loaded_components_cannot_be_disabled():
+    registry = ComponentRegistry()
+    registry.register("memory", lambda: "memory")
+    registry.get("memory")
+    with pytest.raises(RuntimeError):
+        registry.disable(["memory"], "too late")
+
+
+def test_reregistering_replaces_the_factory_and_reenables():
+    registry = ComponentRegistry()
+    registry.register("mac", lambda: "real")
+    registry.disable(["mac"], "not on this host")
+    registry.register("mac", lambda: "fake")
+    assert not registry.is_disabled("mac")
+    assert registry.get("mac") == "fake"
+
+
+def test_failed_factory_is_reported_and_retried():
+    registry = ComponentRegistry()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("no audio device")
+        return "speech"
+
+    registry.register("speech", flaky)
+    registry.prewarm(["speech"], background=False)
+    assert not registry.is_loaded("speech")
+    assert "failed: no audio device" in registry.startup_report()
+    assert registry.get("speech") == "speech"
+
+
+def test_background_prewarm_and_lazy_attribute():
+    registry = ComponentRegistry()
+    factory, calls = counting_factory("llm")
+    registry.register("llm", factory)
+    registry.prewarm(["llm"])
+    assert registry.wait_for_prewarm(timeout=5)
+    assert calls == ["prewarm-llm"]
+
+    class Owner:
+        llm = LazyComponent()
+
+        def __init__(self):
+            self.components = registry
+
+    assert Owner().llm == "llm"
+    assert isinstance(Owner.llm, LazyComponent)
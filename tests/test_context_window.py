@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from modules.context_window import ContextWindow, TokenCounter
+
+
+def fill(window, count, words=8):
+    for i in range(count):
+        window.add_turn(f"question {i} " + "x " * words, f"answer {i} " + "y " * words)
+
+
+def test_pack_keeps_the_newest_turns_within_budget():
+    window = ContextWindow(budget=200)
+    fill(window, 30)
+    system, transcript = window.pack("You are Friday.", "what now?")
+    assert window.counter.count(system) + window.counter.count(transcript) <= window.budget
+    assert transcript.endswith("Human: what now?")
+    assert "question 29" in transcript and "question 0 " not in transcript
+
+
+def test_facts_are_capped_to_their_share():
+    window = ContextWindow(budget=500, fact_tokens=20)
+    facts = [f"fact number {i} about the user" for i in range(20)]
+    system, _ = window.pack("You are Friday.", "hi", facts)
+    assert "fact number 0" in system and "fact number 19" not in system
+    assert window.counter.count(system) <= window.counter.count("You are Friday.") + 20 + 15
+
+
+def test_summary_is_packed_ahead_of_history():
+    window = ContextWindow(budget=500)
+    window.summary = "The user is planning a trip to Rome."
+    fill(window, 2)
+    system, transcript = window.pack("You are Friday.", "hi")
+    assert system.endswith("Summary of the earlier conversation: The user is planning a trip to Rome.")
+    assert transcript.startswith("Human: question 0")
+
+
+def test_compaction_summarizes_the_oldest_turns():
+    calls = []
+
+    async def summarizer(summary, turns):
+        calls.append([t.human.split()[1] for t in turns])
+        return "Earlier the user asked questions."
+
+    async def run():
+        window = ContextWindow(budget=200, summarizer=summarizer)
+        fill(window, 8)
+        assert window.history_tokens() > window.compact_at * window.history_budget
+        await window._compacting
+        return window
+
+    window = asyncio.run(run())
+    assert len(calls) == 1 and calls[0][0] == "0"
+    assert window.summary == "Earlier the user asked questions."
+    assert window.compactions == 1
+    assert window.turns[0].human.split()[1] == str(len(calls[0]))
+    assert window.history_tokens() <= window.history_budget
+
+
+def test_compaction_is_deferred_or_skipped():
+    async def summarizer(summary, turns):
+        raise AssertionError("not expected")
+
+    async def deferred():
+        window = ContextWindow(budget=200, summarizer=summarizer)
+        for i in range(8):
+            window.add_turn(f"question {i} " + "x " * 8, "y " * 8, compact=False)
+        return window._compacting
+
+    assert asyncio.run(deferred()) is None
+
+    window = ContextWindow(budget=200, summarizer=summarizer)
+    fill(window, 8)  # no running loop: pack() just drops the oldest turns
+    assert window._compacting is None
+
+
+def test_failed_summary_keeps_the_turns():
+    async def summarizer(summary, turns):
+        raise RuntimeError("model busy")
+
+    async def run():
+        window = ContextWindow(budget=200, summarizer=summarizer)
+        fill(window, 8)
+        await window._compacting
+        return window
+
+    window = asyncio.run(run())
+    assert (len(window.turns), window.summary, window.compactions) == (8, "", 0)
+
+
+def test_revise_last_recounts_tokens():
+    window = ContextWindow(budget=500)
+    window.add_turn("tell me a story", "Once upon a time there was a very long story")
+    before = window.history_tokens()
+    window.revise_last("Once")
+    assert window.turns[-1].assistant == "Once"
+    assert window.history_tokens() < before
+
+
+def test_token_counter_calibrates_towards_observed_counts():
+    counter = TokenCounter(chars_per_token=3.5)
+    text = "a" * 400
+    counter.calibrate(text, 200)
+    assert 2.0 < counter.chars_per_token < 3.5
+    counter.calibrate("short", 1)
+    counter.calibrate(text, None)
+    assert counter.count(text) == pytest.approx(400 / counter.chars_per_token, abs=1)
@@ -0,0 +1,57 @@
+"""Importing the modules package must stay cheap (see modules/__init__.py)"""
+import os
+import re
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_PACKAGES = ("whisper", "torch", "spacy", "nltk", "selenium", "applescript", "pyautogui", "pyperclip")
+
+# Seconds for `import modules, modules.memory` in a fresh interpreter
+IMPORT_BUDGET_SECONDS = 1.0
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import modules
+import modules.memory
+{extra}
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def _probe(extra: str = "") -> dict:
+    """Run the imports in a fresh interpreter, so modules already loaded by pytest don't count"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(extra=extra, heavy=HEAVY_PACKAGES)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        missing = re.search(r"No module named '([^']+)'", result.stderr)
+        if missing and missing.group(1).split(".")[0] not in HEAVY_PACKAGES:
+            pytest.skip(f"import needs {missing.group(1)}, which is not installed")
+        pytest.fail(f"import failed:\n{result.stderr}", pytrace=False)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_pulls_in_no_heavy_packages():
+    assert _probe()["heavy"] == []
+
+
+def test_import_stays_within_budget():
+    elapsed = _probe()["elapsed"]
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"import took {elapsed:.2f} s"
+
+
+def test_lazy_attribute_loads_only_its_submodule():
+    result = _probe("from modules import Memory")
+    assert result["heavy"] == []
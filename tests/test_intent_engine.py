@@ -0,0 +1,85 @@
+import pytest
+
+from modules.brain import Brain
+from modules.intent_engine import IntentEngine, ParsedCommand, tokenize
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return IntentEngine.build()
+
+
+@pytest.mark.parametrize("text, intent, phrase", [
+    ("open safari", "app_control", ("open",)),
+    ("Hey Friday, please launch Slack", "app_control", ("launch",)),
+    ("look up the weather in london", "search", ("look", "up")),
+    ("send an email to john", "email", ("send", "an", "email")),
+    ("turn up the volume", "settings", ("turn", "up")),
+])
+def test_leading_command_phrase_is_confident(engine, text, intent, phrase):
+    match = engine.classify(text)
+    assert match.confident
+    assert match.intent == intent
+    assert match.phrase == phrase
+
+
+def test_phrase_later_in_the_utterance_is_not_confident(engine):
+    match = engine.classify("is it going to rain so I should look for an umbrella")
+    assert match.intent == "search"
+    assert not match.confident
+
+
+def test_no_known_phrase(engine):
+    match = engine.classify("tell me a joke")
+    assert match.intent is None
+    assert not match.confident
+    assert match.entities()["nouns"] == ["tell", "joke"]
+
+
+def test_entities_skip_the_phrase_and_stopwords(engine):
+    entities = engine.classify("open the terminal").entities()
+    assert entities["verbs"] == ["open"]
+    assert entities["nouns"] == ["terminal"]
+
+
+def test_add_examples_makes_learned_utterances_confident():
+    engine = IntentEngine.build()
+    assert not engine.classify("tell me a joke").confident
+    count = engine.phrase_count
+    engine.add_examples({
+        "entertainment": {"examples": ["please tell me a joke"]},
+        "error": {"examples": ["mumble"]},
+        "custom_commands": {},
+        "last_updated": "2026-01-01",
+    })
+    match = engine.classify("friday tell me a joke")
+    assert match.confident
+    assert match.intent == "entertainment"
+    assert engine.phrase_count == count + 1
+    assert engine.classify("mumble").intent is None
+
+
+def test_parsed_command_slots():
+    parsed = ParsedCommand.from_text("Email John because the build is broken")
+    assert parsed.tokens == tokenize("email john because the build is broken")
+    assert parsed.slots["reason"] == "the build is broken"
+    assert ParsedCommand.from_text("launch the app Visual Studio Code").slots["app"] == "visual studio code"
+
+
+def test_brain_uses_the_tagger_only_below_the_fast_path(config, monkeypatch):
+    brain = Brain(config)
+    tagged = []
+
+    def fake_tag(text):
+        tagged.append(text)
+        return [("what", "WP"), ("time", "NN"), ("is", "VBZ"), ("it", "PRP")]
+
+    monkeypatch.setattr(brain, "_tag", fake_tag)
+    parsed = brain.parse("open safari")
+    assert (parsed.intent, tagged) == ("app_control", [])
+    assert parsed.confidence == pytest.approx(0.9)
+
+    parsed = brain.parse("what time is it")
+    assert tagged == ["what time is it"]
+    assert parsed.intent == "general_command"
+    assert parsed.entities["nouns"] == ["time"]
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("requests.adapters", reason="the LLM transport needs requests")
+from modules.llm import EnhancedLLM
+from modules.llm_transport import LLMTransportError
+
+
+class FakeTransport:
+    """Stands in for OllamaTransport; replies are (text, context) pairs or exceptions"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.payloads = []
+
+    def _next(self, payload):
+        self.payloads.append(payload)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    async def post_async(self, payload, timeout=None):
+        text, context = self._next(payload)
+        return {"response": text, "done": True, "context": context}
+
+    async def stream_async(self, payload, timeout=None):
+        text, context = self._next(payload)
+        for word in text.split(" "):
+            yield {"response": word + " "}
+        yield {"response": "", "done": True, "context": context}
+
+
+@pytest.fixture
+def llm(config):
+    llm = EnhancedLLM(config)
+    llm.transport = FakeTransport()
+    return llm
+
+
+async def collect(stream):
+    return [token async for token in stream]
+
+
+def test_stream_records_the_turn(llm):
+    llm.transport.replies = [("Paris is the capital.", [1, 2, 3])]
+    tokens = asyncio.run(collect(llm.stream_async("capital of France?")))
+    assert "".join(tokens) == "Paris is the capital. "
+    assert llm.conversation_history == [{"human": "capital of France?", "assistant": "Paris is the capital. "}]
+    assert llm.context == [1, 2, 3]
+
+
+def test_interrupted_stream_keeps_what_was_said(llm):
+    llm.transport.replies = [("one two three four", [1, 2, 3])]
+
+    async def barge_in():
+        stream = llm.stream_async("count")
+        heard = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return heard
+
+    assert asyncio.run(barge_in()) == ["one ", "two "]
+    assert llm.conversation_history == [{"human": "count", "assistant": "one two "}]
+    # No final chunk, so no context: the next turn is rebuilt from history
+    assert llm.context is None
+
+    llm.revise_last_response("one")
+    assert llm.conversation_history[-1]["assistant"] == "one"
+    llm.transport.replies = [("five", [4])]
+    asyncio.run(collect(llm.stream_async("go on")))
+    assert "Assistant: one\nHuman: go on" in llm.transport.payloads[-1]["prompt"]
+
+
+def test_failed_stream_before_any_token_leaves_no_turn(llm):
+    llm.transport.replies = [LLMTransportError("Ollama unavailable")]
+    with pytest.raises(LLMTransportError):
+        asyncio.run(collect(llm.stream_async("hello")))
+    assert llm.conversation_history == []
+
+
+def test_context_is_reused_from_the_second_turn(llm):
+    llm.transport.replies = [("Hi.", [1, 2]), ("Sure.", [1, 2, 3, 4])]
+    asyncio.run(llm.generate_async("hello"))
+    asyncio.run(llm.generate_async("help me"))
+    first, second = llm.transport.payloads
+    assert "system" in first and "context" not in first
+    assert second["context"] == [1, 2] and second["prompt"] == "help me" and "system" not in second
+    assert (llm.context_reused, llm.context_rebuilt) == (1, 1)
+    assert llm.context == [1, 2, 3, 4]
+
+
+def test_rejected_context_is_retried_with_a_rebuilt_prompt(llm):
+    llm.transport.replies = [
+        ("Hi.", [1, 2]),
+        LLMTransportError("Ollama API error: 400", 400),
+        ("Rebuilt.", [7]),
+    ]
+    asyncio.run(llm.generate_async("hello"))
+    assert asyncio.run(llm.generate_async("again")) == "Rebuilt."
+    rejected, retried = llm.transport.payloads[1:]
+    assert "context" in rejected
+    assert "context" not in retried and "Human: hello" in retried["prompt"]
+    assert llm.context == [7]
+
+
+def test_connection_errors_are_not_retried_without_context(llm):
+    llm.transport.replies = [("Hi.", [1, 2]), LLMTransportError("Ollama unavailable")]
+    asyncio.run(llm.generate_async("hello"))
+    with pytest.raises(LLMTransportError):
+        asyncio.run(llm.generate_async("again"))
+    assert len(llm.transport.payloads) == 2
+
+
+def test_rejected_context_while_streaming(llm):
+    llm.transport.replies = [("Hi.", [1, 2]), LLMTransportError("Ollama API error: 500", 500), ("Fresh start", [9])]
+    asyncio.run(llm.generate_async("hello"))
+    assert "".join(asyncio.run(collect(llm.stream_async("again")))) == "Fresh start "
+    assert "context" not in llm.transport.payloads[-1]
+
+
+def test_context_is_dropped_when_model_changes_or_fills_up(llm):
+    llm.transport.replies = [("Hi.", [1, 2]), ("Hi.", [1, 2]), ("Long.", list(range(4000))), ("Ok.", [5])]
+    asyncio.run(llm.generate_async("hello"))
+    llm.config.MODEL = "other-model"
+    asyncio.run(llm.generate_async("hello"))
+    asyncio.run(llm.generate_async("tell me everything"))
+    asyncio.run(llm.generate_async("and now?"))
+    assert ["context" in p for p in llm.transport.payloads] == [False, False, True, False]
+
+
+def test_compaction_waits_until_the_context_is_dropped(config):
+    config.OLLAMA_NUM_CTX, config.CONTEXT_RESPONSE_TOKENS = 300, 100
+    llm = EnhancedLLM(config)
+    llm.transport = FakeTransport(*[("y " * 20, [1, 2])] * 6, ("Last.", list(range(250))), ("Summary.", None))
+
+    async def run():
+        for i in range(6):
+            await llm.generate_async(f"question {i} " + "x " * 20)
+            assert llm.window._compacting is None
+        assert llm.window.history_tokens() > llm.window.compact_at * llm.window.history_budget
+        await llm.generate_async("one more")
+        await llm.window._compacting
+
+    asyncio.run(run())
+    assert llm.transport.payloads[-1]["prompt"].startswith("Summary so far")
+    assert llm.window.summary == "Summary."
@@ -0,0 +1,136 @@
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests.adapters", reason="the transport needs requests")
+from modules.llm_transport import LLMTransportError, OllamaTransport, shared_transport
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """Replies with the queued statuses first, then 200 with a JSON echo or stream"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.payloads.append(payload)
+            server.clients.add(self.client_address)
+            status = server.statuses.pop(0) if server.statuses else 200
+        if status != 200:
+            body = b"{}"
+        elif payload.get("stream"):
+            body = "".join(json.dumps(chunk) + "\n" for chunk in server.chunks).encode()
+        else:
+            body = json.dumps({"response": f"echo {payload.get('prompt')}", "done": True}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    server.lock = threading.Lock()
+    server.payloads, server.clients, server.statuses = [], set(), []
+    server.chunks = [{"response": "Hel"}, {"response": "lo"}, {"response": "", "done": True}]
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(server):
+    transport = OllamaTransport(server.url, backoff=0, keep_alive="30m")
+    yield transport
+    transport.close()
+
+
+def test_sync_requests_share_one_connection(server, transport):
+    for prompt in ("one", "two", "three"):
+        assert transport.post({"prompt": prompt})["response"] == f"echo {prompt}"
+    assert len(server.clients) == 1
+    assert [p["keep_alive"] for p in server.payloads] == ["30m"] * 3
+
+
+def test_explicit_keep_alive_is_not_overridden(server, transport):
+    transport.post({"prompt": "x", "keep_alive": 0})
+    assert server.payloads[0]["keep_alive"] == 0
+
+
+def test_busy_server_is_retried(server, transport):
+    server.statuses = [503, 429]
+    assert transport.post({"prompt": "x"})["response"] == "echo x"
+    assert transport.metrics() == {"requests": 1, "retried": 2, "failed": 0}
+
+
+def test_retries_are_bounded(server, transport):
+    server.statuses = [503] * 5
+    with pytest.raises(LLMTransportError, match="after 3 attempt"):
+        transport.post({"prompt": "x"})
+    assert len(server.payloads) == 3
+    assert transport.metrics()["failed"] == 1
+
+
+def test_client_errors_are_not_retried(server, transport):
+    server.statuses = [400]
+    with pytest.raises(LLMTransportError) as error:
+        transport.post({"prompt": "x"})
+    assert error.value.status == 400
+    assert len(server.payloads) == 1
+
+
+def test_unreachable_server(server):
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    transport = OllamaTransport(url, retries=1, backoff=0)
+    with pytest.raises(LLMTransportError, match="after 2 attempt"):
+        transport.post({"prompt": "x"})
+
+
+def test_stream_yields_chunks(server, transport):
+    chunks = list(transport.stream({"prompt": "x"}))
+    assert "".join(c["response"] for c in chunks) == "Hello"
+    assert server.payloads[0]["stream"] is True
+
+
+def test_stream_error_chunk_raises(server, transport):
+    server.chunks = [{"response": "Hel"}, {"error": "model crashed"}]
+    with pytest.raises(LLMTransportError, match="model crashed"):
+        list(transport.stream({"prompt": "x"}))
+
+
+def test_shared_transport_is_per_url(config):
+    assert shared_transport(config) is shared_transport(config)
+    assert shared_transport(config).url == config.OLLAMA_API
+
+
+def test_async_requests_share_a_session_per_loop(server, transport):
+    pytest.importorskip("aiohttp")
+
+    async def run():
+        replies = [await transport.post_async({"prompt": p}) for p in ("one", "two")]
+        chunks = [c async for c in transport.stream_async({"prompt": "three"})]
+        return replies, chunks
+
+    replies, chunks = asyncio.run(run())
+    assert [r["response"] for r in replies] == ["echo one", "echo two"]
+    assert "".join(c["response"] for c in chunks) == "Hello"
+    assert len(server.clients) == 1
+    # asyncio.run cancelled the closer task, which closed and forgot the loop's session
+    assert transport._async == {}
+
+    server.statuses = [502]
+    assert asyncio.run(transport.post_async({"prompt": "again"}))["response"] == "echo again"
+    assert transport.metrics()["retried"] == 1
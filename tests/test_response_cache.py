@@ -0,0 +1,156 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from modules import response_cache
+from modules.response_cache import ResponseCache, normalize_prompt
+
+MODEL = "llama3.2"
+OPTIONS = {"num_ctx": 4096}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  What   TIME is it?! ") == "what time is it"
+
+
+def test_exact_hit_ignores_case_and_punctuation(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db")
+    cache.put("What time is it?", MODEL, OPTIONS, "Noon.")
+    assert cache.get("what time is it", MODEL, OPTIONS) == "Noon."
+    assert cache.get("what time is it", MODEL, {"num_ctx": 2048}) is None
+    assert cache.get("what time is it", "other-model", OPTIONS) is None
+    assert cache.metrics()["hits"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db", ttl=60)
+    cache.put("hello", MODEL, OPTIONS, "Hi!")
+    clock[0] += 59
+    assert cache.get("hello", MODEL, OPTIONS) == "Hi!"
+    clock[0] += 2
+    assert cache.get("hello", MODEL, OPTIONS) is None
+
+
+def test_least_recently_used_is_evicted(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db", max_entries=2)
+    cache.put("one", MODEL, OPTIONS, "1")
+    clock[0] += 1
+    cache.put("two", MODEL, OPTIONS, "2")
+    clock[0] += 1
+    assert cache.get("one", MODEL, OPTIONS) == "1"  # "two" is now the least recently used
+    clock[0] += 1
+    cache.put("three", MODEL, OPTIONS, "3")
+    assert cache.get("two", MODEL, OPTIONS) is None
+    assert cache.get("one", MODEL, OPTIONS) == "1"
+    assert cache.get("three", MODEL, OPTIONS) == "3"
+    assert cache.metrics()["entries"] == 2
+
+
+def test_bypass_skips_lookup_and_empty_responses_are_not_stored(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db")
+    cache.put("hello", MODEL, OPTIONS, "Hi!")
+    assert cache.get("hello", MODEL, OPTIONS, bypass=True) is None
+    cache.put("blank", MODEL, OPTIONS, "   ")
+    metrics = cache.metrics()
+    assert metrics["bypassed"] == 1
+    assert metrics["entries"] == 1
+
+
+VECTORS = {
+    "what time is it": [1.0, 0.0, 0.0],
+    "what's the time": [0.95, 0.312, 0.0],  # cosine 0.95 with "what time is it"
+    "tell me a joke": [0.0, 0.0, 1.0],
+}
+
+
+def embedder(calls):
+    def embed(text):
+        calls.append(text)
+        return VECTORS[text]
+    return embed
+
+
+@pytest.mark.parametrize("threshold, expected", [(0.92, "Noon."), (0.97, None)])
+def test_near_duplicate_threshold(tmp_path, clock, threshold, expected):
+    cache = ResponseCache(tmp_path / "cache.db", embedder=embedder([]), threshold=threshold)
+    cache.put("what time is it", MODEL, OPTIONS, "Noon.")
+    cache.put("tell me a joke", MODEL, OPTIONS, "No.")
+    assert cache.get("what's the time", MODEL, OPTIONS) == expected
+    assert cache.metrics()["near_hits"] == (expected is not None)
+
+
+def test_near_duplicates_stay_within_scope(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db", embedder=embedder([]))
+    cache.put("what time is it", MODEL, OPTIONS, "Noon.")
+    assert cache.get("what's the time", "other-model", OPTIONS) is None
+
+
+def test_missed_prompt_is_embedded_once(tmp_path, clock):
+    calls = []
+    cache = ResponseCache(tmp_path / "cache.db", embedder=embedder(calls))
+    assert cache.get("What's the time?", MODEL, OPTIONS) is None
+    cache.put("What's the time?", MODEL, OPTIONS, "Noon.")
+    assert calls == ["what's the time"]
+
+
+def test_concurrent_misses_store_their_own_embeddings(tmp_path):
+    prompts = [f"question {i}" for i in range(40)]
+
+    def embed(text):
+        vector = [0.0] * len(prompts)
+        vector[prompts.index(text)] = 1.0
+        return vector
+
+    cache = ResponseCache(tmp_path / "cache.db", embedder=embed)
+
+    def ask(prompt):
+        cache.get(prompt, MODEL, OPTIONS)
+        cache.put(prompt, MODEL, OPTIONS, prompt.upper())
+
+    threads = [threading.Thread(target=ask, args=(prompt,)) for prompt in prompts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every prompt still finds its own answer, not one stored under another prompt's vector
+    for prompt in prompts:
+        assert cache.get(prompt, MODEL, OPTIONS) == prompt.upper()
+    keys, matrix = cache._scope_vectors(cache.scope(MODEL, OPTIONS))
+    stored = dict(cache._conn.execute("SELECT key, prompt FROM responses").fetchall())
+    assert [prompts.index(stored[key]) for key in keys] == list(matrix.argmax(axis=1))
+
+
+def test_embed_model_is_part_of_the_scope(tmp_path, clock):
+    first = ResponseCache(tmp_path / "cache.db", embedder=embedder([]), embed_model="embed-a")
+    first.put("what time is it", MODEL, OPTIONS, "Noon.")
+    second = ResponseCache(tmp_path / "cache.db", embedder=lambda text: [1.0, 0.0], embed_model="embed-b")
+    assert second.get("what time is it", MODEL, OPTIONS) is None
+    assert first.get("what's the time", MODEL, OPTIONS) == "Noon."
+
+
+def test_mixed_embedding_sizes_count_as_a_miss(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db", embedder=embedder([]))
+    cache.put("what time is it", MODEL, OPTIONS, "Noon.")
+    cache.embedder = lambda text: [1.0, 0.0]
+    cache.put("tell me a joke", MODEL, OPTIONS, "No.")
+    cache.embedder = embedder([])
+    assert cache.get("what's the time", MODEL, OPTIONS) is None
+    assert cache.metrics()["misses"] == 1
+
+
+def test_database_errors_count_as_a_miss(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.db")
+    cache.put("hello", MODEL, OPTIONS, "Hi!")
+    cache._conn.close()
+    assert cache.get("hello", MODEL, OPTIONS) is None
+    cache.put("hello", MODEL, OPTIONS, "Hi again!")
+    assert cache.misses == 1
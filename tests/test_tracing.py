@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from modules.tracing import JSONLSink, SQLiteSink, Tracer, open_sink, stage_report
+
+
+@pytest.fixture(params=["trace.jsonl", "trace.db"])
+def sink(request, tmp_path):
+    return open_sink(tmp_path / request.param)
+
+
+def test_open_sink_picks_the_format(tmp_path):
+    assert isinstance(open_sink(tmp_path / "trace.jsonl"), JSONLSink)
+    assert isinstance(open_sink(tmp_path / "trace.sqlite"), SQLiteSink)
+
+
+def test_spans_are_written_when_the_trace_finishes(sink):
+    tracer = Tracer(sink)
+    with tracer.start("interaction", mode="voice") as trace:
+        with trace.span("asr") as attrs:
+            attrs["words"] = 3
+        trace.record("wake_word", 12.5)
+        assert list(sink.read()) == []
+
+    records = {r["span"]: r for r in sink.read()}
+    assert sorted(records) == ["asr", "interaction", "wake_word"]
+    assert {r["trace"] for r in records.values()} == {trace.id}
+    asr, wake, whole = records["asr"], records["wake_word"], records["interaction"]
+    assert asr["words"] == 3
+    assert wake["duration_ms"] == pytest.approx(12.5)
+    assert whole["mode"] == "voice"
+    assert whole["duration_ms"] >= asr["duration_ms"]
+
+
+def test_failed_span_is_recorded_with_the_error(sink):
+    tracer = Tracer(sink)
+    with pytest.raises(ValueError):
+        with tracer.start() as trace:
+            with trace.span("handle_command"):
+                raise ValueError("boom")
+
+    records = {r["span"]: r for r in sink.read()}
+    assert records["handle_command"]["error"] == "ValueError"
+    assert records["interaction"]["error"] == "ValueError"
+
+
+def test_finish_is_idempotent(sink):
+    trace = Tracer(sink).start()
+    trace.finish()
+    trace.finish()
+    assert len(list(sink.read())) == 1
+
+
+def test_tracer_without_sink_discards_traces():
+    with Tracer().start() as trace:
+        with trace.span("tts"):
+            pass
+    assert [s.name for s in trace.spans] == ["tts", "interaction"]
+
+
+def test_sink_errors_do_not_propagate(caplog):
+    class BrokenSink:
+        def write(self, spans):
+            raise OSError("disk full")
+
+    Tracer(BrokenSink()).start().finish()
+    assert "disk full" in caplog.text
+
+
+def test_stage_report_orders_stages_and_filters_by_time():
+    now = time.time()
+    records = [
+        {"span": "tts", "ts": now, "offset_ms": 900.0, "duration_ms": d} for d in (100, 200, 300)
+    ] + [
+        {"span": "asr", "ts": now, "offset_ms": 10.0, "duration_ms": 50.0},
+        {"span": "asr", "ts": now - 7200, "offset_ms": 10.0, "duration_ms": 5000.0},
+    ]
+    lines = stage_report(iter(records)).splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["asr", "tts"]
+    assert lines[2].split()[1:4] == ["3", "200.0", "200.0"]
+
+    recent = stage_report(iter(records), since=now - 3600).splitlines()
+    assert recent[1].split()[1:3] == ["1", "50.0"]
+    assert stage_report(iter([])) == "no spans recorded"
@@ -0,0 +1,26 @@
+from modules.tts_worker import SentenceBuffer, split_sentences
+
+
+def test_split_sentences():
+    assert split_sentences("Hi there. How are you?  Fine!") == ["Hi there.", "How are you?", "Fine!"]
+    long = "word " * 30
+    assert all(len(chunk) <= 40 for chunk in split_sentences(long, max_chars=40))
+    assert split_sentences("first part, second part", max_chars=15) == ["first part,", "second part"]
+
+
+def test_sentence_buffer_waits_for_the_space_after_punctuation():
+    buffer = SentenceBuffer()
+    assert buffer.feed("It costs 3.") == []
+    assert buffer.feed("5 dollars. Ne") == ["It costs 3.5 dollars."]
+    assert buffer.feed("xt one") == []
+    assert buffer.flush() == ["Next one"]
+    assert buffer.flush() == []
+
+
+def test_sentence_buffer_releases_long_text_without_punctuation():
+    buffer = SentenceBuffer(max_chars=20)
+    ready = []
+    for word in ("alpha ", "beta ", "gamma ", "delta ", "epsilon ", "zeta"):
+        ready += buffer.feed(word)
+    assert ready and all(len(chunk) <= 20 for chunk in ready)
+    assert " ".join(ready + buffer.flush()) == "alpha beta gamma delta epsilon zeta"
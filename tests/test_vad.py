@@ -0,0 +1,64 @@
+import numpy as np
+
+from modules.audio_buffer import AudioRingBuffer
+from modules.vad import Endpointer, VoiceActivityDetector
+
+RATE = 16000
+
+
+def recording(*parts):
+    """Concatenate (seconds, amplitude) parts: background noise or a 220 Hz tone"""
+    rng = np.random.default_rng(0)
+    chunks = []
+    for seconds, amplitude in parts:
+        n = int(RATE * seconds)
+        chunk = rng.normal(0, 1e-3, n)
+        if amplitude:
+            chunk += amplitude * np.sin(2 * np.pi * 220 * np.arange(n) / RATE)
+        chunks.append(chunk)
+    return np.concatenate(chunks).astype(np.float32)
+
+
+def test_speech_mask_marks_tone_frames():
+    vad = VoiceActivityDetector(RATE)
+    mask = vad.speech_mask(recording((0.6, 0), (0.6, 0.3), (0.6, 0)))
+    assert len(mask) == int(1.8 * RATE) // vad.frame
+    assert not mask[:18].any()
+    assert mask[21:39].all()
+    assert not mask[42:].any()
+
+
+def test_features_ignore_partial_frame():
+    vad = VoiceActivityDetector(RATE)
+    energy, zcr = vad.features(np.zeros(vad.frame * 3 + 7, dtype=np.float32))
+    assert len(energy) == len(zcr) == 3
+
+
+def test_endpointer_finds_the_utterance():
+    audio = recording((0.5, 0), (1.0, 0.3), (1.0, 0))
+    endpointer = Endpointer(VoiceActivityDetector(RATE), trailing_silence_ms=300)
+    span, scanned, metrics = endpointer.find_utterance(AudioRingBuffer.from_array(audio), 0)
+    onset, end = span
+    frame_ms = 30
+    assert abs(metrics.onset_ms - 500) <= frame_ms
+    assert abs(metrics.speech_ms - 1000) <= 2 * frame_ms
+    assert end <= scanned <= len(audio)
+    assert not metrics.no_speech
+
+
+def test_endpointer_gives_up_without_speech():
+    audio = recording((4.0, 0))
+    endpointer = Endpointer(VoiceActivityDetector(RATE), no_speech_timeout=1.0)
+    span, scanned, metrics = endpointer.find_utterance(AudioRingBuffer.from_array(audio), 0)
+    assert span is None
+    assert metrics.no_speech
+    assert scanned < len(audio)
+
+
+def test_endpointer_closes_utterance_at_end_of_stream():
+    audio = recording((0.5, 0), (1.0, 0.3))
+    endpointer = Endpointer(VoiceActivityDetector(RATE))
+    span, scanned, metrics = endpointer.find_utterance(AudioRingBuffer.from_array(audio), 0)
+    assert span is not None
+    assert span[1] <= scanned <= len(audio)
+    assert abs(metrics.speech_ms - 1000) <= 60
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from modules.wake_word import WakeWordDetector, dtw_distance
+
+RATE = 16000
+
+
+def reference_dtw(a, b):
+    """Textbook O(n*m) DTW with the same step pattern and normalization"""
+    n, m = len(a), len(b)
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost = np.linalg.norm(a[i - 1] - b[j - 1])
+            acc[i, j] = cost + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+    return acc[n, m] / (n + m)
+
+
+@pytest.mark.parametrize("n, m", [(12, 12), (9, 17), (20, 6)])
+def test_dtw_matches_reference_without_band(n, m):
+    rng = np.random.default_rng(n * m)
+    a, b = rng.normal(size=(n, 4)), rng.normal(size=(m, 4))
+    assert dtw_distance(a, b, band=1.0) == pytest.approx(reference_dtw(a, b))
+
+
+def test_dtw_band_never_beats_the_full_alignment():
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(size=(30, 4)), rng.normal(size=(24, 4))
+    assert dtw_distance(a, b, band=0.1) >= dtw_distance(a, b, band=1.0) - 1e-9
+
+
+def test_dtw_identity_and_time_warp():
+    a = np.random.default_rng(2).normal(size=(10, 4))
+    assert dtw_distance(a, a) == 0.0
+    assert dtw_distance(a, np.repeat(a, 2, axis=0)) == 0.0
+    assert dtw_distance(a, a[:0]) == float('inf')
+
+
+def sweep(seconds, low, high):
+    t = np.arange(int(RATE * seconds)) / RATE
+    phase = 2 * np.pi * (low * t + (high - low) * t * t / (2 * seconds))
+    padding = np.zeros(int(RATE * 0.2))
+    return np.concatenate([padding, 0.3 * np.sin(phase), padding]).astype(np.float32)
+
+
+def test_detector_accepts_the_template_and_rejects_other_lengths():
+    detector = WakeWordDetector(RATE)
+    assert detector.score(sweep(0.6, 300, 1200)) == float('inf')  # nothing enrolled
+    detector.enroll(sweep(0.6, 300, 1200))
+    detected, score = detector.detect(sweep(0.6, 300, 1200))
+    assert detected and score == pytest.approx(0.0, abs=1e-3)
+    assert detector.score(sweep(2.0, 300, 1200)) == float('inf')
+    assert detector.score(sweep(0.6, 1200, 300)) > 0